@@ -5,7 +5,10 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from database import DatabaseManager
+from export import EXPORT_FORMATS, export_to_file, read_export, remove_export
 from logger import setup_logging
+from page_timing import METRICS_PATH, PROFILE_ENABLED, page_stats, timed_page
+import os
 import time
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
@@ -13,6 +16,10 @@ from dateutil.relativedelta import relativedelta
 
 logger = setup_logging()
 
+# Columnas de Reportes que se muestran en la gestión de reportes
+REPORT_COLUMNS = ['id_reporte', 'id_empleado', 'id_actividad', 'acciones_realizadas',
+                  'comentarios', 'porcentaje', 'entregable', 'estado']
+
 
 class AdminInterface:
     _instance = None
@@ -32,11 +39,13 @@ class AdminInterface:
         logger.info("AdminInterface inicializado.")
         self._initialized = True
 
-    @st.cache_data(ttl=300)
-    def _get_cached_data(_self, table_name: str, columns: list = None) -> pd.DataFrame:
-        """Obtiene datos con caché para mejorar rendimiento"""
-        return _self.db_manager.get_data(table_name)
+    def _get_cached_data(self, table_name: str, columns: list = None, filters: dict = None,
+                         order_by=None, limit: int = None, offset: int = None) -> pd.DataFrame:
+        """Obtiene datos a través de la caché por tabla del DatabaseManager"""
+        return self.db_manager.get_data(table_name, filters=filters, limit=limit,
+                                        order_by=order_by, offset=offset, columns=columns)
 
+    @timed_page
     def show_admin_dashboard(self):
         """Muestra el dashboard principal del administrador"""
         st.title("📊 Panel de Administración")
@@ -47,7 +56,8 @@ class AdminInterface:
             page = st.selectbox(
                 "Seleccionar página:",
                 ["Dashboard", "Gestión de Colaboradores", "Gestión de Contratos",
-                 "Gestión de Actividades", "Gestión de Reportes", "Enviar Notificaciones"]
+                 "Gestión de Actividades", "Gestión de Reportes", "Enviar Notificaciones",
+                 "Rendimiento"]
             )
 
         if page == "Dashboard":
@@ -62,33 +72,62 @@ class AdminInterface:
             self.manage_reports()
         elif page == "Enviar Notificaciones":
             self.send_notifications()
+        elif page == "Rendimiento":
+            self.show_performance()
 
+    @timed_page
     def show_dashboard(self):
         """Muestra el dashboard principal con resúmenes"""
         st.header("📈 Resumen General")
 
-        # Obtener datos con caché
-        empleados_df = self._get_cached_data('Empleados')
-        reportes_df = self._get_cached_data('Reportes')
-        actividades_df = self._get_cached_data('Actividades')
+        # Métricas calculadas en el servidor; las tres consultas se ejecutan en paralelo
+        inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        fin_mes = inicio_mes + relativedelta(months=1)
+        data = self.db_manager.get_many({
+            'empleados': self.db_manager.query('Empleados').aggregate(
+                total=('count', '*'), activos=('count', '*', {'activo': True})),
+            'actividades': self.db_manager.query('Actividades').aggregate(
+                total=('count', '*')),
+            'reportes': self.db_manager.query('Reportes').date_range(
+                'fecha', inicio_mes, fin_mes).aggregate(total=('count', '*')),
+        })
+
+        def metrica(key: str, column: str = 'total') -> int:
+            df = data[key]
+            return int(df[column].iloc[0]) if not df.empty else 0
 
         # Métricas principales
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total Colaboradores", len(empleados_df))
+            st.metric("Total Colaboradores", metrica('empleados'))
 
         with col2:
-            empleados_activos = len(
-                empleados_df[empleados_df['activo'] == True])
-            st.metric("Colaboradores Activos", empleados_activos)
+            st.metric("Colaboradores Activos", metrica('empleados', 'activos'))
 
         with col3:
-            st.metric("Total Actividades", len(actividades_df))
+            st.metric("Total Actividades", metrica('actividades'))
 
         with col4:
-            reportes_mes = len(reportes_df)  # Simplificado para el ejemplo
-            st.metric("Reportes del Mes", reportes_mes)
+            st.metric("Reportes del Mes", metrica('reportes'))
+
+        if self.db_manager.summary.enabled:
+            # Avance del mes leído de ResumenMensual, sin recorrer Reportes
+            st.subheader("📅 Avance del mes por colaborador")
+            avance_df = self.db_manager.query('ResumenMensual', 's') \
+                .join('Empleados', ('s.id_empleado', 'e.id_empleado'), alias='e') \
+                .where('s.mes', '=', inicio_mes.strftime("%Y-%m")) \
+                .group_by('e.nombre') \
+                .aggregate(actividades=('sum', 's.actividades_total'),
+                           reportadas=('sum', 's.actividades_reportadas'),
+                           porcentaje_promedio=('avg', 's.porcentaje_promedio')) \
+                .order_by('e.nombre').fetch()
+            if not avance_df.empty:
+                avance_df['avance'] = (avance_df['reportadas'] /
+                                       avance_df['actividades'] * 100).round(1)
+                st.dataframe(avance_df, use_container_width=True, hide_index=True)
+            else:
+                st.info("Aún no hay reportes este mes")
 
         # ... (resto del dashboard) ...
 
@@ -101,7 +140,8 @@ class AdminInterface:
         toggle_key = f"mostrar_formulario_{nombre_tabla}"
 
         if nombre_tabla != "Empleados":
-            df_2 = self._get_cached_data("Empleados")
+            df_2 = self._get_cached_data(
+                "Empleados", ['id_empleado', 'nombre', 'rol'])
             df_3 = df_2[df_2['rol'] == 'administrador'].copy()
         else:
             df_2 = pd.DataFrame(
@@ -131,7 +171,7 @@ class AdminInterface:
             with st.form(f"form_agregar_{nombre_tabla}"):
                 nuevo_registro = {}
 
-                logger.info(df.columns)
+                logger.debug(df.columns)
 
                 for col in df.columns:
                     if col.lower() == column_id:
@@ -180,7 +220,6 @@ class AdminInterface:
                     if self.db_manager.insert_data(nombre_tabla, nuevo_registro):
                         st.success("Registro agregado exitosamente")
                         st.session_state[toggle_key] = False
-                        st.cache_data.clear()
                         st.rerun()
                     else:
                         st.error("Error al agregar registro")
@@ -191,13 +230,14 @@ class AdminInterface:
 
     def mostrar_formulario_edicion(self, nombre_tabla: str, df: pd.DataFrame, edit_key: str, row):
         edit_key = edit_key
-        logger.info(f"editando: {edit_key} => {row.to_dict()}")
+        logger.debug(f"editando: {edit_key} => {row.to_dict()}")
         st.subheader(edit_key)
         valores_actualizados = {}
         condiciones = {}
 
         if nombre_tabla != "Empleados":
-            df_2 = self._get_cached_data("Empleados")
+            df_2 = self._get_cached_data(
+                "Empleados", ['id_empleado', 'nombre', 'rol'])
             df_3 = df_2[df_2['rol'] == 'administrador'].copy()
         else:
             df_2 = pd.DataFrame(
@@ -211,7 +251,6 @@ class AdminInterface:
 
         for col in df.columns:
             valor_actual = row[col]
-            logger.info(f"Columna: {col}, Valor actual: {valor_actual}")
 
             col_lower = col.lower()
 
@@ -263,7 +302,6 @@ class AdminInterface:
                 st.success("Registro actualizado exitosamente")
                 st.session_state[edit_key] = False
                 st.session_state['edit_index'] = None
-                st.cache_data.clear()
                 st.rerun()
             else:
                 st.error("Error al actualizar registro")
@@ -273,6 +311,7 @@ class AdminInterface:
             st.info("Edición cancelada")
             st.rerun()
 
+    @timed_page
     def manage_employees(self):
         """Gestión de empleados con búsqueda y paginación"""
         st.header("👥 Gestión de Empleados")
@@ -280,24 +319,18 @@ class AdminInterface:
         # Barra de búsqueda
         search_term = st.text_input("Buscar empleado por nombre o correo")
 
-        empleados_df = self._get_cached_data('Empleados')
-
-        # Filtrar por término de búsqueda
-        if search_term:
-            mask = empleados_df['nombre'].str.contains(search_term, case=False) | \
-                empleados_df['correo'].str.contains(search_term, case=False)
-            empleados_df = empleados_df[mask]
-
-        # Paginación
+        # Paginación: el total se cuenta en la base de datos y solo se trae la página visible
         page_size = st.selectbox("Registros por página", [5, 10, 20], index=1)
-        total_pages = max(1, (len(empleados_df) // page_size) +
-                          (1 if len(empleados_df) % page_size > 0 else 0))
+        query = self.db_manager.query('Empleados')
+        if search_term:
+            query.search(['nombre', 'correo'], search_term)
+        total_empleados = query.count()
+        total_pages = max(1, (total_empleados // page_size) +
+                          (1 if total_empleados % page_size > 0 else 0))
         page = st.number_input('Página', min_value=1,
                                max_value=total_pages, value=1)
-        start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, len(empleados_df))
-
-        empleados_df = empleados_df.iloc[start_idx:end_idx]
+        empleados_df = query.order_by('id_empleado').limit(
+            page_size).offset((page - 1) * page_size).fetch()
 
         # Mostrar tabla con botones Editar y Eliminar
         if not empleados_df.empty:
@@ -344,7 +377,7 @@ class AdminInterface:
                     # Si estamos editando, mostrar formulario de edición
 
                     st.subheader("Editar Empleado")
-                    logger.info(
+                    logger.debug(
                         f"Editando empleado...{st.session_state[f'edit_index']}")
                     # logger.info(f"Editando empleado: {row.to_dict()}")
                     # # Formulario para editar empleado
@@ -364,7 +397,6 @@ class AdminInterface:
                                 st.success("Empleado eliminado exitosamente")
                                 st.session_state.show_confirm = False
                                 del st.session_state['employee_to_delete']
-                                st.cache_data.clear()
                                 st.rerun()
                             else:
                                 st.error("Error al eliminar empleado")
@@ -380,13 +412,15 @@ class AdminInterface:
         self.mostrar_formulario_agregar(
             nombre_tabla="Empleados", df=empleados_df, column_id="id_empleado")
 
+    @timed_page
     def manage_contracts(self):
         """Gestión de contratos con nombres de empleados visibles"""
         st.header("📄 Gestión de Contratos")
 
         # Obtener datos
         contratos_df = self._get_cached_data('Contratos')
-        empleados_df = self._get_cached_data('Empleados')
+        empleados_df = self._get_cached_data(
+            'Empleados', ['id_empleado', 'nombre'])
 
         # Renombrar columnas para evitar conflictos
         empleados_validador_df = empleados_df.copy()
@@ -456,7 +490,6 @@ class AdminInterface:
                                 st.success("Contrato eliminado exitosamente")
                                 st.session_state.show_confirm = False
                                 del st.session_state['contrato_to_delete']
-                                st.cache_data.clear()
                                 st.rerun()
                             else:
                                 st.error("Error al eliminar contrato")
@@ -471,11 +504,14 @@ class AdminInterface:
         self.mostrar_formulario_agregar(
             nombre_tabla="Contratos", df=self._get_cached_data('Contratos'), column_id="id_contrato")
 
+    @timed_page
     def manage_activities(self):
         """Gestión de actividades con búsqueda y paginación"""
 
-        contratos_df = self._get_cached_data('Contratos')
-        actividades_df = self._get_cached_data('Actividades')
+        contratos_df = self._get_cached_data(
+            'Contratos', ['id_contrato', 'nombre_contrato'])
+        actividades_df = self._get_cached_data(
+            'Actividades', ['id_contrato', 'Nro', 'descripcion', 'porcentaje'])
 
         st.header("📋 Gestión de Actividades")
 
@@ -526,38 +562,34 @@ class AdminInterface:
                         st.info(
                             f"No hay actividades registradas para el contrato {contrato['nombre_contrato']}")
 
+    @timed_page
     def manage_reports(self):
         """Gestión de reportes"""
         st.header("📊 Gestión de Reportes")
 
-        reportes_df = self.db_manager.get_data('Reportes')
-        reportes_df = reportes_df[['id_reporte', 'id_empleado', 'id_actividad', 'acciones_realizadas',
-                                   'comentarios', 'porcentaje', 'entregable', 'estado']]
-
         with st.container():
             st.subheader("🔍 Buscar reportes")
             search_term = st.text_input(
                 "Buscar por número de reporte o comentario")
 
-            if search_term:
-                mask = reportes_df['id_reporte'].astype(str).str.contains(search_term, case=False) | \
-                    reportes_df['comentarios'].str.contains(
-                        search_term, case=False)
-                reportes_df = reportes_df[mask]
-
         st.divider()
 
         with st.container():
             st.subheader("📄 Configuración de tabla")
             page_size = st.selectbox(
                 "Registros por página", [5, 10, 20], index=1)
-            total_pages = max(1, (len(reportes_df) // page_size) +
-                              (1 if len(reportes_df) % page_size > 0 else 0))
+
+            # El total se cuenta en la base de datos y solo se trae la página visible
+            query = self.db_manager.query('Reportes').select(*REPORT_COLUMNS)
+            if search_term:
+                query.search(['id_reporte', 'comentarios'], search_term)
+            total_reportes = query.count()
+            total_pages = max(1, (total_reportes // page_size) +
+                              (1 if total_reportes % page_size > 0 else 0))
             page = st.number_input('Página', min_value=1,
                                    max_value=total_pages, value=1)
-            start_idx = (page - 1) * page_size
-            end_idx = min(start_idx + page_size, len(reportes_df))
-            reportes_df = reportes_df.iloc[start_idx:end_idx]
+            reportes_df = query.order_by('id_reporte').limit(
+                page_size).offset((page - 1) * page_size).fetch()
 
         if not reportes_df.empty:
             st.divider()
@@ -642,6 +674,7 @@ class AdminInterface:
             st.subheader("💾 Guardado masivo")
             if all(st.session_state[f"approve_{r.id_reporte}"] for r in reportes_df.itertuples()):
                 if st.button("💾 Guardar todos los reportes"):
+                    cambios = []
                     for reporte in reportes_df.itertuples():
                         comentario = st.session_state.get(
                             f"comment_{reporte.id_reporte}", "")
@@ -649,33 +682,179 @@ class AdminInterface:
                             "comentarios": comentario,
                             "estado": True
                         }
-                        self.db_manager.update_data('Reportes', registro, {
-                                                    "id_reporte": reporte.id_reporte})
-                    st.success("✅ Todos los reportes han sido guardados.")
-                    st.rerun()
+                        cambios.append(
+                            (registro, {"id_reporte": reporte.id_reporte}))
+                    resultados = self.db_manager.update_many(
+                        'Reportes', cambios)
+                    fallidos = [condicion["id_reporte"] for (_, condicion), ok
+                                in zip(cambios, resultados) if not ok]
+                    if fallidos:
+                        st.error(
+                            f"No se pudieron guardar los reportes: {', '.join(map(str, fallidos))}")
+                    else:
+                        st.success("✅ Todos los reportes han sido guardados.")
+                        st.rerun()
             else:
                 st.button("💾 Guardar todos los reportes", disabled=True)
 
         else:
             st.info("🔎 No hay reportes disponibles para mostrar.")
 
+        st.divider()
+        self.show_export_options()
+
+    def _export_query(self, vista: str):
+        """Consulta que alimenta cada vista exportable"""
+        if vista == 'Reportes':
+            return self.db_manager.query('Reportes') \
+                .select(*REPORT_COLUMNS, 'fecha').order_by('id_reporte')
+        if vista == 'Actividades':
+            return self.db_manager.query('Actividades').order_by('id_actividad')
+        # Cumplimiento de contratos: cada reporte con su contrato, actividad y empleado
+        return self.db_manager.query('Reportes', 'r') \
+            .select('c.nombre_contrato', 'e.nombre AS empleado', 'a.Nro', 'a.descripcion',
+                    'r.fecha', 'r.porcentaje', 'r.estado') \
+            .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a') \
+            .join('Contratos', ('a.id_contrato', 'c.id_contrato'), alias='c') \
+            .join('Empleados', ('r.id_empleado', 'e.id_empleado'), alias='e') \
+            .order_by('c.id_contrato', 'a.Nro', 'r.fecha')
+
+    @timed_page
+    def show_export_options(self):
+        """Exportación en streaming de reportes, actividades y cumplimiento"""
+        st.subheader("📤 Exportar")
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            vista = st.selectbox(
+                "Vista", ['Reportes', 'Actividades', 'Cumplimiento de contratos'],
+                key="export_vista")
+        with col2:
+            formato = st.selectbox("Formato", list(EXPORT_FORMATS.keys()),
+                                   key="export_formato")
+        with col3:
+            st.write("")
+            preparar = st.button("Preparar exportación")
+
+        if preparar:
+            # El archivo anterior se descarta antes de generar uno nuevo
+            remove_export(st.session_state.get('export_path'))
+            nombre = vista.lower().replace(' ', '_')
+            with st.spinner("Generando archivo..."):
+                path = export_to_file(self.db_manager.iter_data(
+                    self._export_query(vista), chunk_size=10000), formato, nombre)
+            st.session_state['export_path'] = path
+            st.session_state['export_formato_listo'] = formato
+            if path is None:
+                st.error("No se pudo generar la exportación")
+
+        path = st.session_state.get('export_path')
+        if path and os.path.exists(path):
+            _, mime = EXPORT_FORMATS[st.session_state['export_formato_listo']]
+            # El archivo se lee solo al hacer clic, no en cada rerun
+            st.download_button("⬇️ Descargar", data=lambda: read_export(path),
+                               file_name=os.path.basename(path), mime=mime)
+
     def send_notifications(self):
         """Envío de notificaciones"""
         st.header("📧 Enviar Notificaciones")
 
-        empleados_df = self.db_manager.get_data('Empleados')
+        empleados_df = self.db_manager.get_data(
+            'Empleados', columns=['id_empleado', 'nombre', 'correo'])
 
         with st.form("send_notification"):
+            empleado_options = {}
             if not empleados_df.empty:
-                empleado_options = ["Todos"] + [f"{emp['nombre']} ({emp['correo']})"
-                                                for _, emp in empleados_df.iterrows()]
-                destinatario = st.selectbox("Destinatario", empleado_options)
+                empleado_options = {f"{emp['nombre']} ({emp['correo']})": emp['id_empleado']
+                                    for _, emp in empleados_df.iterrows()}
+            destinatario = st.selectbox(
+                "Destinatario", ["Todos"] + list(empleado_options.keys()))
 
             mensaje = st.text_area("Mensaje")
 
             if st.form_submit_button("Enviar Notificación"):
                 if mensaje:
-                    # Aquí iría la lógica de envío de notificaciones
-                    st.success(f"Notificación enviada a: {destinatario}")
+                    destinatarios = list(empleado_options.values()) if destinatario == "Todos" \
+                        else [empleado_options[destinatario]]
+                    fecha_envio = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    notificaciones = [{
+                        'id_empleado': id_empleado,
+                        'mensaje': mensaje,
+                        'fecha_envio': fecha_envio,
+                        'leido': False
+                    } for id_empleado in destinatarios]
+                    resultados = self.db_manager.insert_many(
+                        'Notificaciones', notificaciones)
+                    enviados = sum(resultados)
+                    if enviados == len(notificaciones):
+                        st.success(f"Notificación enviada a: {destinatario}")
+                    else:
+                        st.error(
+                            f"Se enviaron {enviados} de {len(notificaciones)} notificaciones")
                 else:
                     st.error("Escriba un mensaje")
+
+    @timed_page
+    def show_performance(self):
+        """Tiempos de las operaciones de base de datos registradas en este proceso"""
+        st.header("⏱️ Rendimiento")
+        stats = self.db_manager.stats
+        registros = stats.snapshot()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Backend activo", self.db_manager.backend or "-")
+        with col2:
+            st.metric("Operaciones registradas", f"{len(registros)} / {stats.capacity}")
+        with col3:
+            lecturas = registros[registros['cache'] != '-']
+            aciertos = (lecturas['cache'] == 'hit').mean() * 100 if not lecturas.empty else 0
+            st.metric("Aciertos de caché", f"{aciertos:.0f}%")
+        with col4:
+            # Solo filtra la tabla de abajo; el umbral del log lento es del proceso
+            umbral = st.number_input(
+                "Mostrar como lentas desde (ms)", min_value=1,
+                value=int(stats.slow_threshold_ms), step=50)
+
+        if registros.empty:
+            st.info("Aún no hay operaciones registradas")
+            return
+
+        st.subheader("Percentiles por operación")
+        st.dataframe(stats.percentiles().round(1), use_container_width=True, hide_index=True)
+
+        st.subheader("Sentencias con mayor tiempo total")
+        limite = st.selectbox("Mostrar", [10, 20, 50], index=1)
+        top_df = stats.top_statements(limite)
+        top_df['aciertos_cache'] = (top_df['aciertos_cache'] * 100).round(0)
+        st.dataframe(top_df.round(1), use_container_width=True, hide_index=True)
+
+        lentas = registros[registros['duracion_ms'] >= umbral]
+        with st.expander(f"Operaciones lentas recientes ({len(lentas)})"):
+            st.dataframe(lentas.sort_values('momento', ascending=False).round(1),
+                         use_container_width=True, hide_index=True)
+
+        st.subheader("Páginas")
+        paginas_df = page_stats.summary()
+        if not paginas_df.empty:
+            st.dataframe(paginas_df.round(1), use_container_width=True, hide_index=True)
+            with st.expander("Renders recientes"):
+                st.dataframe(page_stats.snapshot().sort_values('momento', ascending=False).round(1),
+                             use_container_width=True, hide_index=True)
+        st.caption(f"Métricas en formato Prometheus: {METRICS_PATH}"
+                   + (" · captura de perfiles activa" if PROFILE_ENABLED else ""))
+        st.download_button("⬇️ Métricas Prometheus", page_stats.prometheus_text(stats),
+                           file_name="metricas.prom", mime="text/plain")
+
+        estado = self.db_manager.breaker.state()
+        if estado:
+            with st.expander("Circuit breaker de conexiones"):
+                st.json(estado)
+
+        if self.db_manager.sql_lite_pool:
+            with st.expander("Pool de SQLite"):
+                st.json(self.db_manager.sql_lite_pool.contention())
+
+        if st.button("Limpiar estadísticas"):
+            stats.clear()
+            page_stats.clear()
+            st.rerun()
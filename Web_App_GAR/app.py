@@ -43,21 +43,26 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource(show_spinner="Conectando a la base de datos...")
+def get_db_manager() -> DatabaseManager:
+    """Conecta una sola vez por proceso según la configuración de backends"""
+    db_manager = DatabaseManager()
+    db_manager.connect()
+    # Lectura columnar solo si se activa con GAR_DB_ARROW_FETCH (y el driver está instalado)
+    if db_manager.settings.get("arrow_fetch"):
+        db_manager.enable_arrow_fetch()
+    db_manager.start_health_check()
+    return db_manager
+
+
 def main():
-    # Inicializar el gestor de base de datos
+    # Gestor de base de datos compartido por todas las sesiones del proceso
     if 'db_manager' not in st.session_state:
-        st.session_state.db_manager = DatabaseManager()
-        if st.session_state.db_manager.sql_engine == None:
-            # (server="localhost", username="sa", password="Password123456"):
-            if not st.session_state.db_manager.connect_to_sql_server():
-                if st.session_state.db_manager.sql_lite_connection == None:
-                    if not st.session_state.db_manager.connect_to_sql_lite():
-                        st.session_state.db_manager.use_excel = True
-                        st.info("Usando archivo Excel como base de datos.")
-                    else:
-                        st.success("Conectado a SQLite correctamente.")
-                else:
-                    st.success("Conectado a SQLite correctamente.")
+        st.session_state.db_manager = get_db_manager()
+        if st.session_state.db_manager.backend == "excel":
+            st.info("Usando archivo Excel como base de datos.")
+        elif st.session_state.db_manager.backend == "sqlite":
+            st.success("Conectado a SQLite correctamente.")
 
     # Inicializar el gestor de autenticación
     if 'auth_manager' not in st.session_state:
@@ -89,12 +94,15 @@ def main():
             st.markdown("---")
 
             # Información de conexión
-            if st.session_state.db_manager.use_excel:
+            backend = st.session_state.db_manager.backend
+            if backend == "excel":
                 st.warning("📁 Usando archivo Excel")
-            elif st.session_state.db_manager.sql_lite_connection:
+            elif backend == "sqlite":
                 st.success("🗄️ Conectado a SQLite")
-            else:
+            elif backend == "sqlserver":
                 st.success("🗄️ Conectado a SQL Server")
+            else:
+                st.error("⚠️ Sin conexión a base de datos")
 
             st.markdown("---")
 
@@ -0,0 +1,289 @@
+from logger import setup_logging
+from database import DatabaseManager
+from query_builder import Query
+from table_schema import materialize
+from typing import Optional, Dict, Any, List, Union
+from sqlalchemy import event, text
+import pandas as pd
+from urllib.parse import quote_plus
+import asyncio
+import os
+
+logger = setup_logging()
+# Importar la capa asíncrona de SQLAlchemy de forma opcional (requiere greenlet)
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+    ASYNC_SQLALCHEMY_AVAILABLE = True
+except ImportError:
+    ASYNC_SQLALCHEMY_AVAILABLE = False
+    logger.warning(
+        "sqlalchemy[asyncio] no está disponible. El acceso asíncrono está deshabilitado.")
+# Importar los drivers asíncronos de forma opcional
+try:
+    import aiosqlite
+    AIOSQLITE_AVAILABLE = True
+except ImportError:
+    AIOSQLITE_AVAILABLE = False
+try:
+    import aioodbc
+    AIOODBC_AVAILABLE = True
+except ImportError:
+    AIOODBC_AVAILABLE = False
+
+
+class AsyncDatabaseManager:
+    """Contraparte asíncrona de ``DatabaseManager`` para SQLite y SQL Server.
+
+    Pensada para tareas en segundo plano, importadores masivos o una API:
+    todas las consultas comparten un único event loop y un motor
+    ``AsyncEngine`` con su propio pool, y ``max_concurrency`` limita
+    cuántas se ejecutan a la vez. Usa el mismo query builder y las mismas
+    sentencias parametrizadas que el gestor síncrono, sin caché: cada
+    llamada consulta la base de datos. El respaldo Excel no tiene
+    versión asíncrona.
+    """
+
+    def __init__(self, max_concurrency: int = 10) -> None:
+        self.engine: Optional["AsyncEngine"] = None
+        self.dialect = "sqlite"
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Se crea dentro del event loop que lo va a usar
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def connect_to_sql_lite(self, db_path: str = "db_gpc.db") -> bool:
+        """Crea el motor asíncrono de SQLite (aiosqlite)"""
+        if not ASYNC_SQLALCHEMY_AVAILABLE or not AIOSQLITE_AVAILABLE:
+            logger.error("aiosqlite no está disponible para el acceso asíncrono")
+            return False
+        if not os.path.exists(db_path):
+            logger.error(f"Archivo SQLite no encontrado: {db_path}")
+            return False
+        try:
+            engine = create_async_engine(
+                f"sqlite+aiosqlite:///{db_path}", pool_size=self.max_concurrency)
+
+            @event.listens_for(engine.sync_engine, "connect")
+            def _set_pragmas(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA busy_timeout=5000")
+                cursor.close()
+
+            return await self._use_engine(engine, "sqlite")
+        except Exception as e:
+            logger.error(f"Error conectando a SQLite (asíncrono): {e}")
+            return False
+
+    async def connect_to_sql_server(
+        self,
+        server: str = "P18PPAD20\\SQLEXPRESS",
+        database: str = "db_gpc",
+        username: str = None,
+        password: str = None
+    ) -> bool:
+        """Crea el motor asíncrono de SQL Server (aioodbc)"""
+        if not ASYNC_SQLALCHEMY_AVAILABLE or not AIOODBC_AVAILABLE:
+            logger.error("aioodbc no está disponible para el acceso asíncrono")
+            return False
+        try:
+            connection_string = (
+                'DRIVER={ODBC Driver 17 for SQL Server};'
+                f'SERVER={server};'
+                f'DATABASE={database};'
+            )
+            if username and password:
+                connection_string += f'UID={username};PWD={password};'
+            else:
+                connection_string += 'Trusted_Connection=yes;'
+            engine = create_async_engine(
+                f"mssql+aioodbc:///?odbc_connect={quote_plus(connection_string)}",
+                pool_size=self.max_concurrency,
+                max_overflow=10,
+                pool_timeout=30
+            )
+            return await self._use_engine(engine, "mssql")
+        except Exception as e:
+            logger.error(f"Error conectando a SQL Server (asíncrono): {e}")
+            return False
+
+    async def _use_engine(self, engine: "AsyncEngine", dialect: str) -> bool:
+        """Prueba el motor y lo deja como activo"""
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        if self.engine is not None:
+            await self.engine.dispose()
+        self.engine = engine
+        self.dialect = dialect
+        logger.info(f"Conexión asíncrona exitosa ({dialect})")
+        return True
+
+    def query(self, table_name: str, alias: str = None) -> Query:
+        """Crea una consulta componible; se ejecuta con ``await fetch(query)``"""
+        return Query(table_name, alias)
+
+    async def get_data(
+        self,
+        table_name: str,
+        filters: dict = None,
+        limit: int = None,
+        order_by=None,
+        offset: int = None,
+        columns: List[str] = None
+    ) -> pd.DataFrame:
+        """Versión asíncrona de ``DatabaseManager.get_data``"""
+        try:
+            query = self.query(table_name).filter(filters).limit(limit).offset(offset)
+            if columns:
+                query.select(*columns)
+            if order_by:
+                query.order_by(*([order_by] if isinstance(order_by, str) else order_by))
+        except Exception as e:
+            logger.error(f"Error obteniendo datos de {table_name}: {e}")
+            return pd.DataFrame()
+        return await self.fetch(query)
+
+    async def fetch(self, query: Query) -> pd.DataFrame:
+        """Ejecuta una consulta del query builder"""
+        try:
+            sql, params = query.compile(self.dialect)
+            async with self.semaphore:
+                async with self.engine.connect() as connection:
+                    result = await connection.execute(text(sql), params)
+                    df = materialize(list(result.keys()), result.fetchmany)
+            logger.debug(
+                f"Datos obtenidos de {', '.join(query.tables)} (asíncrono) [{len(df)} filas]")
+            return df
+        except Exception as e:
+            logger.error(f"Error obteniendo datos (asíncrono): {e}")
+            return pd.DataFrame()
+
+    async def count(self, table_name, filters: dict = None) -> int:
+        """Versión asíncrona de ``DatabaseManager.count``"""
+        try:
+            query = table_name if isinstance(table_name, Query) \
+                else self.query(table_name).filter(filters)
+            sql, params = query.compile_count()
+            async with self.semaphore:
+                async with self.engine.connect() as connection:
+                    return (await connection.execute(text(sql), params)).scalar() or 0
+        except Exception as e:
+            logger.error(f"Error contando registros (asíncrono): {e}")
+            return 0
+
+    async def get_many(self, requests: Dict[str, Union[str, dict, Query]]) -> Dict[str, pd.DataFrame]:
+        """Ejecuta varias consultas a la vez en el event loop"""
+        async def load(request):
+            if isinstance(request, Query):
+                return await self.fetch(request)
+            if isinstance(request, str):
+                return await self.get_data(request)
+            return await self.get_data(**request)
+
+        results = await asyncio.gather(*(load(request) for request in requests.values()))
+        return dict(zip(requests.keys(), results))
+
+    async def _execute(self, table_name: str, query: str, params: Dict[str, Any]) -> bool:
+        """Ejecuta una sentencia de escritura en su propia transacción"""
+        try:
+            async with self.semaphore:
+                async with self.engine.begin() as connection:
+                    await connection.execute(text(query), params)
+            return True
+        except Exception as e:
+            logger.error(f"Error escribiendo en {table_name} (asíncrono): {e}")
+            return False
+
+    async def insert_data(self, table_name: str, data: Dict[str, Any]) -> bool:
+        """Inserta datos en la tabla especificada"""
+        try:
+            query, params = DatabaseManager._insert_statement(table_name, data)
+        except ValueError as e:
+            logger.error(f"Error insertando en {table_name}: {e}")
+            return False
+        return await self._execute(table_name, query, params)
+
+    async def update_data(self, table_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+        """Actualiza datos en la tabla especificada"""
+        try:
+            query, params = DatabaseManager._update_statement(table_name, data, condition)
+        except ValueError as e:
+            logger.error(f"Error actualizando {table_name}: {e}")
+            return False
+        return await self._execute(table_name, query, params)
+
+    async def delete_data(self, table_name: str, condition: Dict[str, Any]) -> bool:
+        """Elimina datos de la tabla especificada"""
+        try:
+            query, params = DatabaseManager._delete_statement(table_name, condition)
+        except ValueError as e:
+            logger.error(f"Error eliminando de {table_name}: {e}")
+            return False
+        return await self._execute(table_name, query, params)
+
+    async def insert_many(self, table_name: str, rows: List[Dict[str, Any]]) -> List[bool]:
+        """Inserta varias filas en una sola transacción; retorna el resultado por fila"""
+        return await self._execute_batch(
+            table_name, [DatabaseManager._insert_statement(table_name, data) for data in rows])
+
+    async def update_many(self, table_name: str, changes: List[tuple]) -> List[bool]:
+        """Actualiza varias filas ``(datos, condición)`` en una sola transacción"""
+        return await self._execute_batch(
+            table_name, [DatabaseManager._update_statement(table_name, data, condition)
+                         for data, condition in changes])
+
+    async def delete_many(self, table_name: str, conditions: List[Dict[str, Any]]) -> List[bool]:
+        """Elimina varias filas en una sola transacción; retorna el resultado por fila"""
+        return await self._execute_batch(
+            table_name, [DatabaseManager._delete_statement(table_name, condition)
+                         for condition in conditions])
+
+    async def _execute_batch(self, table_name: str, statements: List[tuple]) -> List[bool]:
+        """Ejecuta el lote usando savepoints para aislar las filas con error.
+
+        Como en ``DatabaseManager``, los INSERT de un mismo tramo van en un
+        solo ``executemany`` y los UPDATE y DELETE se ejecutan fila por fila
+        para que una condición sin coincidencias retorne False.
+        """
+        if not statements:
+            return []
+        results = [False] * len(statements)
+        try:
+            async with self.semaphore:
+                async with self.engine.begin() as connection:
+                    for query, indexes in DatabaseManager._group_statements(statements):
+                        if DatabaseManager._is_insert(query):
+                            try:
+                                async with connection.begin_nested():
+                                    await connection.execute(
+                                        text(query), [statements[i][1] for i in indexes])
+                                for i in indexes:
+                                    results[i] = True
+                                continue
+                            except Exception as e:
+                                logger.warning(
+                                    f"Lote fallido, reintentando fila por fila: {e}")
+                        for i in indexes:
+                            try:
+                                async with connection.begin_nested():
+                                    result = await connection.execute(text(query), statements[i][1])
+                                results[i] = result.rowcount != 0
+                            except Exception as e:
+                                logger.error(f"Error en la fila {i} del lote: {e}")
+        except Exception as e:
+            logger.error(f"Error ejecutando lote en {table_name} (asíncrono): {e}")
+            return [False] * len(statements)
+        return results
+
+    async def close(self) -> None:
+        """Libera el pool del motor asíncrono"""
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+        logger.info("Conexiones asíncronas cerradas.")
@@ -0,0 +1,10 @@
+"""Benchmarks de DatabaseManager y de las páginas con datos sintéticos.
+
+Uso (desde Web_App_GAR):
+    python -m benchmarks.generator --scale 100k --sqlite bench.db
+    python -m benchmarks.run --scale 1k --backend sqlite
+    python -m benchmarks.compare resultados_anteriores.json resultados_nuevos.json
+    python -m benchmarks.load --usuarios 100 --iteraciones 3 --scale 100k
+
+La prueba de carga (benchmarks.load) requiere streamlit==1.65.*.
+"""
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Tuple
+import argparse
+import json
+import sys
+
+# Diferencias menores a este valor se consideran ruido aunque superen el umbral relativo
+MIN_DELTA_MS = 1.0
+
+
+def load(path: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        report = json.load(handle)
+    return {(r["backend"], r["caso"]): r for r in report["resultados"] if "mediana_ms" in r}
+
+
+def compare(base_path: str, new_path: str, threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Compara las medianas de dos ejecuciones; marca como regresión lo que empeora más de ``threshold``"""
+    base, new = load(base_path), load(new_path)
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        antes, despues = base[key]["mediana_ms"], new[key]["mediana_ms"]
+        cambio = (despues - antes) / antes if antes else 0.0
+        rows.append({
+            "backend": key[0],
+            "caso": key[1],
+            "antes_ms": antes,
+            "despues_ms": despues,
+            "cambio": cambio,
+            "regresion": cambio > threshold and despues - antes > MIN_DELTA_MS,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks")
+    parser.add_argument("base", help="JSON de referencia (p. ej. del commit anterior)")
+    parser.add_argument("nuevo", help="JSON a evaluar")
+    parser.add_argument("--umbral", type=float, default=0.2,
+                        help="Empeoramiento relativo de la mediana que se considera regresión")
+    args = parser.parse_args()
+
+    rows = compare(args.base, args.nuevo, args.umbral)
+    for row in rows:
+        marca = "REGRESIÓN" if row["regresion"] else ""
+        print(f"[{row['backend']}] {row['caso']:<50} {row['antes_ms']:>10.1f} -> "
+              f"{row['despues_ms']:>10.1f} ms  {row['cambio']:>+7.1%}  {marca}")
+    regresiones = sum(row["regresion"] for row in rows)
+    print(f"{regresiones} regresión(es) de {len(rows)} casos")
+    sys.exit(1 if regresiones else 0)
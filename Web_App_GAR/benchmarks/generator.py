@@ -0,0 +1,217 @@
+from typing import Dict, Iterator, List, Tuple
+from datetime import datetime, timedelta
+from openpyxl import Workbook
+import argparse
+import os
+import random
+import sqlite3
+
+# Número de reportes por escala; las demás tablas se derivan de este valor
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK_SIZE = 10_000
+
+# Mismo esquema que db_gpc.db (ver Base_SQLite.py)
+SQLITE_SCHEMA = """
+CREATE TABLE Empleados (
+    id_empleado INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT,
+    correo TEXT UNIQUE,
+    rol TEXT CHECK(rol IN ('administrador', 'empleado')),
+    activo INTEGER DEFAULT 1
+);
+CREATE TABLE Contratos (
+    id_contrato INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre_contrato TEXT,
+    fecha_inicio DATE,
+    fecha_fin DATE,
+    id_empleado INTEGER,
+    FOREIGN KEY (id_empleado) REFERENCES Empleados(id_empleado)
+);
+CREATE TABLE Actividades (
+    id_actividad INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nro INTEGER,
+    descripcion TEXT NOT NULL,
+    id_contrato INTEGER NOT NULL,
+    porcentaje INTEGER,
+    FOREIGN KEY (id_contrato) REFERENCES Contratos(id_contrato)
+);
+CREATE TABLE Notificaciones (
+    id_notificacion INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_empleado INTEGER,
+    mensaje TEXT,
+    fecha_envio DATETIME DEFAULT CURRENT_TIMESTAMP,
+    leido INTEGER DEFAULT 0,
+    FOREIGN KEY (id_empleado) REFERENCES Empleados(id_empleado)
+);
+CREATE TABLE Reportes (
+    id_reporte INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_empleado INTEGER NOT NULL,
+    id_actividad INTEGER NOT NULL,
+    fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+    acciones_realizadas TEXT NOT NULL,
+    comentarios TEXT,
+    porcentaje INTEGER,
+    entregable TEXT NOT NULL,
+    estado INTEGER,
+    FOREIGN KEY (id_empleado) REFERENCES Empleados(id_empleado),
+    FOREIGN KEY (id_actividad) REFERENCES Actividades(id_actividad)
+);
+"""
+
+COLUMNS = {
+    "Empleados": ["id_empleado", "nombre", "correo", "rol", "activo"],
+    "Contratos": ["id_contrato", "nombre_contrato", "fecha_inicio", "fecha_fin", "id_empleado"],
+    "Actividades": ["id_actividad", "Nro", "descripcion", "id_contrato", "porcentaje"],
+    "Notificaciones": ["id_notificacion", "id_empleado", "mensaje", "fecha_envio", "leido"],
+    "Reportes": ["id_reporte", "id_empleado", "id_actividad", "fecha", "acciones_realizadas",
+                 "comentarios", "porcentaje", "entregable", "estado"],
+}
+
+DATE_COLUMNS = {"fecha_inicio", "fecha_fin", "fecha_envio", "fecha"}
+
+NOMBRES = ["Ana", "Luis", "María", "Carlos", "Diana", "Jorge", "Paula", "Andrés",
+           "Camila", "Felipe", "Laura", "Santiago", "Valentina", "Julián", "Sofía"]
+APELLIDOS = ["Gómez", "Rodríguez", "Martínez", "López", "García", "Pérez", "Sánchez",
+             "Ramírez", "Torres", "Díaz", "Vargas", "Castro", "Rojas", "Moreno"]
+VERBOS = ["Revisión de", "Elaboración de", "Seguimiento a", "Actualización de",
+          "Reunión sobre", "Apoyo en", "Consolidación de", "Verificación de"]
+OBJETOS = ["informe mensual", "matriz de riesgos", "acta de comité", "base de datos",
+           "plan de trabajo", "indicadores de gestión", "solicitudes de usuarios",
+           "documentación técnica", "cronograma", "procesos de contratación"]
+
+
+def table_sizes(reports: int) -> Dict[str, int]:
+    """Tamaño de cada tabla para un número de reportes (proporciones de un año de uso)"""
+    empleados = max(10, reports // 200)
+    contratos = empleados + empleados // 2
+    return {
+        "Empleados": empleados,
+        "Contratos": contratos,
+        "Actividades": contratos * 8,
+        "Notificaciones": max(10, reports // 5),
+        "Reportes": reports,
+    }
+
+
+class DatasetGenerator:
+    """Genera filas reproducibles (misma semilla, mismos datos) para las cinco tablas.
+
+    Las filas se producen tabla por tabla y en orden de clave, de modo que
+    se pueden escribir por bloques sin tener el conjunto completo en memoria.
+    """
+
+    def __init__(self, reports: int, seed: int = 42, end: datetime = None) -> None:
+        self.sizes = table_sizes(reports)
+        self.seed = seed
+        self.end = end or datetime(2026, 1, 1)
+        self.start = self.end - timedelta(days=365)
+
+    def _rng(self, table_name: str) -> random.Random:
+        # Una semilla por tabla: cada tabla es reproducible de forma independiente
+        return random.Random(f"{self.seed}:{table_name}")
+
+    def _texto(self, rng: random.Random) -> str:
+        return f"{rng.choice(VERBOS)} {rng.choice(OBJETOS)}"
+
+    def _fecha(self, rng: random.Random) -> datetime:
+        return self.start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    def _contract_of_activity(self, id_actividad: int) -> int:
+        return (id_actividad - 1) // 8 + 1
+
+    def _employee_of_contract(self, id_contrato: int) -> int:
+        return (id_contrato - 1) % self.sizes["Empleados"] + 1
+
+    def rows(self, table_name: str) -> Iterator[tuple]:
+        """Filas de la tabla en el orden de ``COLUMNS[table_name]``"""
+        rng = self._rng(table_name)
+        for i in range(1, self.sizes[table_name] + 1):
+            if table_name == "Empleados":
+                nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}"
+                rol = "administrador" if i <= max(1, self.sizes["Empleados"] // 50) else "empleado"
+                yield (i, nombre, f"usuario{i}@example.com", rol, int(rng.random() < 0.9))
+            elif table_name == "Contratos":
+                inicio = self._fecha(rng).date()
+                yield (i, f"Contrato {i:05d}", inicio.isoformat(),
+                       (inicio + timedelta(days=365)).isoformat(), self._employee_of_contract(i))
+            elif table_name == "Actividades":
+                yield (i, (i - 1) % 8 + 1, self._texto(rng), self._contract_of_activity(i),
+                       rng.choice([10, 20, 25, 50, 75, 100]))
+            elif table_name == "Notificaciones":
+                yield (i, rng.randint(1, self.sizes["Empleados"]), f"Recordatorio {i}",
+                       self._fecha(rng).strftime("%Y-%m-%d %H:%M:%S"), int(rng.random() < 0.6))
+            else:
+                id_actividad = rng.randint(1, self.sizes["Actividades"])
+                id_empleado = self._employee_of_contract(self._contract_of_activity(id_actividad))
+                yield (i, id_empleado, id_actividad, self._fecha(rng).strftime("%Y-%m-%d %H:%M:%S"),
+                       self._texto(rng), rng.choice(["", "Sin novedad", "Pendiente de aprobación"]),
+                       rng.randint(0, 100), f"entregable_{i}.pdf", int(rng.random() < 0.8))
+
+    def chunks(self, table_name: str, size: int = CHUNK_SIZE) -> Iterator[List[tuple]]:
+        chunk = []
+        for row in self.rows(table_name):
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def write_sqlite(generator: DatasetGenerator, path: str) -> None:
+    """Crea una base SQLite nueva con el esquema de db_gpc.db y los datos generados"""
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript(SQLITE_SCHEMA)
+        for table_name, columns in COLUMNS.items():
+            sql = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                   f"VALUES ({', '.join('?' for _ in columns)})")
+            for chunk in generator.chunks(table_name):
+                connection.executemany(sql, chunk)
+            connection.commit()
+    finally:
+        connection.close()
+
+
+def write_excel(generator: DatasetGenerator, path: str) -> None:
+    """Crea un libro Excel con una hoja por tabla (modo write_only de openpyxl)"""
+    workbook = Workbook(write_only=True)
+    for table_name, columns in COLUMNS.items():
+        sheet = workbook.create_sheet(table_name)
+        sheet.append(columns)
+        # Las fechas se guardan como celdas de fecha, igual que en db_gpc.xlsx
+        dates = [i for i, column in enumerate(columns) if column in DATE_COLUMNS]
+        for row in generator.rows(table_name):
+            if dates:
+                row = list(row)
+                for i in dates:
+                    row[i] = datetime.fromisoformat(row[i])
+            sheet.append(row)
+    workbook.save(path)
+
+
+def generate(scale: str, seed: int = 42, sqlite_path: str = None,
+             excel_path: str = None) -> Tuple[DatasetGenerator, Dict[str, int]]:
+    """Genera el conjunto de la escala indicada en los destinos pedidos"""
+    generator = DatasetGenerator(SCALES[scale], seed=seed)
+    if sqlite_path:
+        write_sqlite(generator, sqlite_path)
+    if excel_path:
+        write_excel(generator, excel_path)
+    return generator, generator.sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos")
+    parser.add_argument("--scale", choices=list(SCALES), default="1k",
+                        help="Número de reportes: 1k, 100k o 1m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sqlite", help="Ruta de la base SQLite a crear")
+    parser.add_argument("--excel", help="Ruta del libro Excel a crear")
+    args = parser.parse_args()
+    if not args.sqlite and not args.excel:
+        parser.error("Indique --sqlite y/o --excel")
+    _, sizes = generate(args.scale, args.seed, args.sqlite, args.excel)
+    print(", ".join(f"{table}: {count}" for table, count in sizes.items()))
@@ -0,0 +1,321 @@
+import os
+# Menos ruido en consola: la prueba de carga solo necesita advertencias y errores
+os.environ.setdefault("GAR_LOG_LEVEL", "WARNING")
+
+from typing import Any, Callable, Dict, List, Optional
+from contextlib import closing, contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import streamlit
+
+# shared_runtime depende de APIs internas de Streamlit validadas solo con esta versión
+SUPPORTED_STREAMLIT = "1.65"
+try:
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import patch_config_options
+except ImportError as e:
+    raise ImportError(
+        f"benchmarks.load requiere streamlit=={SUPPORTED_STREAMLIT}.* "
+        f"(instalada: {streamlit.__version__}): {e}") from e
+from benchmarks.generator import SCALES
+from benchmarks.run import DATA_DIR, RESULTS_DIR, _commit, copy_sqlite, prepare_dataset
+from database import DatabaseManager
+from instrumentation import PERCENTILES
+from page_timing import page_stats
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import time
+import pandas as pd
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+# Contraseña común mientras AuthManager no valide password_hash
+PASSWORD = "123456"
+PAGES = ["Dashboard", "Mis Actividades", "Mis Reportes", "Notificaciones"]
+
+
+def check_streamlit_version() -> None:
+    """Falla antes de iniciar la prueba si la versión de Streamlit no es la soportada"""
+    if streamlit.__version__.split(".")[:2] != SUPPORTED_STREAMLIT.split("."):
+        raise RuntimeError(
+            f"benchmarks.load requiere streamlit=={SUPPORTED_STREAMLIT}.* "
+            f"(instalada: {streamlit.__version__}); shared_runtime reemplaza "
+            "partes internas de AppTest que cambian entre versiones")
+
+
+@contextmanager
+def shared_runtime():
+    """Permite ejecutar varias sesiones de AppTest en paralelo dentro del proceso.
+
+    AppTest asume una sola prueba a la vez: cada ``run()`` instala un
+    ``Runtime`` simulado y la opción ``global.appTest`` y los retira al
+    terminar, lo que rompe las sesiones que siguen ejecutándose en otros
+    hilos. Aquí se instalan una sola vez para todo el ensayo, igual que en
+    el servidor (un proceso y un hilo de script por sesión).
+    """
+    check_streamlit_version()
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    registry = BidiComponentManager()
+    registry.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = registry
+    with patch_config_options({"global.appTest": True}), \
+            patch.object(app_test, "patch_config_options", lambda overrides: nullcontext()), \
+            patch.object(Runtime, "instance", classmethod(lambda cls: runtime)), \
+            patch.object(Runtime, "exists", classmethod(lambda cls: True)):
+        yield
+
+
+def _widget(elements, label: str):
+    """Primer control cuya etiqueta contiene ``label``"""
+    for element in elements:
+        if label in element.label:
+            return element
+    raise LookupError(f"No se encontró el control '{label}'")
+
+
+def employee_emails(path: str) -> List[str]:
+    """Correos de los colaboradores activos con al menos un contrato"""
+    with closing(sqlite3.connect(path)) as connection:
+        rows = connection.execute(
+            "SELECT e.correo FROM Empleados e "
+            "WHERE e.rol = 'empleado' AND e.activo = 1 AND EXISTS "
+            "(SELECT 1 FROM Contratos c WHERE c.id_empleado = e.id_empleado) "
+            "ORDER BY e.id_empleado").fetchall()
+    return [row[0] for row in rows]
+
+
+class VirtualUser:
+    """Sesión simulada de un colaborador: inicia sesión y alterna entre
+    páginas y registros de acciones.
+
+    Cada paso es una ejecución del script (como cada interacción en el
+    navegador) y se registra con su duración y el primer error mostrado.
+    """
+
+    def __init__(self, number: int, email: str, iterations: int, pause: float,
+                 timeout: float, seed: int, started: float) -> None:
+        self.number = number
+        self.email = email
+        self.iterations = iterations
+        self.pause = pause
+        self.timeout = timeout
+        self.started = started
+        self.rng = random.Random(f"{seed}:{number}")
+        self.records: List[Dict[str, Any]] = []
+        self.at: Optional[AppTest] = None
+
+    def _error(self) -> Optional[str]:
+        if self.at.exception:
+            return self.at.exception[0].message
+        if self.at.error:
+            return self.at.error[0].value
+        return None
+
+    def _step(self, name: str, action: Callable[[], Any]) -> bool:
+        start = time.perf_counter()
+        try:
+            action()
+            error = self._error()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self.records.append({
+            "usuario": self.number,
+            "paso": name,
+            "inicio_s": round(start - self.started, 3),
+            "duracion_ms": (time.perf_counter() - start) * 1000,
+            "error": error,
+        })
+        return error is None
+
+    def _think(self) -> None:
+        # Pausa entre interacciones; en promedio ``pause`` segundos
+        if self.pause:
+            time.sleep(self.rng.uniform(0, 2 * self.pause))
+
+    def _login(self) -> None:
+        _widget(self.at.text_input, "Correo").input(self.email)
+        _widget(self.at.text_input, "Contraseña").input(PASSWORD)
+        _widget(self.at.button, "Iniciar Sesión").click().run()
+        if "authenticated" not in self.at.session_state:
+            raise PermissionError(f"Inicio de sesión rechazado para {self.email}")
+
+    def _navigate(self, page: str) -> None:
+        _widget(self.at.sidebar.selectbox, "Seleccionar página").select(page).run()
+
+    def _choose(self, label: str) -> None:
+        selectbox = _widget(self.at.selectbox, label)
+        selectbox.select(self.rng.choice(selectbox.options)).run()
+
+    def _save_action(self, iteration: int) -> None:
+        _widget(self.at.text_area, "Acciones Realizadas").input(
+            f"Prueba de carga {self.number}-{iteration}")
+        _widget(self.at.slider, "Porcentaje").set_value(self.rng.randint(0, 100))
+        _widget(self.at.button, "Guardar Acción").click().run()
+
+    def run(self, delay: float) -> List[Dict[str, Any]]:
+        time.sleep(delay)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+        if not (self._step("carga", self.at.run) and self._step("login", self._login)):
+            return self.records
+        for iteration in range(self.iterations):
+            page = self.rng.choice(PAGES)
+            self._think()
+            steps = [
+                (f"página {page}", lambda: self._navigate(page)),
+                ("página Agregar Acción", lambda: self._navigate("Agregar Acción")),
+                ("seleccionar contrato", lambda: self._choose("Seleccionar Contrato")),
+                ("seleccionar actividad", lambda: self._choose("Seleccionar Actividad")),
+                ("guardar acción", lambda: self._save_action(iteration)),
+            ]
+            for name, action in steps:
+                if not self._step(name, action):
+                    # La sesión quedó en un estado desconocido
+                    return self.records
+                self._think()
+        return self.records
+
+
+def summarize(records: pd.DataFrame) -> pd.DataFrame:
+    """Percentiles de duración y errores por paso"""
+    grouped = records.groupby("paso")
+    result = grouped["duracion_ms"].quantile(list(PERCENTILES)).unstack()
+    result.columns = [f"p{int(q * 100)}_ms" for q in PERCENTILES]
+    result.insert(0, "pasos", grouped.size())
+    result.insert(1, "errores", grouped["error"].count())
+    result["max_ms"] = grouped["duracion_ms"].max()
+    return result.reset_index()
+
+
+def database_summary() -> Dict[str, Any]:
+    """Contención del pool de SQLite y percentiles de las operaciones del proceso"""
+    db = DatabaseManager()
+    operaciones = db.stats.percentiles()
+    if not operaciones.empty:
+        errores = db.stats.snapshot().groupby("operacion")["error"].sum()
+        operaciones["errores"] = operaciones["operacion"].map(errores).astype(int)
+    return {
+        "backend": db.backend,
+        "pool": db.sql_lite_pool.contention() if db.sql_lite_pool else None,
+        "operaciones": operaciones.round(3).to_dict("records"),
+    }
+
+
+def prepare_database(scale: str, seed: int, sqlite_path: str = None) -> str:
+    """Copia de trabajo de la base indicada o del conjunto sintético de la escala"""
+    if not sqlite_path:
+        return prepare_dataset(scale, seed, "sqlite")
+    os.makedirs(DATA_DIR, exist_ok=True)
+    working = os.path.join(DATA_DIR, "carga_trabajo.db")
+    copy_sqlite(sqlite_path, working)
+    return working
+
+
+def run(users: int, iterations: int, pause: float, ramp_up: float, timeout: float,
+        seed: int, path: str) -> Dict[str, Any]:
+    # app.py conecta con load_backend_settings(): solo SQLite, sobre la copia de trabajo
+    os.environ["GAR_DB_BACKENDS"] = "sqlite"
+    os.environ["GAR_DB_SQLITE_PATH"] = path
+    emails = employee_emails(path)
+    if not emails:
+        raise ValueError(f"{path} no tiene colaboradores activos con contratos")
+
+    started = time.perf_counter()
+    virtual_users = [
+        VirtualUser(i, emails[i % len(emails)], iterations, pause, timeout, seed, started)
+        for i in range(users)]
+    with shared_runtime(), ThreadPoolExecutor(max_workers=users,
+                                              thread_name_prefix="usuario") as executor:
+        futures = [executor.submit(user.run, i * ramp_up / users)
+                   for i, user in enumerate(virtual_users)]
+        records = [record for future in futures for record in future.result()]
+    elapsed = time.perf_counter() - started
+
+    df = pd.DataFrame(records)
+    ok = df[df["error"].isna()]
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "streamlit": streamlit.__version__,
+            "base": path,
+            "usuarios": users,
+            "colaboradores_distintos": min(users, len(emails)),
+            "iteraciones": iterations,
+            "pausa_s": pause,
+            "rampa_s": ramp_up,
+        },
+        "resumen": {
+            "duracion_s": round(elapsed, 3),
+            "pasos": len(df),
+            "pasos_con_error": int(df["error"].notna().sum()),
+            "pasos_por_s": round(len(ok) / elapsed, 3),
+            "acciones_guardadas": int((ok["paso"] == "guardar acción").sum()),
+            "acciones_por_s": round((ok["paso"] == "guardar acción").sum() / elapsed, 3),
+        },
+        "pasos": summarize(df).round(3).to_dict("records"),
+        "errores": df["error"].dropna().value_counts().head(10).to_dict(),
+        "base_de_datos": database_summary(),
+        "paginas": page_stats.summary().round(3).to_dict("records"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Prueba de carga de app.py con sesiones concurrentes de AppTest sobre SQLite")
+    parser.add_argument("--usuarios", type=int, default=20, help="Sesiones concurrentes")
+    parser.add_argument("--iteraciones", type=int, default=3,
+                        help="Ciclos de navegación y registro de acción por usuario")
+    parser.add_argument("--pausa", type=float, default=1.0,
+                        help="Pausa media entre interacciones, en segundos")
+    parser.add_argument("--rampa", type=float, default=10.0,
+                        help="Segundos en los que se reparten los inicios de sesión")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Tiempo máximo de cada ejecución del script")
+    parser.add_argument("--scale", choices=list(SCALES), default="1k",
+                        help="Escala del conjunto sintético (si no se indica --sqlite)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sqlite", help="Base SQLite a usar (se trabaja sobre una copia)")
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+    try:
+        check_streamlit_version()
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    # Streamlit advierte por cada elemento obsoleto en cada sesión; sus loggers
+    # tienen nivel propio, así que se ajustan uno por uno
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    path = prepare_database(args.scale, args.seed, args.sqlite)
+    report = run(args.usuarios, args.iteraciones, args.pausa, args.rampa, args.timeout,
+                 args.seed, path)
+
+    resumen = report["resumen"]
+    print(f"{args.usuarios} usuarios, {resumen['pasos']} pasos en {resumen['duracion_s']:.1f} s "
+          f"({resumen['pasos_con_error']} con error): {resumen['pasos_por_s']:.2f} pasos/s, "
+          f"{resumen['acciones_por_s']:.2f} acciones guardadas/s")
+    print(pd.DataFrame(report["pasos"]).round(1).to_string(index=False))
+    for error, veces in report["errores"].items():
+        print(f"  {veces} x {error}")
+    print(f"Pool de SQLite: {report['base_de_datos']['pool']}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"carga_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2, default=str)
+    print(f"Resultados: {output}")
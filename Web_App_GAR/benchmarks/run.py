@@ -0,0 +1,267 @@
+import os
+# Menos ruido en consola: los benchmarks solo necesitan advertencias y errores
+os.environ.setdefault("GAR_LOG_LEVEL", "WARNING")
+
+from typing import Any, Callable, Dict, List
+from contextlib import closing
+from datetime import datetime
+from benchmarks.generator import SCALES, generate
+from connection import load_backend_settings
+from database import DatabaseManager
+import argparse
+import json
+import logging
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import time
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Empleado y mes de referencia presentes en todas las escalas
+EMPLEADO = 2
+MES_INICIO = datetime(2025, 6, 1)
+MES_FIN = datetime(2025, 7, 1)
+
+# (nombre, función de la repetición i, leer sin caché)
+Case = tuple
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=BENCH_DIR).stdout.strip()
+    except Exception:
+        return "desconocido"
+
+
+def _rows(result: Any) -> int:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(_rows(value) for value in result.values())
+    if isinstance(result, list):
+        return sum(result) if result and isinstance(result[0], bool) else len(result)
+    if isinstance(result, (int, bool)):
+        return int(result)
+    return 0
+
+
+def copy_sqlite(source: str, target: str) -> None:
+    """Copia una base SQLite con la API de backup (incluye el WAL pendiente del origen).
+
+    Los ``-wal``/``-shm`` de una copia de trabajo anterior se eliminan antes:
+    SQLite los aplicaría sobre el archivo nuevo.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+    with closing(sqlite3.connect(source)) as origin, closing(sqlite3.connect(target)) as copy:
+        origin.backup(copy)
+
+
+def prepare_dataset(scale: str, seed: int, backend: str) -> str:
+    """Genera (una sola vez) el conjunto de la escala y retorna una copia de trabajo"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    extension = "db" if backend == "sqlite" else "xlsx"
+    master = os.path.join(DATA_DIR, f"{scale}_{seed}.{extension}")
+    if not os.path.exists(master):
+        print(f"Generando {master}...")
+        generate(scale, seed, **({"sqlite_path": master} if backend == "sqlite" else {"excel_path": master}))
+        if backend == "sqlite":
+            # Migraciones y ResumenMensual se aplican sobre la copia maestra
+            DatabaseManager().connect_to_sql_lite(master)
+    # Las escrituras del benchmark no deben modificar la copia maestra
+    working = os.path.join(DATA_DIR, f"{scale}_{seed}_trabajo.{extension}")
+    if backend == "sqlite":
+        copy_sqlite(master, working)
+    else:
+        shutil.copyfile(master, working)
+    return working
+
+
+def read_cases(db: DatabaseManager) -> List[Case]:
+    """Rutas de lectura principales, medidas sin caché"""
+    def dashboard_metrics(_):
+        return db.get_many({
+            'empleados': db.query('Empleados').aggregate(
+                total=('count', '*'), activos=('count', '*', {'activo': True})),
+            'actividades': db.query('Actividades').aggregate(total=('count', '*')),
+            'reportes': db.query('Reportes').date_range(
+                'fecha', MES_INICIO, MES_FIN).aggregate(total=('count', '*')),
+        })
+
+    def cumplimiento(_):
+        return db.query('Reportes', 'r') \
+            .select('c.nombre_contrato', 'e.nombre AS empleado', 'a.Nro', 'r.fecha', 'r.porcentaje') \
+            .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a') \
+            .join('Contratos', ('a.id_contrato', 'c.id_contrato'), alias='c') \
+            .join('Empleados', ('r.id_empleado', 'e.id_empleado'), alias='e') \
+            .where('r.id_empleado', '=', EMPLEADO) \
+            .order_by('r.fecha DESC').limit(100).fetch()
+
+    return [
+        ("get_data Empleados", lambda _: db.get_data('Empleados'), True),
+        ("get_data Reportes página", lambda _: db.get_data(
+            'Reportes', {'id_empleado': EMPLEADO}, limit=50, order_by='fecha DESC'), True),
+        ("get_data Reportes completo", lambda _: db.get_data('Reportes'), True),
+        ("count Reportes", lambda _: db.count('Reportes', {'id_empleado': EMPLEADO}), True),
+        ("get_many métricas del dashboard", dashboard_metrics, True),
+        ("get_activity_status", lambda _: db.get_activity_status(EMPLEADO, MES_INICIO, MES_FIN), True),
+        ("fetch cumplimiento (JOIN)", cumplimiento, True),
+        ("iter_data Reportes", lambda _: sum(
+            len(chunk) for chunk in db.iter_data('Reportes', chunk_size=10000)), True),
+        ("get_data Reportes (caché)", lambda _: db.get_data(
+            'Reportes', {'id_empleado': EMPLEADO}, limit=50, order_by='fecha DESC'), False),
+    ]
+
+
+def write_cases(db: DatabaseManager) -> List[Case]:
+    """Rutas de escritura; cada repetición escribe filas distintas"""
+    def reporte(i):
+        return {'id_empleado': EMPLEADO, 'id_actividad': 1, 'fecha': MES_INICIO,
+                'acciones_realizadas': f"Benchmark {i}", 'comentarios': "",
+                'porcentaje': 50, 'entregable': f"bench_{i}.pdf", 'estado': True}
+
+    def notificaciones(i, n):
+        return [{'id_empleado': EMPLEADO, 'mensaje': f"bench-{i}-{j}",
+                 'fecha_envio': MES_INICIO, 'leido': False} for j in range(n)]
+
+    def delete_many(i):
+        db.insert_many('Notificaciones', notificaciones(f"d{i}", 100))
+        return db.delete_many('Notificaciones', [
+            {'mensaje': f"bench-d{i}-{j}"} for j in range(100)])
+
+    return [
+        ("insert_data Reportes", lambda i: db.insert_data('Reportes', reporte(i)), False),
+        ("update_data Actividades", lambda i: db.update_data(
+            'Actividades', {'porcentaje': 10 + i % 90}, {'id_actividad': 1}), False),
+        ("insert_many Notificaciones x1000", lambda i: db.insert_many(
+            'Notificaciones', notificaciones(i, 1000)), False),
+        ("insert_many + delete_many Notificaciones x100", delete_many, False),
+    ]
+
+
+def page_cases(db: DatabaseManager) -> List[Case]:
+    """Páginas principales ejecutadas sin servidor de Streamlit (modo bare)"""
+    cases = []
+    admin_data = {'id_empleado': 1, 'nombre': "Administrador", 'correo': "usuario1@example.com",
+                  'rol': "administrador"}
+    empleado_data = {'id_empleado': EMPLEADO, 'nombre': "Empleado",
+                     'correo': f"usuario{EMPLEADO}@example.com", 'rol': "empleado"}
+    try:
+        from admin_interface import AdminInterface
+        admin = AdminInterface(db, admin_data)
+        cases += [("página AdminInterface.show_dashboard", lambda _: admin.show_dashboard(), True),
+                  ("página AdminInterface.manage_reports", lambda _: admin.manage_reports(), True)]
+    except Exception as e:
+        print(f"Se omiten las páginas de administrador: {e}")
+    try:
+        from employee_interface import EmployeeInterface
+        empleado = EmployeeInterface(db, empleado_data)
+        cases += [("página EmployeeInterface.show_dashboard", lambda _: empleado.show_dashboard(), True),
+                  ("página EmployeeInterface.show_my_reports", lambda _: empleado.show_my_reports(), True)]
+    except Exception as e:
+        print(f"Se omiten las páginas de colaborador: {e}")
+    return cases
+
+
+def measure(db: DatabaseManager, name: str, func: Callable[[int], Any], cold: bool,
+            repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Ejecuta el caso ``warmup + repeat`` veces y resume los tiempos de las repeticiones"""
+    times = []
+    rows = 0
+    error = None
+    for i in range(warmup + repeat):
+        if cold:
+            db.cache.clear()
+        start = time.perf_counter()
+        try:
+            result = func(i)
+        except Exception as e:
+            error = str(e)
+            break
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            times.append(elapsed)
+            rows = _rows(result)
+    if not times:
+        return {"caso": name, "error": error or "sin repeticiones"}
+    ordered = sorted(times)
+    return {
+        "caso": name,
+        "sin_cache": cold,
+        "repeticiones": len(times),
+        "filas": rows,
+        "min_ms": round(ordered[0], 3),
+        "mediana_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "media_ms": round(statistics.fmean(ordered), 3),
+        **({"error": error} if error else {}),
+    }
+
+
+def run(scale: str, backends: List[str], repeat: int, seed: int, pages: bool) -> Dict[str, Any]:
+    db = DatabaseManager()
+    settings = load_backend_settings()
+    results = []
+    sizes = None
+    for backend in backends:
+        path = prepare_dataset(scale, seed, backend)
+        db.connect(dict(settings, backends=[backend],
+                        sqlite_path=path, excel_path=path))
+        db.enable_arrow_fetch(False)
+        sizes = {table: db.count(table) for table in
+                 ("Empleados", "Contratos", "Actividades", "Notificaciones", "Reportes")}
+        cases = read_cases(db) + (page_cases(db) if pages else []) + write_cases(db)
+        for name, func, cold in cases:
+            result = measure(db, name, func, cold, repeat)
+            result["backend"] = backend
+            results.append(result)
+            status = result.get("error") or f"{result['mediana_ms']:.1f} ms (mediana)"
+            print(f"[{backend}] {name}: {status}")
+        if db.excel_writer is not None:
+            db.excel_writer.flush()
+    db.close_connection()
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "escala": scale,
+            "semilla": seed,
+            "tablas": sizes,
+            "repeticiones": repeat,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+        },
+        "resultados": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de DatabaseManager y de las páginas")
+    parser.add_argument("--scale", choices=list(SCALES), default="1k")
+    parser.add_argument("--backend", choices=["sqlite", "excel", "ambos"], default="sqlite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sin-paginas", action="store_true",
+                        help="No medir las funciones de página")
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    # Streamlit advierte en cada llamada sin servidor (modo bare)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    backends = ["sqlite", "excel"] if args.backend == "ambos" else [args.backend]
+    report = run(args.scale, backends, args.repeat, args.seed, not args.sin_paginas)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['commit']}_{args.scale}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+    print(f"Resultados: {output}")
@@ -0,0 +1,115 @@
+from logger import setup_logging
+from typing import Any, Callable, Dict, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+logger = setup_logging()
+
+
+def freeze(value: Any) -> Any:
+    """Convierte dicts, listas y sets en tuplas para usarlos como clave de caché"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return tuple(sorted(freeze(v) for v in value))
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+class _InFlight:
+    """Carga en curso compartida por los hilos que piden la misma clave"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TableCache:
+    """Caché de consultas con una versión por tabla.
+
+    Cada entrada guarda las versiones de las tablas de las que depende;
+    ``invalidate(tabla)`` incrementa la versión de esa tabla y descarta
+    solo sus entradas; ``clear()`` incrementa la generación y con ello
+    invalida todas. Si varios hilos piden la misma clave a la vez, solo
+    uno ejecuta la consulta y los demás esperan su resultado.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 512) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        self._generation = 0
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[tuple, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, table_name: str) -> int:
+        return self._versions.get(table_name, 0)
+
+    def _make_key(self, tables: Tuple[str, ...], key: Any) -> tuple:
+        return (tables, self._generation, tuple(self.version(t) for t in tables), freeze(key))
+
+    def get_or_load(self, tables, key: Any, loader: Callable[[], Any],
+                    cache_if: Callable[[Any], bool] = None) -> Any:
+        """Retorna el valor en caché o lo carga una sola vez con ``loader``"""
+        tables = (tables,) if isinstance(tables, str) else tuple(tables)
+        with self._lock:
+            cache_key = self._make_key(tables, key)
+            entry = self._entries.get(cache_key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            inflight = self._inflight.get(cache_key)
+            owner = inflight is None
+            if owner:
+                inflight = _InFlight()
+                self._inflight[cache_key] = inflight
+
+        if not owner:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.value
+
+        try:
+            inflight.value = loader()
+        except Exception as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+                current = self._make_key(tables, key) == cache_key
+                if inflight.error is None and current and (cache_if is None or cache_if(inflight.value)):
+                    # Solo se guarda si ninguna tabla cambió (ni se vació la caché) durante la carga
+                    self._entries[cache_key] = (time.monotonic(), inflight.value)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            inflight.done.set()
+        return inflight.value
+
+    def invalidate(self, tables) -> None:
+        """Incrementa la versión de las tablas y descarta sus entradas"""
+        tables = (tables,) if isinstance(tables, str) else tuple(tables)
+        with self._lock:
+            for table_name in tables:
+                self._versions[table_name] = self.version(table_name) + 1
+            stale = [k for k in self._entries if set(k[0]) & set(tables)]
+            for k in stale:
+                del self._entries[k]
+        logger.debug(f"Caché invalidada para {', '.join(tables)}")
+
+    def clear(self) -> None:
+        """Descarta todas las entradas e invalida las cargas en curso (p. ej. al cambiar de backend)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
@@ -0,0 +1,149 @@
+from logger import setup_logging
+from typing import Any, Dict, Optional
+import streamlit as st
+import os
+import threading
+import time
+
+logger = setup_logging()
+
+# Backends en el orden por defecto: el primero es el principal
+BACKENDS = ("sqlserver", "sqlite", "excel")
+
+# Valores por defecto; cada clave se puede definir en la sección [database]
+# de .streamlit/secrets.toml o con la variable de entorno GAR_DB_<CLAVE>
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "backends": "sqlserver,sqlite,excel",
+    "server": "P18PPAD20\\SQLEXPRESS",
+    "database": "db_gpc",
+    "username": None,
+    "password": None,
+    "login_timeout": 5,
+    "sqlite_path": "db_gpc.db",
+    "excel_path": "Basedatos.xlsx",
+    "cooldown": 60,
+    "health_check_interval": 30,
+    "slow_query_ms": 500,
+    "arrow_fetch": False,
+}
+INT_SETTINGS = ("login_timeout", "cooldown", "health_check_interval", "slow_query_ms")
+BOOL_SETTINGS = ("arrow_fetch",)
+
+
+def _secrets_section() -> Dict[str, Any]:
+    """Sección [database] de los secretos de Streamlit, si existe"""
+    try:
+        return dict(st.secrets.get("database", {}))
+    except Exception:
+        # Sin secrets.toml Streamlit lanza una excepción al leerlos
+        return {}
+
+
+def load_backend_settings() -> Dict[str, Any]:
+    """Configuración de conexión: secretos de Streamlit, variables de entorno y valores por defecto"""
+    secrets = _secrets_section()
+    settings = {}
+    for key, default in DEFAULT_SETTINGS.items():
+        value = secrets.get(key, os.environ.get(f"GAR_DB_{key.upper()}", default))
+        if key in INT_SETTINGS:
+            value = int(value)
+        elif key in BOOL_SETTINGS and isinstance(value, str):
+            value = value.strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+        settings[key] = value
+    backends = settings["backends"]
+    if isinstance(backends, str):
+        backends = backends.split(",")
+    settings["backends"] = [b.strip().lower() for b in backends
+                            if b.strip().lower() in BACKENDS]
+    if not settings["backends"]:
+        logger.warning("GAR_DB_BACKENDS no contiene backends válidos; se usa Excel")
+        settings["backends"] = ["excel"]
+    return settings
+
+
+class CircuitBreaker:
+    """Recuerda los backends que fallaron al conectar durante ``cooldown`` segundos.
+
+    Mientras el circuito de un backend está abierto no se vuelve a
+    intentar la conexión, de modo que una sesión nueva no espera el
+    tiempo de espera de un servidor que se sabe caído. Es compartido por
+    todo el proceso.
+    """
+
+    def __init__(self, cooldown: float = 60, failure_threshold: int = 1) -> None:
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, backend: str) -> bool:
+        """Indica si se puede intentar conectar (circuito cerrado o cooldown cumplido)"""
+        with self._lock:
+            opened_at = self._opened_at.get(backend)
+            return opened_at is None or time.monotonic() - opened_at >= self.cooldown
+
+    def remaining(self, backend: str) -> float:
+        """Segundos que faltan para volver a intentar el backend"""
+        with self._lock:
+            opened_at = self._opened_at.get(backend)
+            if opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - opened_at))
+
+    def record_success(self, backend: str) -> None:
+        with self._lock:
+            self._failures.pop(backend, None)
+            self._opened_at.pop(backend, None)
+
+    def record_failure(self, backend: str) -> None:
+        with self._lock:
+            failures = self._failures.get(backend, 0) + 1
+            self._failures[backend] = failures
+            if failures >= self.failure_threshold:
+                self._opened_at[backend] = time.monotonic()
+        if failures >= self.failure_threshold:
+            logger.warning(
+                f"Backend {backend} deshabilitado por {self.cooldown:.0f} s tras {failures} fallo(s)")
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Estado por backend: fallos acumulados y segundos restantes de cooldown"""
+        with self._lock:
+            backends = set(self._failures) | set(self._opened_at)
+        return {backend: {"fallos": self._failures.get(backend, 0),
+                          "cooldown_restante": round(self.remaining(backend), 1)}
+                for backend in sorted(backends)}
+
+
+class HealthCheck:
+    """Hilo en segundo plano que vuelve al backend principal cuando se recupera"""
+
+    def __init__(self, db_manager, interval: float = 30) -> None:
+        self.db = db_manager
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="db-health-check", daemon=True)
+        self._thread.start()
+        logger.info(f"Verificación de salud de la base de datos cada {self.interval} s")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.db.try_primary_backend()
+            except Exception as e:
+                logger.error(f"Error en la verificación de salud: {e}")
+
@@ -1,10 +1,25 @@
 from logger import setup_logging
+from excel_store import ExcelColumnarCache, ExcelWriteBuffer, iter_excel_sheet
+from cache import TableCache
+from connection import CircuitBreaker, HealthCheck, load_backend_settings
+from instrumentation import QueryStats, frame_bytes
+from migrations import MigrationRunner
+from rollup import MonthlySummary
+from query_builder import Query, to_db_value, to_positional, validate_identifier
+from table_schema import apply_schema, arrow_to_pandas, cast_arrow, iter_frames, materialize
 import streamlit as st
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Union
 import pandas as pd
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import URL
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
 import sqlite3
 
 logger = setup_logging()
@@ -18,6 +33,287 @@ except ImportError:
         "pyodbc no está disponible. Solo se usará Excel como fuente de datos.")
     st.warning(
         "pyodbc no está disponible. Solo se usará Excel como fuente de datos.")
+# Drivers columnares opcionales: resultados como tablas Apache Arrow
+try:
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+    ADBC_SQLITE_AVAILABLE = True
+except ImportError:
+    ADBC_SQLITE_AVAILABLE = False
+try:
+    import pyarrow as pa
+    from arrow_odbc import read_arrow_batches_from_odbc, enable_odbc_connection_pooling
+    ARROW_ODBC_AVAILABLE = True
+except ImportError:
+    ARROW_ODBC_AVAILABLE = False
+if ARROW_ODBC_AVAILABLE:
+    try:
+        # El driver manager reutiliza las conexiones ODBC entre lecturas Arrow;
+        # debe activarse antes de abrir la primera conexión
+        enable_odbc_connection_pooling()
+    except Exception as e:
+        logger.warning(f"No se pudo activar el pool de conexiones ODBC: {e}")
+
+
+@contextmanager
+def script_run_ctx(ctx):
+    """Asocia ``ctx`` al hilo actual durante el bloque y luego restaura el anterior.
+
+    Los hilos del executor se comparten entre sesiones: sin la
+    restauración, un hilo conservaría el contexto de la última sesión que
+    lo usó y las llamadas ``st.*`` posteriores irían a esa sesión.
+    """
+    thread = threading.current_thread()
+    previous = getattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+    if ctx is not None:
+        add_script_run_ctx(thread, ctx)
+    try:
+        yield
+    finally:
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous)
+
+
+class SQLiteConnectionPool:
+    """Pool de conexiones SQLite acotado y seguro entre hilos.
+
+    Cada hilo recibe una conexión propia mientras la usa (las llamadas
+    anidadas del mismo hilo reutilizan la misma conexión) y al terminar
+    la devuelve al pool para que otro hilo la aproveche. Las conexiones
+    inactivas se validan con ``SELECT 1`` antes de reutilizarlas.
+    ``contention()`` resume las esperas por cupo en el pool y los errores
+    "database is locked" de SQLite.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_connections: int = 10,
+        timeout: float = 30.0,
+        busy_timeout_ms: int = 5000,
+        cache_size_kib: int = 20000,
+        mmap_size: int = 256 * 1024 * 1024,
+        health_check_interval: float = 30.0
+    ) -> None:
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()
+        self._arrow_idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self._draining = False
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._timeouts = 0
+        self._lock_errors = 0
+
+    def _pragmas(self) -> List[str]:
+        """PRAGMA de rendimiento que se aplican a cada conexión nueva"""
+        return [
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            # Un valor negativo indica el tamaño de la caché en KiB
+            f"PRAGMA cache_size=-{int(self.cache_size_kib)}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+        ]
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Abre una conexión nueva con los PRAGMA de rendimiento"""
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False
+        )
+        for pragma in self._pragmas():
+            connection.execute(pragma)
+        with self._lock:
+            self._created += 1
+        logger.debug(
+            f"Nueva conexión SQLite abierta ({self._created}/{self.max_connections})")
+        return connection
+
+    def _discard(self, connection: sqlite3.Connection) -> None:
+        """Cierra una conexión y libera su lugar en el pool"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def _is_healthy(self, connection: sqlite3.Connection) -> bool:
+        """Verifica que la conexión siga respondiendo"""
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except Exception as e:
+            logger.warning(f"Conexión SQLite descartada: {e}")
+            return False
+
+    def _checkout(self) -> sqlite3.Connection:
+        """Obtiene una conexión inactiva o crea una si hay cupo"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("El pool de SQLite está cerrado")
+        if not self._slots.acquire(blocking=False):
+            # Pool agotado: se mide cuánto espera el hilo por un cupo
+            start = time.perf_counter()
+            acquired = self._slots.acquire(timeout=self.timeout)
+            waited_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._waits += 1
+                self._wait_ms += waited_ms
+                self._max_wait_ms = max(self._max_wait_ms, waited_ms)
+            if not acquired:
+                with self._lock:
+                    self._timeouts += 1
+                raise TimeoutError(
+                    "No hay conexiones SQLite disponibles en el pool")
+        with self._lock:
+            self._checkouts += 1
+        try:
+            while True:
+                try:
+                    connection, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create_connection()
+                if (time.monotonic() - last_used < self.health_check_interval
+                        or self._is_healthy(connection)):
+                    return connection
+                self._discard(connection)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, connection: sqlite3.Connection) -> None:
+        """Devuelve la conexión al pool"""
+        if self._closed or self._draining or connection.in_transaction:
+            # Una transacción abierta indica un error no controlado
+            self._discard(connection)
+        else:
+            self._idle.put((connection, time.monotonic()))
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Entrega la conexión del hilo actual mientras dure el bloque"""
+        current = getattr(self._local, "connection", None)
+        if current is not None:
+            self._local.depth += 1
+            try:
+                yield current
+            finally:
+                self._local.depth -= 1
+            return
+
+        connection = self._checkout()
+        self._local.connection = connection
+        self._local.depth = 1
+        try:
+            yield connection
+        except sqlite3.OperationalError as e:
+            # Otra conexión retuvo el bloqueo de escritura más allá de busy_timeout
+            if "locked" in str(e):
+                with self._lock:
+                    self._lock_errors += 1
+            raise
+        finally:
+            self._local.connection = None
+            self._local.depth = 0
+            self._checkin(connection)
+
+    def _create_arrow_connection(self):
+        """Abre una conexión ADBC con los mismos PRAGMA que las de sqlite3"""
+        # Sin autocommit la lectura dejaría abierta una transacción con una
+        # instantánea vieja del WAL
+        connection = adbc_sqlite.connect(self.db_path, autocommit=True)
+        with connection.cursor() as cursor:
+            for pragma in self._pragmas():
+                cursor.execute(pragma)
+                cursor.fetchall()
+        logger.debug("Nueva conexión ADBC de SQLite abierta")
+        return connection
+
+    @contextmanager
+    def arrow_connection(self):
+        """Presta una conexión ADBC (lectura Arrow); ocupa un cupo del pool mientras dure el bloque"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("El pool de SQLite está cerrado")
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError("No hay conexiones SQLite disponibles en el pool")
+        try:
+            try:
+                connection = self._arrow_idle.get_nowait()
+            except queue.Empty:
+                connection = self._create_arrow_connection()
+            reusable = False
+            try:
+                yield connection
+                reusable = True
+            finally:
+                if reusable and not (self._closed or self._draining):
+                    self._arrow_idle.put(connection)
+                else:
+                    self._close_arrow(connection)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _close_arrow(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _close_idle(self) -> None:
+        """Cierra las conexiones inactivas de sqlite3 y de ADBC"""
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+        while True:
+            try:
+                self._close_arrow(self._arrow_idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def contention(self) -> Dict[str, Any]:
+        """Préstamos, esperas por cupo y errores de bloqueo desde que se creó el pool"""
+        with self._lock:
+            return {
+                "conexiones": self._created,
+                "max_conexiones": self.max_connections,
+                "prestamos": self._checkouts,
+                "esperas": self._waits,
+                "espera_total_ms": round(self._wait_ms, 3),
+                "espera_max_ms": round(self._max_wait_ms, 3),
+                "esperas_agotadas": self._timeouts,
+                "errores_bloqueo": self._lock_errors,
+            }
+
+    def drain(self) -> None:
+        """Cierra las conexiones inactivas; las prestadas se cierran al devolverse"""
+        self._draining = True
+        self._close_idle()
+        logger.info("Pool de SQLite en cierre: se descartan las conexiones al devolverse.")
+
+    def close_all(self) -> None:
+        """Cierra todas las conexiones inactivas y bloquea nuevos préstamos"""
+        self._closed = True
+        self._close_idle()
+        logger.info("Pool de SQLite cerrado.")
 
 
 class DatabaseManager:
@@ -35,33 +331,60 @@ class DatabaseManager:
         self.path = excel_path or "Basedatos.xlsx"
         self.use_excel = False
         self.sql_engine = None
-        self.sql_lite_connection = None
-        self.cursor = None
+        self.sql_lite_pool = None
+        self.odbc_connection_string = None
+        self.arrow_fetch = False
+        self.arrow_fetch_requested = False
+        self.settings = None
+        self.breaker = CircuitBreaker()
+        self.health_check = None
+        self.excel_cache = None
+        self.excel_writer = None
+        self.cache = TableCache(ttl=300)
+        self.stats = QueryStats()
+        self.summary = MonthlySummary(self)
+        self.executor = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="db-prefetch")
+        # Serializa los cambios de backend (reconexión de la app y health check)
+        self._switch_lock = threading.RLock()
         logger.info("DatabaseManager inicializado.")
         self._initialized = True
 
-    def connect_to_sql_lite(self, db_path: str = "db_gpc.db") -> bool:
-        """Intenta conectar a SQLite"""
-        self.path = db_path
+    def connect_to_sql_lite(self, db_path: str = "db_gpc.db", max_connections: int = 10) -> bool:
+        """Intenta conectar a SQLite usando un pool de conexiones persistente"""
         if not os.path.exists(db_path):
-            logger.error(f"Archivo SQLite no encontrado: {self.path}")
-            st.warning(f"Archivo SQLite no encontrado: {self.path}")
+            logger.error(f"Archivo SQLite no encontrado: {db_path}")
             return False
-        try:
-            self.sql_lite_connection = sqlite3.connect(self.path)
-            with self.sql_lite_connection:
-                self.sql_lite_connection.execute("SELECT 1")
-                logger.info("Conexión exitosa a SQLite")
-                # st.success("Conexión exitosa a SQLite")
-                self.use_excel = False
-                self.sql_engine = None
+        with self._switch_lock:
+            current = self.sql_lite_pool
+            if current and current.db_path == db_path and not self.sql_engine:
+                if self.use_excel:
+                    self.use_excel = False
+                    self._backend_changed()
                 return True
-        except Exception as e:
-            logger.error(f"Error conectando a SQLite: {e}")
-            st.error(f"Error conectando a SQLite: {e}")
-            self.sql_lite_connection = None
-            self.cursor = None
-            return False
+            try:
+                pool = SQLiteConnectionPool(db_path, max_connections=max_connections)
+                with pool.connection() as connection:
+                    connection.execute("SELECT 1")
+            except Exception as e:
+                logger.error(f"Error conectando a SQLite: {e}")
+                return False
+            # El pool nuevo queda visible antes de retirar el backend anterior:
+            # ``backend`` nunca ve un estado sin conexión durante el cambio
+            old_engine = self.sql_engine
+            self.sql_lite_pool = pool
+            self.path = db_path
+            self.sql_engine = None
+            self.use_excel = False
+            logger.info("Conexión exitosa a SQLite")
+            if current is not None and current is not pool:
+                # Los hilos con una conexión prestada terminan su consulta
+                current.drain()
+            if old_engine is not None:
+                old_engine.dispose()
+            self.migrate()
+            self._backend_changed()
+            return True
 
     def connect_to_sql_server(
         self,
@@ -69,17 +392,14 @@ class DatabaseManager:
         database: str = "db_gpc",
         port: Optional[int] = 1433,
         username: str = None,
-        password: str = None
+        password: str = None,
+        login_timeout: int = 5
     ) -> bool:
-        """Intenta conectar a SQL Server"""
+        """Intenta conectar a SQL Server; ``login_timeout`` acota la espera si el host no responde"""
         logger.info("Intenta conectar a SQL Server")
         if not PYODBC_AVAILABLE:
-            st.write(
-                "pyodbc no está disponible. Usando archivo Excel como fallback")
-            print("pyodbc no está disponible. Usando archivo Excel como fallback")
             logger.info(
                 "pyodbc no está disponible. Usando archivo Excel como fallback")
-            self.use_excel = True
             return False
 
         try:
@@ -98,133 +418,684 @@ class DatabaseManager:
             logger.info(f"connection_string: {connection_string}")
             print("connection_string:", connection_string)
 
-            # Crear motor SQLAlchemy
-            self.sql_engine = create_engine(
+            # Crear motor SQLAlchemy; ``timeout`` es el tiempo de espera de login de pyodbc
+            engine = create_engine(
                 f"mssql+pyodbc:///?odbc_connect={connection_string}",
+                connect_args={"timeout": login_timeout},
+                fast_executemany=True,
+                pool_pre_ping=True,
                 pool_size=5,
                 max_overflow=10,
                 pool_timeout=30
             )
 
-            # Probar la conexión
-            with self.sql_engine.connect() as connection:
-                connection.execute(text("SELECT 1"))
-                print("Conexión exitosa a SQL Server usando SQLAlchemy")
-                st.write("Conexión exitosa a SQL Server usando SQLAlchemy")
+            # Probar la conexión antes de dejar el motor como activo
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception:
+                engine.dispose()
+                raise
+            logger.info("Conexión exitosa a SQL Server usando SQLAlchemy")
+            with self._switch_lock:
+                # El motor nuevo queda visible antes de retirar el backend anterior
+                old_engine, old_pool = self.sql_engine, self.sql_lite_pool
+                self.sql_engine = engine
+                self.odbc_connection_string = connection_string
                 self.path = "MSSQL Server"
                 self.use_excel = False
-                return True
+                self.sql_lite_pool = None
+                if old_pool is not None:
+                    # Las conexiones prestadas se descartan al devolverse
+                    old_pool.drain()
+                if old_engine is not None and old_engine is not engine:
+                    old_engine.dispose()
+                self.migrate()
+                self._backend_changed()
+            return True
 
         except Exception as e:
             print(f"Error conectando a SQL Server con SQLAlchemy: {e}")
             logger.error(f"Error de conexión: {e}")
-            self.sql_engine = None
             return False
 
-    def get_data(self, table_name: str, filters: dict = None, limit: int = None) -> pd.DataFrame:
-        """Obtiene datos de la tabla especificada con opciones de filtrado"""
+    def connect_to_excel(self, excel_path: str = None) -> bool:
+        """Usa el archivo Excel como base de datos"""
+        with self._switch_lock:
+            self.path = excel_path or self.path
+            self.use_excel = True
+            self._backend_changed()
+        logger.info(f"Usando archivo Excel como base de datos: {self.path}")
+        return True
+
+    def _backend_changed(self) -> None:
+        """Descarta los resultados en caché del backend anterior y recalcula la lectura Arrow"""
+        self.enable_arrow_fetch(self.arrow_fetch_requested)
+
+    def _sqlite_connection(self):
+        """Conexión del pool SQLite activo, leído una sola vez (puede cambiar en otro hilo)"""
+        pool = self.sql_lite_pool
+        if pool is None:
+            raise sqlite3.ProgrammingError("No hay conexión a SQLite")
+        return pool.connection()
+
+    def _sql_connection(self, begin: bool = False):
+        """Conexión del motor SQL Server activo, leído una sola vez (puede cambiar en otro hilo)"""
+        engine = self.sql_engine
+        if engine is None:
+            raise RuntimeError("No hay conexión a SQL Server")
+        return engine.begin() if begin else engine.connect()
+
+    @property
+    def backend(self) -> Optional[str]:
+        """Backend activo: 'sqlserver', 'sqlite', 'excel' o None"""
+        if self.use_excel:
+            return "excel"
+        if self.sql_engine:
+            return "sqlserver"
+        if self.sql_lite_pool:
+            return "sqlite"
+        return None
+
+    def connect(self, settings: Dict[str, Any] = None) -> Optional[str]:
+        """Conecta al primer backend configurado que responda; retorna su nombre.
+
+        Los backends con el circuito abierto (fallaron hace menos de
+        ``cooldown`` segundos) se omiten sin intentar la conexión.
+        """
+        self.settings = settings or load_backend_settings()
+        self.breaker.cooldown = self.settings["cooldown"]
+        self.stats.slow_threshold_ms = self.settings["slow_query_ms"]
+        for backend in self.settings["backends"]:
+            if self._connect_backend(backend):
+                return backend
+        logger.error("No se pudo conectar a ningún backend configurado")
+        return None
+
+    def _connect_backend(self, backend: str) -> bool:
+        """Intenta conectar a un backend respetando el circuit breaker"""
+        if not self.breaker.allow(backend):
+            logger.info(
+                f"Se omite {backend}: circuito abierto ({self.breaker.remaining(backend):.0f} s restantes)")
+            return False
+        if backend == "sqlserver":
+            connected = self.connect_to_sql_server(
+                server=self.settings["server"],
+                database=self.settings["database"],
+                username=self.settings["username"],
+                password=self.settings["password"],
+                login_timeout=self.settings["login_timeout"])
+        elif backend == "sqlite":
+            connected = self.connect_to_sql_lite(self.settings["sqlite_path"])
+        else:
+            connected = self.connect_to_excel(self.settings["excel_path"])
+        if connected:
+            self.breaker.record_success(backend)
+        else:
+            self.breaker.record_failure(backend)
+        return connected
+
+    def try_primary_backend(self) -> bool:
+        """Vuelve al backend principal si no es el activo y ya responde"""
+        if not self.settings:
+            return False
+        primary = self.settings["backends"][0]
+        current = self.backend
+        if current == primary:
+            return True
+        if not self.breaker.allow(primary):
+            return False
+        with self._switch_lock:
+            if current == "excel" and self.excel_writer is not None:
+                self.excel_writer.flush()
+            if not self._connect_backend(primary):
+                return False
+        logger.info(f"Backend principal {primary} recuperado (antes: {current})")
+        return True
+
+    def start_health_check(self, interval: float = None) -> None:
+        """Inicia la verificación periódica del backend principal"""
+        if self.health_check is None:
+            interval = interval or (self.settings or {}).get("health_check_interval", 30)
+            self.health_check = HealthCheck(self, interval)
+        self.health_check.start()
+
+    def migrate(self) -> bool:
+        """Aplica las migraciones de esquema pendientes del backend activo"""
+        if self.use_excel:
+            return True
         try:
-            if self.use_excel:
-                return self._get_data_from_excel(table_name)
-            elif self.sql_engine:
-                return self._get_data_from_sql(table_name, filters, limit)
-            elif self.sql_lite_connection:
-                return self._get_data_from_sql_lite(table_name, filters, limit)
+            runner = MigrationRunner(self.dialect)
+            if self.sql_engine:
+                applied = runner.run_sql_server(self.sql_engine)
+            elif self.sql_lite_pool:
+                with self._sqlite_connection() as connection:
+                    applied = runner.run_sqlite(connection)
             else:
-                logger.warning("No hay conexión a base de datos.")
-                st.warning("No hay conexión a ninguna base de datos.")
-                return pd.DataFrame()
+                return False
+            if applied:
+                logger.info(
+                    f"Esquema actualizado a la versión {runner.latest_version}")
+                # Una migración puede cambiar las tablas de las que se deriva el resumen
+                self.summary.rebuild()
+            return True
+        except Exception as e:
+            logger.error(f"Error aplicando migraciones de esquema: {e}")
+            return False
+
+    @property
+    def dialect(self) -> str:
+        """Dialecto SQL del backend activo"""
+        return "mssql" if self.sql_engine else "sqlite"
+
+    def query(self, table_name: str, alias: str = None) -> Query:
+        """Crea una consulta componible asociada a este gestor"""
+        return Query(table_name, alias, manager=self)
+
+    def get_data(
+        self,
+        table_name: str,
+        filters: dict = None,
+        limit: int = None,
+        order_by=None,
+        offset: int = None,
+        columns: List[str] = None
+    ) -> pd.DataFrame:
+        """Obtiene datos de la tabla especificada con filtrado, orden y paginación.
+
+        ``filters`` acepta valores simples (igualdad), listas (IN) o None (IS NULL).
+        ``order_by`` acepta 'columna', 'columna DESC' o una lista de ellos.
+        ``columns`` limita las columnas leídas; por defecto se leen todas.
+        El resultado se guarda en caché hasta que se escribe en la tabla.
+        """
+        try:
+            query = self.query(table_name).filter(filters).limit(limit).offset(offset)
+            if columns:
+                query.select(*columns)
+            if order_by:
+                query.order_by(*([order_by] if isinstance(order_by, str) else order_by))
         except Exception as e:
             logger.error(f"Error obteniendo datos: {e}")
             return pd.DataFrame()
+        return self.fetch(query)
+
+    def aggregate(
+        self,
+        table_name: str,
+        group_by: List[str] = None,
+        metrics: Dict[str, tuple] = None,
+        filters: dict = None
+    ) -> pd.DataFrame:
+        """Calcula métricas agregadas en el servidor con una sola consulta agrupada.
 
-    def _get_data_from_excel(self, sheet_name: str) -> pd.DataFrame:
-        """Lee datos del archivo Excel"""
+        ``metrics`` asocia cada nombre de resultado con ``(función, columna)``
+        o ``(función, columna, filtros)``; ver ``Query.aggregate``. Sin
+        ``group_by`` retorna una única fila.
+        """
         try:
-            return pd.read_excel(self.path, sheet_name=sheet_name)
+            query = self.query(table_name).filter(filters) \
+                .group_by(*(group_by or [])).aggregate(**(metrics or {'total': ('count', '*')}))
         except Exception as e:
-            logger.error(f"Error leyendo Excel: {e}")
+            logger.error(f"Error construyendo la agregación de {table_name}: {e}")
             return pd.DataFrame()
+        return self.fetch(query)
 
-    def _get_data_from_sql(self, table_name: str, filters: dict, limit: int) -> pd.DataFrame:
-        """Lee datos de SQL Server con filtros opcionales"""
-        if not self.sql_engine:
-            logger.warning("No hay conexión a SQL Server.")
+    def activity_status_query(self, id_empleado: int, inicio, fin) -> Query:
+        """Consulta de ``get_activity_status``; los reportes se filtran en el ON del LEFT JOIN"""
+        return self.query('Contratos', 'c') \
+            .select('c.id_contrato', 'c.nombre_contrato', 'a.id_actividad',
+                    'a.descripcion', 'a.porcentaje', 'r.id_reporte') \
+            .left_join('Actividades', ('c.id_contrato', 'a.id_contrato'), alias='a') \
+            .left_join('Reportes', ('a.id_actividad', 'r.id_actividad'), alias='r', conditions=[
+                ('r.id_empleado', '=', id_empleado),
+                ('r.fecha', '>=', inicio),
+                ('r.fecha', '<', fin),
+            ]) \
+            .where('c.id_empleado', '=', id_empleado) \
+            .order_by('c.id_contrato', 'a.id_actividad')
+
+    @staticmethod
+    def count_activity_reports(df: pd.DataFrame) -> pd.DataFrame:
+        """Reduce el resultado de ``activity_status_query`` a una fila por actividad"""
+        if df.empty:
+            return df
+        keys = ['id_contrato', 'id_actividad']
+        df = df.copy()
+        df['reportes_periodo'] = df.groupby(keys, dropna=False)['id_reporte'].transform('count')
+        return df.drop(columns='id_reporte').drop_duplicates(keys).reset_index(drop=True)
+
+    def get_activity_status(self, id_empleado: int, inicio, fin) -> pd.DataFrame:
+        """Contratos del empleado con sus actividades y los reportes de cada una en el periodo.
+
+        Retorna una fila por actividad (o por contrato sin actividades) con
+        ``reportes_periodo``: cuántos reportes hizo el empleado sobre esa
+        actividad con ``inicio <= fecha < fin``. Los reportes se filtran en
+        el ON del LEFT JOIN, de modo que una sola consulta trae todo.
+        """
+        try:
+            query = self.activity_status_query(id_empleado, inicio, fin)
+        except Exception as e:
+            logger.error(f"Error construyendo el estado de actividades: {e}")
             return pd.DataFrame()
+        return self.count_activity_reports(self.fetch(query))
+
+    def iter_data(
+        self,
+        table_name,
+        filters: dict = None,
+        chunk_size: int = 5000,
+        columns: List[str] = None,
+        order_by=None
+    ) -> Iterator[pd.DataFrame]:
+        """Recorre una tabla (o un ``Query``) en bloques de ``chunk_size`` filas.
+
+        En SQLite y SQL Server se lee de un cursor del servidor con
+        ``fetchmany``; en Excel, con el lector en streaming de openpyxl (sin
+        orden). La memoria usada depende del tamaño del bloque, no de la
+        tabla. Los bloques no pasan por la caché.
+
+        A diferencia de ``get_data``, los errores se propagan: un recorrido
+        interrumpido no debe confundirse con uno completo (p. ej. al exportar).
+        """
+        if isinstance(table_name, Query):
+            query = table_name
+        else:
+            query = self.query(table_name).filter(filters)
+            if columns:
+                query.select(*columns)
+            if order_by:
+                query.order_by(*([order_by] if isinstance(order_by, str) else order_by))
+        yield from self._measure_chunks(query, self._iter_chunks(query, chunk_size))
+
+    def _measure_chunks(self, query: Query, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Registra la lectura por bloques contando solo el tiempo de lectura, no el del consumidor"""
+        rows = nbytes = 0
+        elapsed = 0.0
+        error = False
         try:
-            query = f"SELECT * FROM {table_name}"
+            while True:
+                start = time.perf_counter()
+                try:
+                    chunk = next(chunks, None)
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - start
+                if chunk is None:
+                    break
+                rows += len(chunk)
+                nbytes += frame_bytes(chunk)
+                yield chunk
+        finally:
+            try:
+                statement = query.compile(self.dialect)[0]
+            except Exception:
+                statement = f"iter_data {query.table_name}"
+            self.stats.record("iter_data", self.backend, query.tables, statement,
+                              elapsed * 1000, rows, nbytes, error=error)
 
-            if filters:
-                conditions = " AND ".join(
-                    [f"{k} = '{v}'" for k, v in filters.items()])
-                query += f" WHERE {conditions}"
+    def _iter_chunks(self, query: Query, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Lee la consulta por bloques del backend activo; los errores se registran y se propagan"""
+        try:
+            if self.use_excel:
+                yield from self._iter_data_from_excel(query, chunk_size)
+            elif self.sql_engine:
+                sql, params = query.compile("mssql")
+                with self._sql_connection() as connection:
+                    # yield_per pide un cursor del lado del servidor y lee por bloques
+                    result = connection.execution_options(yield_per=chunk_size) \
+                        .execute(text(sql), params)
+                    yield from iter_frames(list(result.keys()), result.fetchmany, chunk_size)
+            elif self.sql_lite_pool:
+                sql, params = query.compile("sqlite")
+                with self._sqlite_connection() as connection:
+                    cursor = connection.execute(sql, params)
+                    try:
+                        columns = [col[0] for col in cursor.description]
+                        yield from iter_frames(columns, cursor.fetchmany, chunk_size)
+                    finally:
+                        cursor.close()
+            else:
+                logger.warning("No hay conexión a base de datos.")
+        except Exception as e:
+            logger.error(f"Error leyendo por bloques: {e}")
+            raise
+
+    def _iter_data_from_excel(self, query: Query, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Aplica los filtros y la proyección de la consulta a cada bloque de la hoja"""
+        if query._joins:
+            raise ValueError("La lectura por bloques de Excel no admite JOIN")
+        # El lector en streaming lee el libro directamente: el diario debe estar aplicado
+        self._get_excel_writer().flush()
+        # El orden y la paginación no aplican a bloques independientes
+        chunk_query = Query(query.table_name)
+        chunk_query._conditions = query._conditions
+        chunk_query._columns = query._columns
+        for chunk in iter_excel_sheet(self.path, query.table_name, chunk_size):
+            df = chunk_query.to_pandas(lambda _: chunk)
+            if not df.empty:
+                yield apply_schema(df)
+
+    def get_many(self, requests: Dict[str, Union[str, dict, Query]]) -> Dict[str, pd.DataFrame]:
+        """Carga varias consultas independientes en paralelo.
+
+        Cada valor puede ser el nombre de una tabla, un dict con los
+        argumentos de ``get_data`` (incluido ``table_name``) o un ``Query``.
+        Las cargas se ejecutan en el pool de hilos del gestor, cada una con
+        su propia conexión del pool, y el resultado conserva las claves.
+        """
+        if self.use_excel:
+            # Se prepara una sola vez antes de repartir las lecturas
+            self._prepare_excel()
+        ctx = get_script_run_ctx()
+
+        def load(request):
+            with script_run_ctx(ctx):
+                if isinstance(request, Query):
+                    return self.fetch(request)
+                if isinstance(request, str):
+                    return self.get_data(request)
+                return self.get_data(**request)
+
+        futures = {key: self.executor.submit(load, request)
+                   for key, request in requests.items()}
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.error(f"Error en la carga paralela de {key}: {e}")
+                results[key] = pd.DataFrame()
+        return results
+
+    def fetch(self, query: Query) -> pd.DataFrame:
+        """Ejecuta una consulta del query builder pasando por la caché por tabla"""
+        with self.stats.measure("fetch", self.backend, query.tables,
+                                lambda: query.compile(self.dialect)[0]) as outcome:
+            loaded = []
 
-            logger.info(f"Consulta SQL: {query} con filtros {filters}")
+            def load():
+                loaded.append(True)
+                return self._load_data(query)
 
-            return pd.read_sql(query, self.sql_engine)
+            df = self.cache.get_or_load(
+                query.tables, ("fetch", query.cache_key()), load,
+                # Los resultados vacíos se guardan; los errores (None) no
+                cache_if=lambda result: result is not None)
+            if df is None:
+                outcome.update(cache="miss", error=True)
+                return pd.DataFrame()
+            outcome.update(rows=len(df), bytes=frame_bytes(df),
+                           cache="miss" if loaded else "hit")
+            return df.copy()
+
+    def count(self, table_name, filters: dict = None) -> int:
+        """Cuenta las filas de una tabla (o de una consulta) con SELECT COUNT(*).
+
+        Acepta el nombre de la tabla con filtros al estilo de ``get_data`` o
+        un ``Query`` ya construido. El total se guarda en caché hasta que se
+        escribe en alguna de las tablas consultadas.
+        """
+        try:
+            query = table_name if isinstance(table_name, Query) \
+                else self.query(table_name).filter(filters)
         except Exception as e:
-            logger.error(f"Error leyendo SQL: {e}")
-            return pd.DataFrame()
+            logger.error(f"Error contando registros: {e}")
+            return 0
+        with self.stats.measure("count", self.backend, query.tables,
+                                lambda: query.compile_count()[0]) as outcome:
+            loaded = []
 
-    def _get_data_from_sql_lite(self, table_name: str, filters: dict, limit: int) -> pd.DataFrame:
-        """Lee datos de SQLite con filtros opcionales"""
-        if not self.sql_lite_connection:
-            logger.warning("No hay conexión a SQLite.")
-            return pd.DataFrame()
+            def load():
+                loaded.append(True)
+                return self._load_count(query)
+
+            total = self.cache.get_or_load(
+                query.tables, ("count", query.cache_key()), load,
+                cache_if=lambda result: result is not None)
+            outcome.update(rows=1, cache="miss" if loaded else "hit", error=total is None)
+            return total or 0
+
+    def _load_count(self, query: Query) -> Optional[int]:
+        """Ejecuta el conteo en el backend activo; None si hubo un error"""
         try:
-            self.connect_to_sql_lite(self.path)
-            logger.info(f"Conectado a SQLite en {self.path}")
-            self.cursor = self.sql_lite_connection.cursor()
-            query = f"SELECT * FROM {table_name}"
+            if self.use_excel:
+                return query.count_pandas(self._read_excel_sheet)
+            sql, params = query.compile_count()
+            logger.debug(f"Conteo: {sql} con parámetros {params}")
+            if self.sql_engine:
+                with self._sql_connection() as connection:
+                    return int(connection.execute(text(sql), params).scalar())
+            elif self.sql_lite_pool:
+                with self._sqlite_connection() as connection:
+                    return int(connection.execute(sql, params).fetchone()[0])
+            logger.warning("No hay conexión a base de datos.")
+            return None
+        except Exception as e:
+            logger.error(f"Error contando registros: {e}")
+            return None
 
-            if filters:
-                conditions = " AND ".join(
-                    [f"{k} = '{v}'" for k, v in filters.items()])
-                query += f" WHERE {conditions}"
+    def enable_arrow_fetch(self, enabled: bool = True) -> bool:
+        """Activa la lectura columnar (ADBC para SQLite, arrow-odbc para SQL Server).
 
-            if limit:
-                query += f" LIMIT {limit}"
-            logger.info(
-                f"Consulta ejecutada: {query} con parámetros {filters}")
-            self.cursor.execute(query)
-            logger.info(
-                f"Consulta ejecutada en la tabla {table_name} de SQLite")
-            # Obtener los datos
-            data = self.cursor.fetchall()
-            logger.info(
-                f"Datos obtenidos de la tabla {table_name} en SQLite [{len(data)} filas]")
-            # Leer los resultados y convertirlos a DataFrame
-            df = pd.DataFrame(data, columns=[col[0]
-                                             for col in self.cursor.description])
-            logger.info(
-                f"DataFrame creado con {len(df)} filas y {len(df.columns)} columnas")
-            self.sql_lite_connection.commit()
-            self.cursor.close()
+        Con la lectura columnar los resultados llegan como tablas Arrow y se
+        convierten a pandas con dtypes ``ArrowDtype`` sin crear filas de
+        objetos Python. Retorna False si el backend activo no tiene driver.
+        """
+        available = (self.sql_engine is not None and ARROW_ODBC_AVAILABLE
+                     and self.odbc_connection_string is not None) or \
+            (self.sql_engine is None and self.sql_lite_pool is not None and ADBC_SQLITE_AVAILABLE)
+        self.arrow_fetch_requested = enabled
+        self.arrow_fetch = enabled and available
+        if enabled and not available:
+            logger.info("Lectura Arrow no disponible para el backend activo")
+        self.cache.clear()
+        return self.arrow_fetch
+
+    def fetch_arrow(self, query: Query):
+        """Ejecuta la consulta y retorna una tabla ``pyarrow.Table`` tipada; None si falla"""
+        try:
+            if self.sql_engine is not None and ARROW_ODBC_AVAILABLE:
+                sql, values = to_positional(*query.compile("mssql"))
+                reader = read_arrow_batches_from_odbc(
+                    query=sql,
+                    connection_string=self.odbc_connection_string,
+                    parameters=[None if v is None else str(v) for v in values])
+                table = pa.Table.from_batches(reader, schema=reader.schema)
+            elif self.sql_lite_pool is not None and ADBC_SQLITE_AVAILABLE:
+                sql, values = to_positional(*query.compile("sqlite"))
+                pool = self.sql_lite_pool
+                if pool is None:
+                    raise sqlite3.ProgrammingError("No hay conexión a SQLite")
+                with pool.arrow_connection() as connection:
+                    with connection.cursor() as cursor:
+                        cursor.execute(sql, [to_db_value(v) for v in values])
+                        table = cursor.fetch_arrow_table()
+            else:
+                logger.warning("No hay driver Arrow para el backend activo")
+                return None
+            logger.debug(
+                f"Datos Arrow obtenidos de {', '.join(query.tables)} [{table.num_rows} filas]")
+            return cast_arrow(table)
+        except Exception as e:
+            logger.error(f"Error en la lectura Arrow: {e}")
+            return None
+
+    def _load_data(self, query: Query) -> Optional[pd.DataFrame]:
+        """Lee los datos del backend activo sin pasar por la caché; None si hubo un error"""
+        try:
+            if self.arrow_fetch and not self.use_excel:
+                table = self.fetch_arrow(query)
+                if table is not None:
+                    return arrow_to_pandas(table)
+                # Si la lectura columnar falla se usa el camino por filas
+            if self.use_excel:
+                return self._get_data_from_excel(query)
+            elif self.sql_engine:
+                return self._get_data_from_sql(query)
+            elif self.sql_lite_pool:
+                return self._get_data_from_sql_lite(query)
+            else:
+                logger.warning("No hay conexión a base de datos.")
+                st.warning("No hay conexión a ninguna base de datos.")
+                return None
+        except Exception as e:
+            logger.error(f"Error obteniendo datos: {e}")
+            return None
+
+    def _prepare_excel(self) -> ExcelColumnarCache:
+        """Retorna la caché columnar del libro actual"""
+        if self.excel_cache is None or self.excel_cache.workbook_path != self.path:
+            self.excel_cache = ExcelColumnarCache(self.path)
+        return self.excel_cache
+
+    def _read_excel_sheet(self, sheet_name: str, columns: List[str] = None) -> pd.DataFrame:
+        """Lee una hoja de la caché columnar con las escrituras pendientes del diario superpuestas"""
+        excel_cache = self._prepare_excel()
+        return self._get_excel_writer().read_sheet(
+            sheet_name, lambda usecols: excel_cache.read_sheet(sheet_name, usecols), columns)
+
+    def _get_data_from_excel(self, query: Query) -> Optional[pd.DataFrame]:
+        """Lee datos del archivo Excel evaluando la consulta en pandas"""
+        try:
+            # Las columnas de filtro y orden se leen aunque no se proyecten
+            usecols = query.referenced_columns()
+            return apply_schema(query.to_pandas(
+                lambda sheet_name: self._read_excel_sheet(sheet_name, usecols)))
+        except Exception as e:
+            logger.error(f"Error leyendo Excel: {e}")
+            return None
+
+    def _get_data_from_sql(self, query: Query) -> Optional[pd.DataFrame]:
+        """Lee datos de SQL Server con filtros, orden y paginación en el servidor"""
+        if not self.sql_engine:
+            logger.warning("No hay conexión a SQL Server.")
+            return None
+        try:
+            sql, params = query.compile("mssql")
+            logger.debug(f"Consulta SQL: {sql} con parámetros {params}")
+            with self._sql_connection() as connection:
+                result = connection.execute(text(sql), params)
+                df = materialize(list(result.keys()), result.fetchmany)
+            logger.debug(
+                f"Datos obtenidos de {', '.join(query.tables)} en SQL Server [{len(df)} filas]")
+            return df
+        except Exception as e:
+            logger.error(f"Error leyendo SQL: {e}")
+            return None
 
+    def _get_data_from_sql_lite(self, query: Query) -> Optional[pd.DataFrame]:
+        """Lee datos de SQLite con filtros, orden y paginación en la base de datos"""
+        if not self.sql_lite_pool:
+            logger.warning("No hay conexión a SQLite.")
+            return None
+        try:
+            sql, params = query.compile("sqlite")
+            logger.debug(
+                f"Consulta ejecutada: {sql} con parámetros {params}")
+            with self._sqlite_connection() as connection:
+                cursor = connection.execute(sql, params)
+                columns = [col[0] for col in cursor.description]
+                # DataFrame tipado construido por bloques, sin la lista completa de tuplas
+                df = materialize(columns, cursor.fetchmany)
+                cursor.close()
+            logger.debug(
+                f"Datos obtenidos de {', '.join(query.tables)} en SQLite [{len(df)} filas]")
             return df
         except Exception as e:
             logger.error(f"Error leyendo SQLite: {e}")
-            return pd.DataFrame()
+            return None
+
+    @staticmethod
+    def _insert_statement(table_name: str, data: Dict[str, Any]) -> tuple:
+        """Construye un INSERT con parámetros enlazados"""
+        columns = [validate_identifier(column) for column in data]
+        query = (f"INSERT INTO {validate_identifier(table_name)} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(f':v_{column}' for column in columns)})")
+        return query, {f"v_{k}": to_db_value(v) for k, v in data.items()}
+
+    @staticmethod
+    def _update_statement(table_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> tuple:
+        """Construye un UPDATE con parámetros enlazados"""
+        if not condition:
+            raise ValueError("Se requiere una condición para actualizar")
+        set_clause = ", ".join(
+            f"{validate_identifier(k)} = :v_{k}" for k in data)
+        where_clause = " AND ".join(
+            f"{validate_identifier(k)} = :c_{k}" for k in condition)
+        query = f"UPDATE {validate_identifier(table_name)} SET {set_clause} WHERE {where_clause}"
+        params = {f"v_{k}": to_db_value(v) for k, v in data.items()}
+        params.update({f"c_{k}": to_db_value(v) for k, v in condition.items()})
+        return query, params
+
+    @staticmethod
+    def _delete_statement(table_name: str, condition: Dict[str, Any]) -> tuple:
+        """Construye un DELETE con parámetros enlazados"""
+        if not condition:
+            raise ValueError("Se requiere una condición para eliminar")
+        where_clause = " AND ".join(
+            f"{validate_identifier(k)} = :c_{k}" for k in condition)
+        query = f"DELETE FROM {validate_identifier(table_name)} WHERE {where_clause}"
+        return query, {f"c_{k}": to_db_value(v) for k, v in condition.items()}
+
+    def _measure_write(self, operation: str, table_name: str, statement, write):
+        """Ejecuta una escritura registrando su duración y las filas aplicadas"""
+        with self.stats.measure(operation, self.backend, table_name, statement) as outcome:
+            result = write()
+            expected = len(result) if isinstance(result, list) else 1
+            applied = sum(result) if isinstance(result, list) else int(bool(result))
+            outcome.update(rows=applied, error=applied < expected)
+            return result
+
+    @staticmethod
+    def _applied(result, items: List[Any]) -> List[Any]:
+        """Elementos del lote (filas o condiciones) cuya escritura se aplicó"""
+        if isinstance(result, list):
+            return [item for item, ok in zip(items, result) if ok]
+        return list(items) if result else []
 
     def insert_data(self, table_name: str, data: Dict[str, Any]) -> bool:
         """Inserta datos en la tabla especificada"""
+        result = False
+        try:
+            result = self._measure_write(
+                "insert", table_name, lambda: self._insert_statement(table_name, data)[0],
+                lambda: self._insert_data(table_name, data))
+            return result
+        finally:
+            self.cache.invalidate(table_name)
+            # Una escritura fallida no cambia el resumen
+            if result:
+                self.summary.refresh(self.summary.keys_for_rows(table_name, [data]))
+
+    def _insert_data(self, table_name: str, data: Dict[str, Any]) -> bool:
+        """Despacha la inserción al backend activo"""
         if self.use_excel:
             return self._insert_data_to_excel(table_name, data)
         elif self.sql_engine:
             return self._insert_data_to_sql(table_name, data)
-        elif self.sql_lite_connection:
+        elif self.sql_lite_pool:
             return self._insert_data_to_sql_lite(table_name, data)
         else:
             logger.warning("No hay conexión a ninguna base de datos.")
             st.warning("No hay conexión a ninguna base de datos.")
             return False
 
+    def _get_excel_writer(self) -> ExcelWriteBuffer:
+        """Obtiene el búfer de escritura del libro Excel actual"""
+        if self.excel_writer is None or self.excel_writer.workbook_path != self.path:
+            if self.excel_writer is not None:
+                self.excel_writer.flush()
+            self.excel_writer = ExcelWriteBuffer(self.path)
+        return self.excel_writer
+
     def _insert_data_to_excel(self, sheet_name: str, data: Dict[str, Any]) -> bool:
-        """Inserta datos en Excel (simulado - en realidad solo lee)"""
-        # Para Excel, solo simulamos la inserción ya que es complejo modificar archivos Excel
-        logger.info(
-            f"Simulando inserción en Excel - Tabla: {sheet_name}, Datos: {data}")
-        return True
+        """Inserta datos en Excel mediante el búfer de escritura por lotes"""
+        logger.debug(
+            f"Inserción en Excel - Tabla: {sheet_name}, Datos: {data}")
+        return self._get_excel_writer().insert(
+            sheet_name, {k: to_db_value(v) for k, v in data.items()})
 
     def _insert_data_to_sql(self, table_name: str, data: Dict[str, Any]) -> bool:
         """Inserta datos en SQL Server usando SQLAlchemy"""
@@ -233,11 +1104,9 @@ class DatabaseManager:
             st.warning("No hay conexión a SQL Server.")
             return False
         try:
-            columns = ", ".join(data.keys())
-            placeholders = ", ".join([f"'{v}'" for v in data.values()])
-            query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-            with self.sql_engine.connect() as connection:
-                connection.execute(text(query), data)
+            query, params = self._insert_statement(table_name, data)
+            with self._sql_connection() as connection:
+                connection.execute(text(query), params)
                 connection.commit()
             return True
         except Exception as e:
@@ -247,24 +1116,19 @@ class DatabaseManager:
 
     def _insert_data_to_sql_lite(self, table_name: str, data: Dict[str, Any]) -> bool:
         """Inserta datos en SQLite usando SQLAlchemy"""
-        if not self.sql_lite_connection:
+        if not self.sql_lite_pool:
             logger.warning("No hay conexión a SQLite.")
             st.warning("No hay conexión a SQLite.")
             return False
         try:
-            self.connect_to_sql_lite(self.path)
-            self.cursor = self.sql_lite_connection.cursor()
-            columns = ", ".join(data.keys())
-            placeholders = ", ".join([f"'{v}'" for v in data.values()])
-            query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-            logger.info(
+            query, params = self._insert_statement(table_name, data)
+            logger.debug(
                 f"Ejecutando consulta SQLite: {query}")
 
-            with self.sql_lite_connection:
-                self.cursor.execute(query, data)
-                self.sql_lite_connection.commit()
-                logger.info(f"Datos insertados en SQLite: {data}")
-            self.cursor.close()
+            with self._sqlite_connection() as connection:
+                with connection:
+                    connection.execute(query, params)
+            logger.debug(f"Datos insertados en SQLite: {data}")
             return True
         except Exception as e:
             logger.error(f"Error insertando en SQLite: {e}")
@@ -272,11 +1136,28 @@ class DatabaseManager:
 
     def update_data(self, table_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
         """Actualiza datos en la tabla especificada"""
+        # Filas del resumen antes y después del cambio (puede mover un reporte de mes)
+        keys = self.summary.keys_for_conditions(table_name, [condition])
+        result = False
+        try:
+            result = self._measure_write(
+                "update", table_name,
+                lambda: self._update_statement(table_name, data, condition)[0],
+                lambda: self._update_data(table_name, data, condition))
+            return result
+        finally:
+            self.cache.invalidate(table_name)
+            if result:
+                keys |= self.summary.keys_for_conditions(table_name, [condition])
+                self.summary.refresh(keys)
+
+    def _update_data(self, table_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+        """Despacha la actualización al backend activo"""
         if self.use_excel:
             return self._update_data_in_excel(table_name, data, condition)
         elif self.sql_engine:
             return self._update_data_in_sql(table_name, data, condition)
-        elif self.sql_lite_connection:
+        elif self.sql_lite_pool:
             return self._update_data_sql_lite(table_name, data, condition)
         else:
             print("No hay conexión a ninguna base de datos.")
@@ -284,10 +1165,13 @@ class DatabaseManager:
             return False
 
     def _update_data_in_excel(self, sheet_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
-        """Actualiza datos en Excel (simulado)"""
-        print(
-            f"Simulando actualización en Excel - Tabla: {sheet_name}, Datos: {data}, Condición: {condition}")
-        return True
+        """Actualiza datos en Excel mediante el búfer de escritura por lotes"""
+        logger.debug(
+            f"Actualización en Excel - Tabla: {sheet_name}, Datos: {data}, Condición: {condition}")
+        return self._get_excel_writer().update(
+            sheet_name,
+            {k: to_db_value(v) for k, v in data.items()},
+            {k: to_db_value(v) for k, v in condition.items()})
 
     def _update_data_in_sql(self, table_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
         """Actualiza datos en SQL Server usando SQLAlchemy"""
@@ -296,15 +1180,11 @@ class DatabaseManager:
             st.write("No hay conexión a SQL Server.")
             return False
         try:
-            set_clause = ", ".join([f"{k} = '{v}'" for k, v in data.items()])
-            logger.info(set_clause)
-            condiciones = " AND ".join(
-                [f"{k} = '{v}'" for k, v in condition.items()])
-            query = f"UPDATE {table_name} SET {set_clause} WHERE {condiciones}"
-            logger.info(query)
+            query, params = self._update_statement(table_name, data, condition)
+            logger.debug(query)
 
-            with self.sql_engine.connect() as connection:
-                connection.execute(text(query), data)
+            with self._sql_connection() as connection:
+                connection.execute(text(query), params)
                 connection.commit()
             return True
         except Exception as e:
@@ -313,24 +1193,17 @@ class DatabaseManager:
 
     def _update_data_sql_lite(self, table_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
         """Actualiza datos en SQLite usando SQLAlchemy"""
-        if not self.sql_lite_connection:
+        if not self.sql_lite_pool:
             print("No hay conexión a SQLite.")
             st.write("No hay conexión a SQLite.")
             return False
         try:
-            self.connect_to_sql_lite(self.path)
-            logger.info(f"Conectado a SQLite en {self.path}")
-            self.cursor = self.sql_lite_connection.cursor()
-            set_clause = ", ".join([f"{k} = '{v}'" for k, v in data.items()])
-            condiciones = " AND ".join(
-                [f"{k} = '{v}'" for k, v in condition.items()])
-            query = f"UPDATE {table_name} SET {set_clause} WHERE {condiciones}"
-            logger.info(query)
-
-            with self.sql_lite_connection:
-                self.cursor.execute(query)
-                self.cursor.connection.commit()
-                self.cursor.close()
+            query, params = self._update_statement(table_name, data, condition)
+            logger.debug(query)
+
+            with self._sqlite_connection() as connection:
+                with connection:
+                    connection.execute(query, params)
             return True
         except Exception as e:
             logger.info(f"Error actualizando en SQLite: {e}")
@@ -338,11 +1211,25 @@ class DatabaseManager:
 
     def delete_data(self, table_name: str, condition: Dict[str, Any]) -> bool:
         """Elimina datos de la tabla especificada"""
+        keys = self.summary.keys_for_conditions(table_name, [condition])
+        result = False
+        try:
+            result = self._measure_write(
+                "delete", table_name, lambda: self._delete_statement(table_name, condition)[0],
+                lambda: self._delete_data(table_name, condition))
+            return result
+        finally:
+            self.cache.invalidate(table_name)
+            if result:
+                self.summary.refresh(keys)
+
+    def _delete_data(self, table_name: str, condition: Dict[str, Any]) -> bool:
+        """Despacha la eliminación al backend activo"""
         if self.use_excel:
             return self._delete_data_from_excel(table_name, condition)
         elif self.sql_engine:
             return self._delete_data_from_sql(table_name, condition)
-        elif self.sql_lite_connection:
+        elif self.sql_lite_pool:
             return self._delete_data_from_sql_lite(table_name, condition)
         else:
             print("No hay conexión a ninguna base de datos.")
@@ -350,28 +1237,24 @@ class DatabaseManager:
             return False
 
     def _delete_data_from_excel(self, sheet_name: str, condition: Dict[str, Any]) -> bool:
-        """Elimina datos de Excel (simulado)"""
-        print(
-            f"Simulando eliminación en Excel - Tabla: {sheet_name}, Condición: {condition}")
-        return True
+        """Elimina datos de Excel mediante el búfer de escritura por lotes"""
+        logger.debug(
+            f"Eliminación en Excel - Tabla: {sheet_name}, Condición: {condition}")
+        return self._get_excel_writer().delete(
+            sheet_name, {k: to_db_value(v) for k, v in condition.items()})
 
     def _delete_data_from_sql_lite(self, table_name: str, condition: Dict[str, Any]) -> bool:
         """Elimina datos de SQLite usando SQLAlchemy"""
-        if not self.sql_lite_connection:
+        if not self.sql_lite_pool:
             print("No hay conexión a SQLite.")
             st.write("No hay conexión a SQLite.")
             return False
         try:
-            self.connect_to_sql_lite(self.path)
-            self.cursor = self.sql_lite_connection.cursor()
-            condiciones = " AND ".join(
-                [f"{k} = '{v}'" for k, v in condition.items()])
-            query = f"DELETE FROM {table_name} WHERE {condiciones}"
-            logger.info(query)
-            with self.sql_lite_connection:
-                self.cursor.execute(query)
-                self.sql_lite_connection.commit()
-                self.cursor.close()
+            query, params = self._delete_statement(table_name, condition)
+            logger.debug(query)
+            with self._sqlite_connection() as connection:
+                with connection:
+                    connection.execute(query, params)
             return True
         except Exception as e:
             print(f"Error eliminando en SQLite: {e}")
@@ -384,26 +1267,201 @@ class DatabaseManager:
             st.write("No hay conexión a SQL Server.")
             return False
         try:
-            condiciones = " AND ".join(
-                [f"{k} = '{v}'" for k, v in condition.items()])
-            query = f"DELETE FROM {table_name} WHERE {condiciones}"
-            logger.info(query)
-            with self.sql_engine.connect() as connection:
-                connection.execute(text(query))
+            query, params = self._delete_statement(table_name, condition)
+            logger.debug(query)
+            with self._sql_connection() as connection:
+                connection.execute(text(query), params)
                 connection.commit()
             return True
         except Exception as e:
             print(f"Error eliminando en SQL con SQLAlchemy: {e}")
             return False
 
+    def insert_many(self, table_name: str, rows: List[Dict[str, Any]]) -> List[bool]:
+        """Inserta varias filas en una sola transacción; retorna el resultado por fila"""
+        def write():
+            if self.use_excel:
+                return [self._insert_data_to_excel(table_name, data) for data in rows]
+            return self._execute_batch(
+                table_name, [self._insert_statement(table_name, data) for data in rows])
+
+        result = []
+        try:
+            result = self._measure_write(
+                "insert_many", table_name,
+                lambda: self._insert_statement(table_name, rows[0])[0], write)
+            return result
+        finally:
+            self.cache.invalidate(table_name)
+            applied = self._applied(result, rows)
+            if applied:
+                self.summary.refresh(self.summary.keys_for_rows(table_name, applied))
+
+    def update_many(self, table_name: str, changes: List[tuple]) -> List[bool]:
+        """Actualiza varias filas en una sola transacción.
+
+        ``changes`` es una lista de tuplas ``(datos, condición)`` con el mismo
+        formato que ``update_data``; retorna el resultado por fila.
+        """
+        conditions = [condition for _, condition in changes]
+        keys = self.summary.keys_for_conditions(table_name, conditions)
+        def write():
+            if self.use_excel:
+                return [self._update_data_in_excel(table_name, data, condition)
+                        for data, condition in changes]
+            return self._execute_batch(
+                table_name, [self._update_statement(table_name, data, condition)
+                             for data, condition in changes])
+
+        result = []
+        try:
+            result = self._measure_write(
+                "update_many", table_name,
+                lambda: self._update_statement(table_name, *changes[0])[0], write)
+            return result
+        finally:
+            self.cache.invalidate(table_name)
+            applied = self._applied(result, conditions)
+            if applied:
+                keys |= self.summary.keys_for_conditions(table_name, applied)
+                self.summary.refresh(keys)
+
+    def delete_many(self, table_name: str, conditions: List[Dict[str, Any]]) -> List[bool]:
+        """Elimina varias filas en una sola transacción; retorna el resultado por fila"""
+        keys = self.summary.keys_for_conditions(table_name, conditions)
+        def write():
+            if self.use_excel:
+                return [self._delete_data_from_excel(table_name, condition) for condition in conditions]
+            return self._execute_batch(
+                table_name, [self._delete_statement(table_name, condition) for condition in conditions])
+
+        result = []
+        try:
+            result = self._measure_write(
+                "delete_many", table_name,
+                lambda: self._delete_statement(table_name, conditions[0])[0], write)
+            return result
+        finally:
+            self.cache.invalidate(table_name)
+            if self._applied(result, conditions):
+                self.summary.refresh(keys)
+
+    @staticmethod
+    def _group_statements(statements: List[tuple]) -> List[tuple]:
+        """Agrupa en tramos las sentencias consecutivas con el mismo SQL (conserva el orden del lote)"""
+        groups = []
+        for index, (query, _) in enumerate(statements):
+            if groups and groups[-1][0] == query:
+                groups[-1][1].append(index)
+            else:
+                groups.append((query, [index]))
+        return groups
+
+    @staticmethod
+    def _is_insert(query: str) -> bool:
+        """Un INSERT siempre afecta su fila; UPDATE y DELETE requieren el conteo por fila"""
+        return query.lstrip().upper().startswith("INSERT")
+
+    def _execute_batch(self, table_name: str, statements: List[tuple]) -> List[bool]:
+        """Ejecuta un lote de sentencias con executemany en una única transacción"""
+        if not statements:
+            return []
+        try:
+            if self.sql_engine:
+                results = self._execute_batch_sql(statements)
+            elif self.sql_lite_pool:
+                results = self._execute_batch_sql_lite(statements)
+            else:
+                logger.warning("No hay conexión a ninguna base de datos.")
+                st.warning("No hay conexión a ninguna base de datos.")
+                return [False] * len(statements)
+        except Exception as e:
+            logger.error(f"Error ejecutando lote en {table_name}: {e}")
+            return [False] * len(statements)
+        logger.info(
+            f"Lote en {table_name}: {sum(results)}/{len(results)} filas aplicadas")
+        return results
+
+    def _execute_batch_sql_lite(self, statements: List[tuple]) -> List[bool]:
+        """Ejecuta el lote en SQLite usando savepoints para aislar las filas con error.
+
+        Los INSERT de un mismo tramo van en un solo ``executemany``; los UPDATE y
+        DELETE se ejecutan fila por fila para que una condición sin coincidencias
+        retorne False.
+        """
+        results = [False] * len(statements)
+        with self._sqlite_connection() as connection:
+            try:
+                connection.execute("BEGIN")
+                for query, indexes in self._group_statements(statements):
+                    if self._is_insert(query):
+                        connection.execute("SAVEPOINT lote")
+                        try:
+                            connection.executemany(
+                                query, [statements[i][1] for i in indexes])
+                            connection.execute("RELEASE SAVEPOINT lote")
+                            for i in indexes:
+                                results[i] = True
+                            continue
+                        except sqlite3.Error as e:
+                            logger.warning(
+                                f"Lote fallido, reintentando fila por fila: {e}")
+                            connection.execute("ROLLBACK TO SAVEPOINT lote")
+                            connection.execute("RELEASE SAVEPOINT lote")
+                    for i in indexes:
+                        connection.execute("SAVEPOINT fila")
+                        try:
+                            cursor = connection.execute(query, statements[i][1])
+                            results[i] = cursor.rowcount != 0
+                        except sqlite3.Error as e:
+                            logger.error(f"Error en la fila {i} del lote: {e}")
+                            connection.execute("ROLLBACK TO SAVEPOINT fila")
+                        connection.execute("RELEASE SAVEPOINT fila")
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        return results
+
+    def _execute_batch_sql(self, statements: List[tuple]) -> List[bool]:
+        """Ejecuta el lote en SQL Server usando savepoints para aislar las filas con error"""
+        results = [False] * len(statements)
+        with self._sql_connection(begin=True) as connection:
+            for query, indexes in self._group_statements(statements):
+                if self._is_insert(query):
+                    savepoint = connection.begin_nested()
+                    try:
+                        connection.execute(
+                            text(query), [statements[i][1] for i in indexes])
+                        savepoint.commit()
+                        for i in indexes:
+                            results[i] = True
+                        continue
+                    except Exception as e:
+                        logger.warning(
+                            f"Lote fallido, reintentando fila por fila: {e}")
+                        savepoint.rollback()
+                for i in indexes:
+                    savepoint = connection.begin_nested()
+                    try:
+                        result = connection.execute(text(query), statements[i][1])
+                        savepoint.commit()
+                        results[i] = result.rowcount != 0
+                    except Exception as e:
+                        logger.error(f"Error en la fila {i} del lote: {e}")
+                        savepoint.rollback()
+        return results
+
     def close_connection(self):
         """Cierra la conexión a la base de datos"""
+        if getattr(self, 'health_check', None):
+            self.health_check.stop()
         if hasattr(self, 'sql_engine') and self.sql_engine:
             self.sql_engine.dispose()
-        if hasattr(self, 'sql_lite_connection') and self.sql_lite_connection:
-            if self.cursor:
-                self.cursor.close()
-            self.sql_lite_connection.close()
+        if hasattr(self, 'sql_lite_pool') and self.sql_lite_pool:
+            self.sql_lite_pool.close_all()
+        if hasattr(self, 'excel_writer') and self.excel_writer:
+            self.excel_writer.flush()
         logger.info("Conexiones cerradas.")
 
     def __del__(self):
@@ -2,6 +2,7 @@ from dateutil.relativedelta import relativedelta
 from logger import setup_logging
 import time
 from database import DatabaseManager
+from page_timing import timed_page
 from datetime import datetime
 import streamlit as st
 import pandas as pd
@@ -21,11 +22,13 @@ class EmployeeInterface:
         logger.info(
             f"EmployeeInterface inicializado para {user_data['nombre']}")
 
-    @st.cache_data(ttl=300)
-    def _get_cached_data(_self, table_name: str, filters: dict = None) -> pd.DataFrame:
-        """Obtiene datos con caché para mejorar rendimiento"""
-        return _self.db_manager.get_data(table_name, filters=filters)
+    def _get_cached_data(self, table_name: str, filters: dict = None, order_by=None,
+                         limit: int = None, offset: int = None, columns: list = None) -> pd.DataFrame:
+        """Obtiene datos a través de la caché por tabla del DatabaseManager"""
+        return self.db_manager.get_data(table_name, filters=filters, limit=limit,
+                                        order_by=order_by, offset=offset, columns=columns)
 
+    @timed_page
     def show_employee_dashboard(self):
         """Muestra el dashboard del empleado"""
         st.title(
@@ -51,6 +54,7 @@ class EmployeeInterface:
         elif page == "Notificaciones":
             self.show_notifications()
 
+    @timed_page
     def show_dashboard(self):
         """Muestra el dashboard principal del empleado"""
 
@@ -61,36 +65,42 @@ class EmployeeInterface:
 
             st.header("📊 Mi Resumen")
 
-            mes_actual = 6  # datetime.now().month
-
-            # Obtener datos del empleado con caché
-            reportes_df = self._get_cached_data(
-                'Reportes', {'id_empleado': self.employee_id})
-            contratos_df = self._get_cached_data(
-                'Contratos', {'id_empleado': self.employee_id})
-            actividades_df = self._get_cached_data('Actividades')
-        # Filtrar reportes del empleado actual
-            mis_reportes = reportes_df[reportes_df['id_empleado']
-                                       == self.employee_id]
-
-            # Obtener contratos del empleado
-            mis_contratos = contratos_df.copy()
+            # Contratos, actividades y reportes del mes en una sola consulta;
+            # el avance precalculado en ResumenMensual se carga en paralelo
+            inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            fin_mes = inicio_mes + relativedelta(months=1)
+            solicitudes = {'estado': self.db_manager.activity_status_query(
+                self.employee_id, inicio_mes, fin_mes)}
+            if self.db_manager.summary.enabled:
+                solicitudes['resumen'] = {
+                    'table_name': 'ResumenMensual',
+                    'filters': {'id_empleado': self.employee_id,
+                                'mes': inicio_mes.strftime("%Y-%m")},
+                    'columns': ['actividades_reportadas']}
+            datos = self.db_manager.get_many(solicitudes)
+            estado_df = self.db_manager.count_activity_reports(datos['estado'])
+            actividades_df = estado_df.dropna(subset=['id_actividad']) \
+                if not estado_df.empty else estado_df
+            if 'resumen' in datos:
+                resumen_df = datos['resumen']
+                reportadas = int(resumen_df['actividades_reportadas'].sum()) \
+                    if not resumen_df.empty else 0
+            else:
+                reportadas = int((actividades_df['reportes_periodo'] > 0).sum()) \
+                    if not actividades_df.empty else 0
 
             # Métricas del empleado
             col1, col2, col3 = st.columns(3)
 
             with col1:
-                total_actividades = len(
-                    actividades_df[actividades_df['id_contrato'].isin(mis_contratos['id_contrato'])])
+                total_actividades = len(actividades_df)
                 st.metric("Total de Actividades", total_actividades)
 
             with col2:
-                reportadas_con_acciones = len(
-                    mis_reportes[(mis_reportes['acciones_realizadas'].notna()) & (mis_reportes['fecha'].dt.month == mes_actual)])
-                st.metric("Reportadas con Acciones", reportadas_con_acciones)
+                st.metric("Reportadas con Acciones", reportadas)
 
             with col3:
-                porcentaje = (reportadas_con_acciones /
+                porcentaje = (reportadas /
                               total_actividades * 100) if total_actividades > 0 else 0
                 st.metric("Porcentaje Completado", f"{porcentaje:.1f}%")
 
@@ -104,24 +114,20 @@ class EmployeeInterface:
             # Resumen de actividades por contrato
             st.subheader("📋 Mis Contratos y Actividades")
 
-            if not mis_contratos.empty:
-                for _, contrato in mis_contratos.iterrows():
-                    with st.expander(f"📄 {contrato['nombre_contrato']}"):
-                        # Obtener actividades del contrato
-                        actividades_contrato = actividades_df[actividades_df['id_contrato']
-                                                              == contrato['id_contrato']]
+            if not estado_df.empty:
+                for (_, nombre_contrato), actividades_contrato in estado_df.groupby(
+                        ['id_contrato', 'nombre_contrato'], sort=False):
+                    with st.expander(f"📄 {nombre_contrato}"):
+                        actividades_contrato = actividades_contrato.dropna(
+                            subset=['id_actividad'])
 
                         if not actividades_contrato.empty:
                             for _, actividad in actividades_contrato.iterrows():
-                                # Verificar si hay reporte para esta actividad
-                                reporte_actividad = mis_reportes[(mis_reportes['id_actividad']
-                                                                  == actividad['id_actividad']) & (mis_reportes['fecha'].dt.month == datetime.now().month)]
-
                                 col1, col2, col3 = st.columns([3, 1, 1])
                                 with col1:
                                     st.write(f"**{actividad['descripcion']}**")
                                 with col2:
-                                    if not reporte_actividad.empty:
+                                    if actividad['reportes_periodo'] > 0:
                                         st.success("✅ Reportada")
                                     else:
                                         st.warning("⏳ Pendiente")
@@ -166,7 +172,7 @@ class EmployeeInterface:
             with st.form(f"form_agregar_{nombre_tabla}"):
                 nuevo_registro = {}
 
-                logger.info(df.columns)
+                logger.debug(df.columns)
 
                 for col in df.columns:
                     if col.lower() == column_id:
@@ -180,7 +186,6 @@ class EmployeeInterface:
                         ejemplo_valor = df[col].dropna().iloc[0]
                     else:
                         ejemplo_valor = None  # o algún valor por defecto
-                    logger.info(f"{col}:{ejemplo_valor}")
 
                     if isinstance(ejemplo_valor, bool):
                         nuevo_registro[col] = st.checkbox(col, value=True)
@@ -194,7 +199,6 @@ class EmployeeInterface:
                     if self.db_manager.insert_data(nombre_tabla, nuevo_registro):
                         st.success("Registro agregado exitosamente")
                         st.session_state[toggle_key] = False
-                        st.cache_data.clear()
                         st.rerun()
                     else:
                         st.error("Error al agregar registro")
@@ -205,7 +209,7 @@ class EmployeeInterface:
 
     def mostrar_formulario_edicion(self, nombre_tabla: str, df: pd.DataFrame, edit_key: str, row):
         edit_key = edit_key
-        logger.info(f"editando: {edit_key} => {row.to_dict()}")
+        logger.debug(f"editando: {edit_key} => {row.to_dict()}")
         st.subheader(edit_key)
         valores_actualizados = {}
         condiciones = {}
@@ -239,7 +243,6 @@ class EmployeeInterface:
                 st.success("Registro actualizado exitosamente")
                 st.session_state[edit_key] = False
                 st.session_state['edit_index'] = None
-                st.cache_data.clear()
                 st.rerun()
             else:
                 st.error("Error al actualizar registro")
@@ -249,6 +252,7 @@ class EmployeeInterface:
             st.info("Edición cancelada")
             st.rerun()
 
+    @timed_page
     def show_my_activities(self):
         """Gestión de actividads con búsqueda y paginación"""
         st.header("📋 Gestión de Actividades")
@@ -257,33 +261,27 @@ class EmployeeInterface:
         search_term = st.text_input(
             "Buscar actividad por numero o descripción")
 
-        logger.info(f"Buscando actividades de: {self.employee_id}")
+        logger.debug(f"Buscando actividades de: {self.employee_id}")
 
         contratos_df = self._get_cached_data(
-            'Contratos', {'id_empleado': self.employee_id})
+            'Contratos', {'id_empleado': self.employee_id}, columns=['id_contrato'])
         if contratos_df.empty:
             st.warning("No tienes contratos asignados")
-        actividades_df = self._get_cached_data('Actividades')
-        actividades_df = actividades_df[actividades_df['id_contrato'].isin(
-            contratos_df['id_contrato'].unique())]
+        ids_contratos = [] if contratos_df.empty else contratos_df['id_contrato'].unique()
 
-        # Filtrar por término de búsqueda
-        if search_term:
-            mask = actividades_df['Nro'].astype(str).str.contains(search_term, case=False) | \
-                actividades_df['descripcion'].str.contains(
-                search_term, case=False)
-            actividades_df = actividades_df[mask]
-
-        # Paginación
+        # Paginación: el total se cuenta en la base de datos y solo se trae la página visible
         page_size = st.selectbox("Registros por página", [5, 10, 20], index=1)
-        total_pages = max(1, (len(actividades_df) // page_size) +
-                          (1 if len(actividades_df) % page_size > 0 else 0))
+        query = self.db_manager.query('Actividades').where_in(
+            'id_contrato', ids_contratos)
+        if search_term:
+            query.search(['Nro', 'descripcion'], search_term)
+        total_actividades = query.count()
+        total_pages = max(1, (total_actividades // page_size) +
+                          (1 if total_actividades % page_size > 0 else 0))
         page = st.number_input('Página', min_value=1,
                                max_value=total_pages, value=1)
-        start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, len(actividades_df))
-
-        actividades_df = actividades_df.iloc[start_idx:end_idx]
+        actividades_df = query.order_by('id_actividad').limit(
+            page_size).offset((page - 1) * page_size).fetch()
 
         # Mostrar tabla con botones Editar y Eliminar
         if not actividades_df.empty:
@@ -327,13 +325,13 @@ class EmployeeInterface:
                     # Si estamos editando, mostrar formulario de edición
 
                     st.subheader("Editar Actividad")
-                    logger.info(
+                    logger.debug(
                         f"Editando actividad...{st.session_state[f'edit_index']}")
                     # logger.info(f"Editando actividad: {row.to_dict()}")
                     # # Formulario para editar actividad
                     with st.form(f"edit_employee_{actividad['id_actividad']}"):
 
-                        logger.info(
+                        logger.debug(
                             f"Formulario de edición para actividad: {actividad['id_actividad']}")
                         self.mostrar_formulario_edicion(
                             "Actividades", actividades_df, f'Editando_Actividad_{actividad["id_actividad"]}', actividad)
@@ -350,7 +348,6 @@ class EmployeeInterface:
                                 st.success("actividad eliminada exitosamente")
                                 st.session_state.show_confirm = False
                                 del st.session_state['activitie_to_delete']
-                                st.cache_data.clear()
                                 st.rerun()
                             else:
                                 st.error("Error al eliminar actividad")
@@ -370,9 +367,12 @@ class EmployeeInterface:
         st.header("➕ Agregar Nueva Acción")
 
         # Obtener datos
-        contratos_df = self.db_manager.get_data('Contratos')
-        actividades_df = self.db_manager.get_data('Actividades')
-        reportes_df = self.db_manager.get_data('Reportes')
+        contratos_df = self.db_manager.get_data(
+            'Contratos', columns=['id_contrato', 'nombre_contrato', 'id_empleado'])
+        actividades_df = self.db_manager.get_data(
+            'Actividades', columns=['id_actividad', 'Nro', 'descripcion', 'id_contrato'])
+        reportes_df = self.db_manager.get_data(
+            'Reportes', columns=['id_reporte', 'id_empleado', 'id_actividad'])
 
         # Filtrar contratos del empleado
         mis_contratos = contratos_df[contratos_df['id_empleado']
@@ -413,6 +413,7 @@ class EmployeeInterface:
                         with col1:
                             acciones_realizadas = st.text_area(
                                 "Acciones Realizadas", height=150)
+                            comentarios = st.text_input("Comentarios (opcional)")
 
                         with col2:
                             porcentaje = st.slider(
@@ -442,11 +443,11 @@ class EmployeeInterface:
                                     'entregable': entregable,
                                     'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                                 }
-                                condicion = f"id_reporte = {reporte_existente.iloc[0]['id_reporte']}"
+                                condicion = {
+                                    'id_reporte': reporte_existente.iloc[0]['id_reporte']}
                                 if self.db_manager.update_data('Reportes', datos_actualizacion, condicion):
                                     st.success(
                                         "Reporte actualizado exitosamente.")
-                                    st.cache_data.clear()
                                     st.rerun()
                                 else:
                                     st.error("Error al actualizar el reporte.")
@@ -464,7 +465,6 @@ class EmployeeInterface:
                                 }
                                 if self.db_manager.insert_data('Reportes', nuevo_reporte):
                                     st.success("Acción guardada exitosamente.")
-                                    st.cache_data.clear()
                                     st.rerun()
                                 else:
                                     st.error("Error al guardar la acción.")
@@ -472,43 +472,37 @@ class EmployeeInterface:
                 st.warning(
                     "No hay actividades disponibles para este contrato.")
 
+    @timed_page
     def show_my_reports(self):
         """Muestra los reportes del empleado con paginación"""
         st.header("📊 Mis Reportes")
 
-        reportes_df = self._get_cached_data(
-            'Reportes', {'id_empleado': self.employee_id})
-        actividades_df = self._get_cached_data('Actividades')
-
-        # Filtrar reportes del empleado
-        mis_reportes = reportes_df[reportes_df['id_empleado']
-                                   == self.employee_id]
+        # Reportes del empleado con la descripción de su actividad
+        query = self.db_manager.query('Reportes', 'r') \
+            .select('r.fecha', 'a.descripcion', 'r.acciones_realizadas', 'r.porcentaje', 'r.estado') \
+            .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a') \
+            .where('r.id_empleado', '=', self.employee_id)
 
-        # Paginación
+        # Paginación: el total se cuenta en la base de datos y solo se trae la página visible
         page_size = st.selectbox("Registros por página", [5, 10, 20], index=1)
-        total_pages = max(1, (len(mis_reportes) // page_size) +
-                          (1 if len(mis_reportes) % page_size > 0 else 0))
+        total_reportes = query.count()
+        total_pages = max(1, (total_reportes // page_size) +
+                          (1 if total_reportes % page_size > 0 else 0))
         page = st.number_input('Página', min_value=1,
                                max_value=total_pages, value=1)
-        start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, len(mis_reportes))
+        mis_reportes = query.order_by('r.id_reporte').limit(
+            page_size).offset((page - 1) * page_size).fetch()
 
         if not mis_reportes.empty:
-            # Combinar con información de actividades
             reportes_detallados = []
-            for idx in range(start_idx, end_idx):
-                reporte = mis_reportes.iloc[idx]
-                actividad = actividades_df[actividades_df['id_actividad']
-                                           == reporte['id_actividad']]
-                if not actividad.empty:
-                    actividad_info = actividad.iloc[0]
-                    reportes_detallados.append({
-                        'Fecha': reporte['fecha'].strftime("%Y-%m-%d %H:%M:%S"),
-                        'Actividad': actividad_info['descripcion'],
-                        'Acciones': reporte['acciones_realizadas'][:100] + "..." if len(str(reporte['acciones_realizadas'])) > 100 else reporte['acciones_realizadas'],
-                        'Porcentaje': f"{reporte['porcentaje']}%",
-                        'Estado': "✅ Aprobado" if reporte['estado'] else "⏳ En Revisión",
-                    })
+            for _, reporte in mis_reportes.iterrows():
+                reportes_detallados.append({
+                    'Fecha': pd.to_datetime(reporte['fecha']).strftime("%Y-%m-%d %H:%M:%S"),
+                    'Actividad': reporte['descripcion'],
+                    'Acciones': reporte['acciones_realizadas'][:100] + "..." if len(str(reporte['acciones_realizadas'])) > 100 else reporte['acciones_realizadas'],
+                    'Porcentaje': f"{reporte['porcentaje']}%",
+                    'Estado': "✅ Aprobado" if pd.notna(reporte['estado']) and reporte['estado'] else "⏳ En Revisión",
+                })
 
             if reportes_detallados:
                 reportes_df_display = pd.DataFrame(reportes_detallados)
@@ -518,6 +512,7 @@ class EmployeeInterface:
         else:
             st.info("No tienes reportes registrados")
 
+    @timed_page
     def show_notifications(self):
         """Muestra las notificaciones del empleado"""
         st.header("📧 Mis Notificaciones")
@@ -543,9 +538,9 @@ class EmployeeInterface:
                     if not notif['leido']:
                         if st.button("Marcar como leída", key=f"read_{notif['id_notificacion']}"):
                             # Marcar como leída
-                            condicion = f"id_notificacion = {notif['id_notificacion']}"
+                            condicion = {
+                                'id_notificacion': notif['id_notificacion']}
                             if self.db_manager.update_data('Notificaciones', {'leido': True}, condicion):
-                                st.cache_data.clear()
                                 st.rerun()
         else:
             st.info("No tienes notificaciones")
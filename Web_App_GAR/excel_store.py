@@ -0,0 +1,375 @@
+from logger import setup_logging
+from typing import Any, Callable, Dict, List, Optional
+from contextlib import contextmanager
+import pandas as pd
+from openpyxl import load_workbook
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+logger = setup_logging()
+# Importar pyarrow de forma opcional
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning(
+        "pyarrow no está disponible. El respaldo Excel se leerá sin caché columnar.")
+
+
+class ExcelColumnarCache:
+    """Caché en disco de las hojas de un libro Excel en formato Arrow IPC.
+
+    La primera lectura convierte todas las hojas del libro a archivos
+    ``.arrow`` junto al libro; las siguientes se leen por memory-map. La
+    clave de cada archivo incluye el mtime del ``.xlsx``, por lo que la
+    caché se reconstruye sola cuando el libro cambia.
+    """
+
+    def __init__(self, workbook_path: str, cache_dir: str = None) -> None:
+        self.workbook_path = workbook_path
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.dirname(os.path.abspath(workbook_path)), ".excel_cache")
+        self._stem = os.path.splitext(os.path.basename(workbook_path))[0]
+        self._lock = threading.Lock()
+        # Hojas que no se pudieron convertir en la versión actual del libro
+        self._failed: Dict[str, set] = {}
+
+    def _workbook_key(self) -> str:
+        """Identifica la versión del libro por su mtime y tamaño"""
+        stat = os.stat(self.workbook_path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _sidecar_path(self, sheet_name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._stem}.{sheet_name}.{key}.arrow")
+
+    def _remove_stale(self, sheet_name: str, key: str) -> None:
+        """Elimina los archivos de versiones anteriores de la hoja"""
+        pattern = os.path.join(
+            self.cache_dir, f"{glob.escape(self._stem)}.{glob.escape(sheet_name)}.*.arrow")
+        for path in glob.glob(pattern):
+            if path != self._sidecar_path(sheet_name, key):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar la caché {path}: {e}")
+
+    @staticmethod
+    def _to_arrow(df: pd.DataFrame) -> "pa.Table":
+        """Convierte la hoja a Arrow; las columnas object con tipos mezclados pasan a texto"""
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = df.copy()
+            for column in df.columns[df.dtypes == object]:
+                df[column] = df[column].map(lambda v: v if pd.isna(v) else str(v))
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+    def _write_sidecar(self, sheet_name: str, df: pd.DataFrame, key: str) -> bool:
+        """Escribe la hoja en Arrow IPC de forma atómica"""
+        path = self._sidecar_path(sheet_name, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            table = self._to_arrow(df)
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+            self._remove_stale(sheet_name, key)
+            return True
+        except Exception as e:
+            logger.warning(
+                f"No se pudo convertir la hoja {sheet_name} a Arrow: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _build(self, key: str) -> Dict[str, pd.DataFrame]:
+        """Lee el libro completo una sola vez y genera un archivo por hoja"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logger.info(
+            f"Generando caché columnar para {self.workbook_path} ({key})")
+        sheets = pd.read_excel(self.workbook_path, sheet_name=None)
+        self._failed = {key: {sheet_name for sheet_name, df in sheets.items()
+                              if not self._write_sidecar(sheet_name, df, key)}}
+        return sheets
+
+    def read_sheet(self, sheet_name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Lee una hoja desde la caché, reconstruyéndola si el libro cambió"""
+        if not PYARROW_AVAILABLE:
+            return pd.read_excel(self.workbook_path, sheet_name=sheet_name, usecols=columns)
+
+        key = self._workbook_key()
+        if sheet_name in self._failed.get(key, ()):
+            # Sin caché para esta hoja: se lee solo ella, no el libro completo
+            return pd.read_excel(self.workbook_path, sheet_name=sheet_name, usecols=columns)
+        path = self._sidecar_path(sheet_name, key)
+        if not os.path.exists(path):
+            with self._lock:
+                if not os.path.exists(path):
+                    sheets = self._build(key)
+                    if not os.path.exists(path):
+                        # La hoja no se pudo convertir: se usa la lectura de pandas
+                        df = sheets[sheet_name]
+                        return df[list(columns)] if columns else df
+
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns:
+            table = table.select(list(columns))
+        return table.to_pandas()
+
+
+def iter_excel_sheet(workbook_path: str, sheet_name: str, chunk_size: int = 5000):
+    """Lee una hoja en modo solo lectura y genera DataFrames de ``chunk_size`` filas.
+
+    Usa el lector en streaming de openpyxl, por lo que la memoria depende
+    del tamaño del bloque y no del tamaño de la hoja.
+    """
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) for c in header]
+        chunk = []
+        for row in rows:
+            chunk.append(row[:len(columns)])
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+
+class ExcelFileLock:
+    """Bloqueo entre procesos basado en un archivo ``.lock`` junto al libro"""
+
+    def __init__(self, workbook_path: str, timeout: float = 30.0, stale_after: float = 120.0) -> None:
+        self.lock_path = f"{workbook_path}.lock"
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def _remove_if_stale(self) -> None:
+        """Elimina el bloqueo si quedó abandonado por un proceso caído"""
+        try:
+            if time.time() - os.path.getmtime(self.lock_path) > self.stale_after:
+                logger.warning(f"Eliminando bloqueo abandonado {self.lock_path}")
+                os.remove(self.lock_path)
+        except OSError:
+            pass
+
+    @contextmanager
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT |
+                             os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"No se pudo bloquear {self.lock_path}")
+                self._remove_if_stale()
+                time.sleep(0.05)
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            yield
+        finally:
+            try:
+                os.remove(self.lock_path)
+            except OSError:
+                pass
+
+
+class ExcelWriteBuffer:
+    """Escritura diferida y por lotes sobre un libro Excel.
+
+    Cada inserción, actualización o eliminación se agrega a un diario
+    (``<libro>.journal.jsonl``) y se aplica al libro en lote cuando el
+    diario alcanza ``max_pending`` operaciones, cuando vence el
+    temporizador de ``flush_interval`` segundos o al cerrar. El libro se
+    reescribe una sola vez por lote, en un archivo temporal que reemplaza
+    al original. Mientras tanto, ``read_sheet`` superpone las operaciones
+    del diario a lo leído del libro, de modo que leer no obliga a aplicarlo.
+    Una operación que no se puede aplicar se aparta en
+    ``<libro>.rejected.journal.jsonl`` para no bloquear a las siguientes.
+    """
+
+    def __init__(self, workbook_path: str, max_pending: int = 100, flush_interval: float = 5.0) -> None:
+        self.workbook_path = workbook_path
+        self.journal_path = f"{workbook_path}.journal.jsonl"
+        self.rejected_path = f"{workbook_path}.rejected.journal.jsonl"
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.file_lock = ExcelFileLock(workbook_path)
+        self._lock = threading.RLock()
+        self._timer = None
+        self._pending = 0
+        atexit.register(self.flush)
+        if os.path.exists(self.journal_path):
+            # Operaciones que quedaron sin aplicar en una ejecución anterior
+            logger.info(f"Recuperando diario pendiente {self.journal_path}")
+            self.flush()
+
+    def insert(self, sheet_name: str, data: Dict[str, Any]) -> bool:
+        return self._append({"op": "insert", "sheet": sheet_name, "data": data})
+
+    def update(self, sheet_name: str, data: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+        return self._append({"op": "update", "sheet": sheet_name, "data": data, "condition": condition})
+
+    def delete(self, sheet_name: str, condition: Dict[str, Any]) -> bool:
+        return self._append({"op": "delete", "sheet": sheet_name, "condition": condition})
+
+    def has_pending(self) -> bool:
+        return self._pending > 0 or os.path.exists(self.journal_path)
+
+    def _append(self, entry: Dict[str, Any]) -> bool:
+        """Registra la operación en el diario y programa su aplicación"""
+        try:
+            line = json.dumps(entry, default=str, ensure_ascii=False)
+            with self._lock:
+                with self.file_lock.acquire():
+                    with open(self.journal_path, "a", encoding="utf-8") as journal:
+                        journal.write(line + "\n")
+                self._pending += 1
+                if self._pending >= self.max_pending:
+                    return self.flush()
+                if self._timer is None:
+                    self._timer = threading.Timer(
+                        self.flush_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+            return True
+        except Exception as e:
+            logger.error(f"Error registrando operación en el diario de Excel: {e}")
+            return False
+
+    @staticmethod
+    def _matches(series: pd.Series, value: Any) -> pd.Series:
+        """Compara la columna con el valor en el tipo de la columna (5 coincide con 5.0)"""
+        if value is None:
+            return series.isna()
+        try:
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return series == pd.Timestamp(value)
+            if pd.api.types.is_numeric_dtype(series):
+                return series == float(value)
+            if isinstance(value, (int, float)):
+                # Columna object con números mezclados con texto
+                return (pd.to_numeric(series, errors="coerce") == float(value)) | \
+                    (series.astype(str) == str(value))
+        except (TypeError, ValueError):
+            pass
+        return series.astype(str) == str(value)
+
+    @classmethod
+    def _mask(cls, df: pd.DataFrame, condition: Dict[str, Any]) -> pd.Series:
+        mask = pd.Series(True, index=df.index)
+        for column, value in condition.items():
+            mask &= cls._matches(df[column], value)
+        return mask
+
+    @classmethod
+    def _apply(cls, sheets: Dict[str, pd.DataFrame], entry: Dict[str, Any]) -> None:
+        """Aplica una operación del diario sobre las hojas cargadas"""
+        df = sheets.get(entry["sheet"], pd.DataFrame())
+        if entry["op"] == "insert":
+            row = dict(entry["data"])
+            id_column = df.columns[0] if len(df.columns) else None
+            if id_column and id_column.startswith("id_") and id_column not in row:
+                # Emula el autoincremento de la clave primaria
+                row[id_column] = int(df[id_column].max()) + \
+                    1 if not df.empty else 1
+            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+        elif entry["op"] == "update":
+            mask = cls._mask(df, entry["condition"])
+            for column, value in entry["data"].items():
+                df.loc[mask, column] = value
+        elif entry["op"] == "delete":
+            df = df[~cls._mask(df, entry["condition"])]
+        sheets[entry["sheet"]] = df
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, encoding="utf-8") as journal:
+            return [json.loads(line) for line in journal if line.strip()]
+
+    def _reject(self, entry: Dict[str, Any], error: Exception) -> None:
+        """Aparta una operación que no se pudo aplicar"""
+        logger.error(f"Operación del diario de Excel descartada ({error}): {entry}")
+        try:
+            with open(self.rejected_path, "a", encoding="utf-8") as rejected:
+                rejected.write(json.dumps(
+                    dict(entry, error=str(error)), default=str, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.error(f"No se pudo guardar la operación descartada: {e}")
+
+    def read_sheet(self, sheet_name: str, read: Callable[[Optional[List[str]]], pd.DataFrame],
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Lee la hoja con ``read(columns)`` y le superpone las operaciones pendientes del diario"""
+        if not os.path.exists(self.journal_path):
+            return read(columns)
+        # Con el bloqueo, el libro y el diario leídos corresponden al mismo momento
+        with self._lock:
+            with self.file_lock.acquire():
+                entries = [entry for entry in self._read_journal() if entry["sheet"] == sheet_name]
+                if not entries:
+                    return read(columns)
+                # Las condiciones y el autoincremento necesitan la hoja completa
+                sheets = {sheet_name: read(None)}
+        for entry in entries:
+            try:
+                self._apply(sheets, entry)
+            except Exception as e:
+                # Se descartará (y registrará) al aplicar el diario
+                logger.debug(f"Operación pendiente omitida en la lectura: {e}")
+        df = sheets[sheet_name]
+        if columns:
+            df = df[[column for column in columns if column in df.columns]]
+        return df.reset_index(drop=True)
+
+    def flush(self) -> bool:
+        """Aplica al libro todas las operaciones pendientes en un único guardado"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not os.path.exists(self.journal_path):
+                self._pending = 0
+                return True
+            tmp_path = os.path.join(os.path.dirname(os.path.abspath(self.workbook_path)),
+                                    f".{os.path.basename(self.workbook_path)}.{os.getpid()}.tmp.xlsx")
+            try:
+                with self.file_lock.acquire():
+                    entries = self._read_journal()
+                    sheets = pd.read_excel(self.workbook_path, sheet_name=None)
+                    for entry in entries:
+                        try:
+                            self._apply(sheets, entry)
+                        except Exception as e:
+                            self._reject(entry, e)
+                    with pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+                        for sheet_name, df in sheets.items():
+                            df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    os.replace(tmp_path, self.workbook_path)
+                    os.remove(self.journal_path)
+                logger.info(
+                    f"Diario de Excel aplicado: {len(entries)} operaciones en {self.workbook_path}")
+                self._pending = 0
+                return True
+            except Exception as e:
+                logger.error(f"Error aplicando el diario de Excel: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
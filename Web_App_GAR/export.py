@@ -0,0 +1,160 @@
+from logger import setup_logging
+from typing import Iterable, Iterator, Optional
+from openpyxl import Workbook
+from table_schema import BOOL_COLUMNS, CATEGORY_COLUMNS, DATETIME_COLUMNS, INT_COLUMNS
+import pandas as pd
+import glob
+import os
+import tempfile
+import time
+
+logger = setup_logging()
+# Importar pyarrow de forma opcional (exportación a Parquet)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Los archivos generados se guardan aquí y se borran al superar EXPORT_MAX_AGE segundos,
+# aunque la sesión que los pidió haya terminado sin descargarlos
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "gar_exportaciones")
+EXPORT_MAX_AGE = 3600
+
+# Formato -> (extensión, tipo MIME)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+if PYARROW_AVAILABLE:
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+
+
+def _python_rows(df: pd.DataFrame) -> Iterator[tuple]:
+    """Filas con valores nativos (None en lugar de NA/NaT) para openpyxl"""
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        yield tuple(v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for v in row)
+
+
+def write_csv(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    """Escribe los bloques en CSV a medida que llegan; retorna el total de filas"""
+    total = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as handle:
+        for chunk in chunks:
+            chunk.to_csv(handle, header=total == 0, index=False)
+            total += len(chunk)
+    return total
+
+
+def write_excel(chunks: Iterable[pd.DataFrame], path: str, sheet_name: str = "Datos") -> int:
+    """Escribe los bloques con el modo write_only de openpyxl (memoria constante)"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    total = 0
+    for chunk in chunks:
+        if total == 0:
+            sheet.append(list(chunk.columns))
+        for row in _python_rows(chunk):
+            sheet.append(row)
+        total += len(chunk)
+    workbook.save(path)
+    return total
+
+
+def parquet_schema(df: pd.DataFrame) -> "pa.Schema":
+    """Esquema del archivo completo: tipos por nombre de columna (table_schema) y,
+    para las demás, los del primer bloque; una columna sin valores se declara como texto"""
+    fields = []
+    for field in pa.Schema.from_pandas(df, preserve_index=False):
+        kind = df[field.name].dtype.kind
+        if field.name in INT_COLUMNS and kind != "f":
+            type_ = pa.int64()
+        elif field.name in BOOL_COLUMNS:
+            type_ = pa.bool_()
+        elif field.name in DATETIME_COLUMNS:
+            type_ = pa.timestamp("us")
+        elif field.name in CATEGORY_COLUMNS or pa.types.is_null(field.type):
+            type_ = pa.string()
+        else:
+            type_ = field.type
+        fields.append(pa.field(field.name, type_))
+    return pa.schema(fields)
+
+
+def write_parquet(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    """Escribe cada bloque como un row group de Parquet"""
+    writer = None
+    total = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # Un esquema inferido solo del primer bloque falla si una columna
+                # viene vacía en él y con valores después
+                writer = pq.ParquetWriter(path, parquet_schema(chunk))
+            table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def export_to_file(chunks: Iterable[pd.DataFrame], export_format: str,
+                   name: str = "exportacion") -> Optional[str]:
+    """Exporta los bloques a un archivo temporal; retorna su ruta o None si falla.
+
+    El archivo queda en disco para ofrecerlo con ``st.download_button``;
+    quien lo pide puede borrarlo con ``remove_export`` y, si no lo hace,
+    se elimina en una exportación posterior al superar ``EXPORT_MAX_AGE``.
+    """
+    extension, _ = EXPORT_FORMATS[export_format]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    purge_exports()
+    fd, path = tempfile.mkstemp(prefix=f"{name}_", suffix=f".{extension}", dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        if export_format == "CSV":
+            total = write_csv(chunks, path)
+        elif export_format == "Excel":
+            total = write_excel(chunks, path, sheet_name=name[:31])
+        else:
+            total = write_parquet(chunks, path)
+        logger.info(f"Exportación {export_format} de {name}: {total} filas en {path}")
+        return path
+    except Exception as e:
+        logger.error(f"Error exportando {name} a {export_format}: {e}")
+        remove_export(path)
+        return None
+
+
+def read_export(path: str) -> bytes:
+    """Contenido de una exportación (para ``st.download_button`` al hacer clic)"""
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+def remove_export(path: Optional[str]) -> None:
+    """Elimina un archivo de exportación temporal"""
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"No se pudo eliminar la exportación {path}: {e}")
+
+
+def purge_exports(max_age: float = EXPORT_MAX_AGE) -> int:
+    """Elimina las exportaciones más antiguas que ``max_age`` segundos; retorna cuántas"""
+    removed = 0
+    limit = time.time() - max_age
+    for path in glob.glob(os.path.join(EXPORT_DIR, "*")):
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # Otra sesión la eliminó primero
+            pass
+    return removed
@@ -0,0 +1,172 @@
+from logger import setup_logging, setup_slow_query_logging
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import pandas as pd
+import re
+import threading
+import time
+
+logger = setup_logging()
+slow_logger = setup_slow_query_logging()
+
+# Literales y parámetros que se reemplazan por "?" al normalizar una sentencia
+_PARAM_RE = re.compile(r":\w+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE_RE = re.compile(r"\s+")
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def fingerprint(statement: str) -> str:
+    """Forma normalizada de una sentencia: sin valores y con las listas IN colapsadas"""
+    statement = _PARAM_RE.sub("?", statement)
+    statement = _LIST_RE.sub("?, ...", statement)
+    return _SPACE_RE.sub(" ", statement).strip()
+
+
+def frame_bytes(df: Any) -> int:
+    """Memoria ocupada por un DataFrame (sin medir objetos Python en profundidad)"""
+    try:
+        return int(df.memory_usage(index=False).sum())
+    except Exception:
+        return 0
+
+
+class QueryStats:
+    """Registro en memoria de las operaciones de ``DatabaseManager``.
+
+    Cada operación se guarda en un búfer circular de ``capacity`` entradas
+    con su backend, tablas, sentencia normalizada, filas, bytes,
+    resultado de la caché y duración. Las que superan
+    ``slow_threshold_ms`` se escriben además en el log de consultas lentas.
+    El tiempo acumulado por sesión de Streamlit (``db_time_ms``) permite
+    separar el tiempo de base de datos del de render en cada página; se
+    guardan como máximo ``max_sessions`` sesiones (las menos recientes se
+    descartan) y ``forget_session`` libera la de un rerun ya medido.
+    """
+
+    def __init__(self, capacity: int = 5000, slow_threshold_ms: float = 500,
+                 max_sessions: int = 1000) -> None:
+        self.capacity = capacity
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_sessions = max_sessions
+        self._records: deque = deque(maxlen=capacity)
+        self._db_time: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _session_id() -> Optional[str]:
+        # Los hilos de get_many llevan el contexto de la sesión que los lanzó
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return ctx.session_id if ctx is not None else None
+
+    def db_time_ms(self, session_id: str = None) -> float:
+        """Tiempo total de base de datos acumulado por la sesión (la actual por defecto)"""
+        session_id = session_id or self._session_id()
+        with self._lock:
+            return self._db_time.get(session_id, 0.0)
+
+    def forget_session(self, session_id: str = None) -> None:
+        """Descarta el tiempo acumulado de la sesión (la actual por defecto)"""
+        session_id = session_id or self._session_id()
+        with self._lock:
+            self._db_time.pop(session_id, None)
+
+    def record(self, operation: str, backend: Optional[str], tables: Iterable[str],
+               statement: str, duration_ms: float, rows: int = 0, nbytes: int = 0,
+               cache: Optional[str] = None, error: bool = False) -> None:
+        entry = {
+            "momento": datetime.now(),
+            "operacion": operation,
+            "backend": backend or "-",
+            "tablas": ", ".join(tables),
+            "sentencia": fingerprint(statement),
+            "filas": rows,
+            "bytes": nbytes,
+            "cache": cache or "-",
+            "error": error,
+            "duracion_ms": duration_ms,
+        }
+        session_id = self._session_id()
+        with self._lock:
+            self._records.append(entry)
+            if session_id is not None:
+                self._db_time[session_id] = self._db_time.get(session_id, 0.0) + duration_ms
+                self._db_time.move_to_end(session_id)
+                while len(self._db_time) > self.max_sessions:
+                    self._db_time.popitem(last=False)
+        if duration_ms >= self.slow_threshold_ms:
+            slow_logger.warning(
+                f"{duration_ms:.1f} ms | {entry['operacion']} | {entry['backend']} | "
+                f"{entry['tablas']} | {entry['filas']} filas | caché {entry['cache']} | "
+                f"{entry['sentencia']}")
+
+    @contextmanager
+    def measure(self, operation: str, backend: Optional[str], tables: Iterable[str],
+                statement: Union[str, Callable[[], str]]):
+        """Mide el bloque; el bloque completa ``rows``, ``bytes``, ``cache`` y ``error`` del dict entregado"""
+        outcome = {"rows": 0, "bytes": 0, "cache": None, "error": False}
+        tables = [tables] if isinstance(tables, str) else list(tables)
+        start = time.perf_counter()
+        error = False
+        try:
+            yield outcome
+        except Exception:
+            error = True
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            try:
+                text = statement() if callable(statement) else statement
+            except Exception:
+                # Sentencia inválida (ya registrada por quien la construye)
+                text = f"{operation} {', '.join(tables)}"
+            self.record(operation, backend, tables, text, duration_ms, outcome["rows"],
+                        outcome["bytes"], outcome["cache"], error or outcome["error"])
+
+    def snapshot(self) -> pd.DataFrame:
+        """Copia del búfer como DataFrame (una fila por operación)"""
+        with self._lock:
+            records = list(self._records)
+        return pd.DataFrame(records, columns=[
+            "momento", "operacion", "backend", "tablas", "sentencia",
+            "filas", "bytes", "cache", "error", "duracion_ms"])
+
+    def percentiles(self, by: str = "operacion") -> pd.DataFrame:
+        """p50/p95/p99 de la duración agrupados por ``by``"""
+        df = self.snapshot()
+        if df.empty:
+            return pd.DataFrame()
+        grouped = df.groupby(by)["duracion_ms"]
+        result = grouped.quantile(list(PERCENTILES)).unstack()
+        result.columns = [f"p{int(q * 100)}_ms" for q in PERCENTILES]
+        result.insert(0, "llamadas", grouped.size())
+        return result.reset_index()
+
+    def top_statements(self, limit: int = 20) -> pd.DataFrame:
+        """Sentencias normalizadas ordenadas por tiempo total"""
+        df = self.snapshot()
+        if df.empty:
+            return pd.DataFrame()
+        df["acierto"] = df["cache"] == "hit"
+        grouped = df.groupby(["sentencia", "operacion"])
+        result = grouped.agg(
+            llamadas=("duracion_ms", "size"),
+            total_ms=("duracion_ms", "sum"),
+            media_ms=("duracion_ms", "mean"),
+            p50_ms=("duracion_ms", lambda s: s.quantile(0.5)),
+            p95_ms=("duracion_ms", lambda s: s.quantile(0.95)),
+            p99_ms=("duracion_ms", lambda s: s.quantile(0.99)),
+            filas=("filas", "sum"),
+            bytes=("bytes", "sum"),
+            aciertos_cache=("acierto", "mean"),
+            errores=("error", "sum"),
+        )
+        return result.sort_values("total_ms", ascending=False).head(limit).reset_index()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
@@ -1,31 +1,179 @@
 import logging
+import logging.handlers
+import atexit
+import glob
+import gzip
+import json
 import os
+import queue
+import shutil
+import sys
 from datetime import datetime
 
+ROOT_LOGGER = "gestion_colaboradores"
+LOG_DIR = "logs"
 
-def setup_logging():
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    
-    log_file = os.path.join(log_dir, f"procesamiento_{datetime.now().strftime('%Y%m%d')}.log")
-    
-    logger = logging.getLogger("gestion_colaboradores")
+# Configuración por variables de entorno:
+#   GAR_LOG_LEVEL      nivel general (INFO por defecto)
+#   GAR_LOG_LEVELS     niveles por módulo, p. ej. "database=DEBUG,cache=WARNING"
+#   GAR_LOG_JSON       1 para escribir el archivo en JSON (una línea por registro)
+#   GAR_LOG_MAX_BYTES  tamaño máximo del archivo antes de rotar (10 MB)
+#   GAR_LOG_BACKUPS    archivos rotados que se conservan (14)
+LOG_LEVEL = os.environ.get("GAR_LOG_LEVEL", "INFO").upper()
+LOG_JSON = os.environ.get("GAR_LOG_JSON", "0") == "1"
+LOG_MAX_BYTES = int(os.environ.get("GAR_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.environ.get("GAR_LOG_BACKUPS", "14"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s'
+
+_listeners = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una línea"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "momento": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "modulo": record.module,
+            "linea": record.lineno,
+            "hilo": record.threadName,
+            "mensaje": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rota el archivo al cambiar de día o al superar ``max_bytes``.
+
+    El archivo activo conserva un nombre fijo (``procesamiento.log``); los
+    rotados se renombran con la fecha y la hora de la rotación, se
+    comprimen con gzip y solo se conservan los ``backup_count`` más
+    recientes. Se usa desde el hilo del ``QueueListener``, de modo que la
+    rotación y la compresión no bloquean las peticiones.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = LOG_MAX_BYTES,
+                 backup_count: int = LOG_BACKUPS, compress: bool = True) -> None:
+        super().__init__(filename, maxBytes=max_bytes, encoding="utf-8", delay=True)
+        self.backup_count = backup_count
+        self.compress = compress
+        self._day = self._today()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime("%Y%m%d")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._today() != self._day:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def _rotated_pattern(self) -> str:
+        # Solo los nombres que genera doRollover (stem_AAAAMMDD_HHMMSS_ffffff.log[.gz]);
+        # no toca otros archivos del directorio como procesamiento_AAAAMMDD.log
+        stem, ext = os.path.splitext(self.baseFilename)
+        suffix = ".gz" if self.compress else ""
+        return f"{stem}_{'[0-9]' * 8}_{'[0-9]' * 6}_{'[0-9]' * 6}{ext}{suffix}"
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            stem, ext = os.path.splitext(self.baseFilename)
+            target = f"{stem}_{self._day}_{datetime.now().strftime('%H%M%S_%f')}{ext}"
+            os.replace(self.baseFilename, target)
+            if self.compress:
+                with open(target, "rb") as source, gzip.open(f"{target}.gz", "wb") as compressed:
+                    shutil.copyfileobj(source, compressed)
+                os.remove(target)
+            rotated = sorted(glob.glob(self._rotated_pattern()))
+            for old in rotated[:max(len(rotated) - self.backup_count, 0)]:
+                os.remove(old)
+        self._day = self._today()
+        if not self.delay:
+            self.stream = self._open()
+
+
+def _module_levels() -> dict:
+    """Niveles por módulo definidos en GAR_LOG_LEVELS"""
+    levels = {}
+    for item in os.environ.get("GAR_LOG_LEVELS", "").split(","):
+        if "=" in item:
+            module, level = item.split("=", 1)
+            levels[module.strip()] = level.strip().upper()
+    return levels
+
+
+def _start_queue(logger: logging.Logger, handlers: list) -> None:
+    """Envía los registros del logger a una cola atendida por un hilo en segundo plano"""
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    # Vacía las colas antes de terminar el proceso
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def _file_formatter() -> logging.Formatter:
+    return JsonFormatter() if LOG_JSON else logging.Formatter(TEXT_FORMAT)
+
+
+def setup_logging(module: str = None) -> logging.Logger:
+    """Logger del módulo que lo pide (``gestion_colaboradores.<módulo>``).
+
+    La primera llamada configura el logger raíz de la aplicación: un
+    ``QueueHandler`` deja cada registro en una cola y un ``QueueListener``
+    lo escribe en consola y en ``logs/procesamiento.log`` desde su propio
+    hilo, de modo que el hilo de la petición no hace E/S de disco.
+    """
+    root = logging.getLogger(ROOT_LOGGER)
+    if not root.handlers:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        root.setLevel(LOG_LEVEL)
+
+        file_handler = DailyRotatingFileHandler(os.path.join(LOG_DIR, "procesamiento.log"))
+        file_handler.setFormatter(_file_formatter())
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        _start_queue(root, [file_handler, console_handler])
+
+    if module is None:
+        # Nombre del módulo que llama, p. ej. "database"
+        module = sys._getframe(1).f_globals.get("__name__", "__main__")
+    logger = logging.getLogger(f"{ROOT_LOGGER}.{module}")
+    level = _module_levels().get(module)
+    if level:
+        logger.setLevel(level)
+    return logger
+
+
+def setup_slow_query_logging() -> logging.Logger:
+    """Logger de consultas lentas en un archivo propio (logs/consultas_lentas.log)"""
+    logger = logging.getLogger(f"{ROOT_LOGGER}.consultas_lentas")
     logger.setLevel(logging.INFO)
-    
-    # Formato del log
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s')
-    
-    # Evitar agregar handlers duplicados
+    # No se repite en el log general
+    logger.propagate = False
+
     if not logger.handlers:
-        # Handler para archivo
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        
-        # Handler para consola
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-    
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = DailyRotatingFileHandler(os.path.join(LOG_DIR, "consultas_lentas.log"))
+        file_handler.setFormatter(
+            _file_formatter() if LOG_JSON else logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        _start_queue(logger, [file_handler])
+
     return logger
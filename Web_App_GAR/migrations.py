@@ -0,0 +1,168 @@
+from logger import setup_logging
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import text
+
+logger = setup_logging()
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+def _sqlite_index(name: str, table_name: str, columns: str) -> str:
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"
+
+
+def _mssql_index(name: str, table_name: str, columns: str) -> str:
+    return (
+        f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{name}' "
+        f"AND object_id = OBJECT_ID('{table_name}')) "
+        f"CREATE INDEX {name} ON {table_name} ({columns})"
+    )
+
+
+def _indexes(dialect: str, indexes: List[tuple]) -> List[str]:
+    """Genera las sentencias CREATE INDEX idempotentes del dialecto"""
+    build = _mssql_index if dialect == "mssql" else _sqlite_index
+    return [build(*index) for index in indexes]
+
+
+# Índices que cubren los accesos más frecuentes de las pantallas
+ACCESS_PATH_INDEXES = [
+    ("ix_empleados_correo", "Empleados", "correo"),
+    ("ix_contratos_id_empleado", "Contratos", "id_empleado"),
+    ("ix_actividades_id_contrato", "Actividades", "id_contrato"),
+    ("ix_reportes_id_empleado_fecha", "Reportes", "id_empleado, fecha"),
+    ("ix_reportes_id_actividad", "Reportes", "id_actividad"),
+    ("ix_notificaciones_id_empleado_leido", "Notificaciones", "id_empleado, leido"),
+]
+
+SUMMARY_TABLE_SQL = {
+    "sqlite": [
+        "CREATE TABLE IF NOT EXISTS ResumenMensual ("
+        "id_empleado INTEGER NOT NULL, id_contrato INTEGER NOT NULL, mes TEXT NOT NULL, "
+        "actividades_total INTEGER NOT NULL, actividades_reportadas INTEGER NOT NULL, "
+        "porcentaje_promedio REAL, actualizado_en DATETIME, "
+        "PRIMARY KEY (id_empleado, id_contrato, mes))",
+        _sqlite_index("ix_resumenmensual_mes", "ResumenMensual", "mes"),
+    ],
+    "mssql": [
+        "IF OBJECT_ID('ResumenMensual') IS NULL CREATE TABLE ResumenMensual ("
+        "id_empleado INT NOT NULL, id_contrato INT NOT NULL, mes CHAR(7) NOT NULL, "
+        "actividades_total INT NOT NULL, actividades_reportadas INT NOT NULL, "
+        "porcentaje_promedio FLOAT NULL, actualizado_en DATETIME NULL, "
+        "PRIMARY KEY (id_empleado, id_contrato, mes))",
+        _mssql_index("ix_resumenmensual_mes", "ResumenMensual", "mes"),
+    ],
+}
+
+# Cada migración tiene una versión, una descripción y las sentencias por dialecto.
+# Las versiones solo se agregan al final; una migración aplicada no se modifica.
+MIGRATIONS: List[Dict[str, Any]] = [
+    {
+        "version": 1,
+        "descripcion": "Índices para las rutas de acceso de las pantallas",
+        "sqlite": _indexes("sqlite", ACCESS_PATH_INDEXES),
+        "mssql": _indexes("mssql", ACCESS_PATH_INDEXES),
+    },
+    {
+        "version": 2,
+        "descripcion": "Tabla ResumenMensual de avance por empleado, contrato y mes",
+        "sqlite": SUMMARY_TABLE_SQL["sqlite"],
+        "mssql": SUMMARY_TABLE_SQL["mssql"],
+    },
+]
+
+
+class MigrationRunner:
+    """Aplica las migraciones pendientes y registra la versión del esquema.
+
+    La versión aplicada se guarda en la tabla ``schema_version``; cada
+    migración se ejecuta en su propia transacción junto con su registro,
+    por lo que un fallo deja el esquema en la última versión completa.
+    """
+
+    def __init__(self, dialect: str, migrations: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.dialect = dialect
+        self.migrations = sorted(migrations or MIGRATIONS,
+                                 key=lambda m: m["version"])
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1]["version"] if self.migrations else 0
+
+    def _version_table_sql(self) -> str:
+        if self.dialect == "mssql":
+            return (
+                f"IF OBJECT_ID('{SCHEMA_VERSION_TABLE}') IS NULL "
+                f"CREATE TABLE {SCHEMA_VERSION_TABLE} ("
+                "version INT PRIMARY KEY, descripcion NVARCHAR(255), aplicado_en DATETIME)"
+            )
+        return (
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, descripcion TEXT, aplicado_en DATETIME)"
+        )
+
+    def _pending(self, current_version: int) -> List[Dict[str, Any]]:
+        return [m for m in self.migrations if m["version"] > current_version]
+
+    def _record(self, migration: Dict[str, Any]) -> tuple:
+        sql = (f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, descripcion, aplicado_en) "
+               "VALUES (:version, :descripcion, :aplicado_en)")
+        params = {
+            "version": migration["version"],
+            "descripcion": migration["descripcion"],
+            "aplicado_en": datetime.now(),
+        }
+        return sql, params
+
+    def run_sqlite(self, connection) -> int:
+        """Aplica las migraciones pendientes sobre una conexión sqlite3"""
+        connection.execute(self._version_table_sql())
+        applied = 0
+        for migration in self.migrations:
+            # BEGIN IMMEDIATE serializa la actualización entre procesos
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                current = connection.execute(
+                    f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}").fetchone()[0] or 0
+                if migration["version"] <= current:
+                    connection.execute("COMMIT")
+                    continue
+                for statement in migration["sqlite"]:
+                    connection.execute(statement)
+                sql, params = self._record(migration)
+                connection.execute(sql, params)
+                connection.execute("COMMIT")
+                applied += 1
+                logger.info(
+                    f"Migración {migration['version']} aplicada: {migration['descripcion']}")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return applied
+
+    def run_sql_server(self, engine) -> int:
+        """Aplica las migraciones pendientes sobre un motor SQLAlchemy"""
+        with engine.begin() as connection:
+            connection.execute(text(self._version_table_sql()))
+            current = connection.execute(
+                text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+        applied = 0
+        for migration in self._pending(current):
+            with engine.begin() as connection:
+                # El bloqueo de aplicación evita que dos instancias migren a la vez
+                connection.execute(text(
+                    "EXEC sp_getapplock @Resource = 'schema_migrations', "
+                    "@LockMode = 'Exclusive', @LockOwner = 'Transaction'"))
+                current = connection.execute(
+                    text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+                if migration["version"] <= current:
+                    continue
+                for statement in migration["mssql"]:
+                    connection.execute(text(statement))
+                sql, params = self._record(migration)
+                connection.execute(text(sql), params)
+            applied += 1
+            logger.info(
+                f"Migración {migration['version']} aplicada: {migration['descripcion']}")
+        return applied
@@ -0,0 +1,298 @@
+from logger import setup_logging
+from typing import Any, Callable, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import streamlit as st
+import pandas as pd
+import cProfile
+import functools
+import os
+import threading
+import time
+
+logger = setup_logging()
+# Importar pyinstrument de forma opcional (perfiles en HTML)
+try:
+    from pyinstrument import Profiler as InstrumentProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+# Archivo en formato de texto de Prometheus (colector textfile de node_exporter)
+METRICS_PATH = os.environ.get("GAR_METRICS_PATH", os.path.join("logs", "metricas.prom"))
+METRICS_INTERVAL = 10
+# Captura de perfiles: GAR_PROFILE_PAGES=1 activa el modo y se conservan los
+# perfiles de los GAR_PROFILE_KEEP reruns más lentos
+PROFILE_DIR = os.path.join("logs", "perfiles")
+PROFILE_ENABLED = os.environ.get("GAR_PROFILE_PAGES", "0") == "1"
+PROFILE_KEEP = int(os.environ.get("GAR_PROFILE_KEEP", "3"))
+PROFILER = os.environ.get("GAR_PROFILER", "cprofile").lower()
+
+QUANTILES = (0.5, 0.95, 0.99)
+_SESSION_KEY = "_page_timing"
+
+
+class PageStats:
+    """Tiempos de render por página de las interfaces.
+
+    Cada llamada a un método ``show_*``/``manage_*`` decorado con
+    ``timed_page`` registra el tiempo total, el tiempo de base de datos
+    (según ``QueryStats``), el tiempo restante de render, los widgets con
+    key en ``st.session_state`` y la causa del rerun. Las últimas
+    ``capacity`` llamadas quedan en un búfer circular y los totales por
+    página se acumulan para exportarlos como contadores de Prometheus.
+    """
+
+    def __init__(self, capacity: int = 2000) -> None:
+        self.capacity = capacity
+        self._records: deque = deque(maxlen=capacity)
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+        # (duración, ruta) de los perfiles guardados, del más lento al más rápido
+        self._profiles: List[tuple] = []
+        self._profile_lock = threading.Lock()
+
+    def record(self, page: str, wall_ms: float, db_ms: float, cause: str, widgets: int = 0) -> None:
+        entry = {
+            "momento": datetime.now(),
+            "pagina": page,
+            "total_ms": wall_ms,
+            "db_ms": db_ms,
+            "render_ms": max(wall_ms - db_ms, 0.0),
+            "widgets": widgets,
+            "causa": cause,
+        }
+        with self._lock:
+            self._records.append(entry)
+            totals = self._totals.setdefault(
+                page, {"llamadas": 0, "total_ms": 0.0, "db_ms": 0.0, "render_ms": 0.0, "widgets": 0})
+            totals["llamadas"] += 1
+            totals["total_ms"] += entry["total_ms"]
+            totals["db_ms"] += entry["db_ms"]
+            totals["render_ms"] += entry["render_ms"]
+            totals["widgets"] += widgets
+
+    def snapshot(self) -> pd.DataFrame:
+        """Copia del búfer como DataFrame (una fila por render de página)"""
+        with self._lock:
+            records = list(self._records)
+        return pd.DataFrame(records, columns=[
+            "momento", "pagina", "total_ms", "db_ms", "render_ms", "widgets", "causa"])
+
+    def summary(self) -> pd.DataFrame:
+        """Percentiles del tiempo total y medias de DB, render y widgets por página"""
+        df = self.snapshot()
+        if df.empty:
+            return pd.DataFrame()
+        grouped = df.groupby("pagina")
+        result = grouped["total_ms"].quantile(list(QUANTILES)).unstack()
+        result.columns = [f"p{int(q * 100)}_ms" for q in QUANTILES]
+        result.insert(0, "llamadas", grouped.size())
+        result["db_ms"] = grouped["db_ms"].mean()
+        result["render_ms"] = grouped["render_ms"].mean()
+        result["widgets"] = grouped["widgets"].mean()
+        return result.sort_values("p95_ms", ascending=False).reset_index()
+
+    def prometheus_text(self, query_stats=None) -> str:
+        """Métricas de páginas (y de operaciones de base de datos) en formato de texto de Prometheus"""
+        lines = [
+            "# HELP gar_page_seconds Tiempo de render de cada página de la interfaz",
+            "# TYPE gar_page_seconds summary",
+        ]
+        df = self.snapshot()
+        with self._lock:
+            totals = {page: dict(values) for page, values in self._totals.items()}
+        for page, values in sorted(totals.items()):
+            label = f'page="{page}"'
+            tiempos = df.loc[df["pagina"] == page, "total_ms"]
+            for q in QUANTILES:
+                if not tiempos.empty:
+                    lines.append(
+                        f'gar_page_seconds{{{label},quantile="{q}"}} {tiempos.quantile(q) / 1000:.6f}')
+            lines.append(f"gar_page_seconds_sum{{{label}}} {values['total_ms'] / 1000:.6f}")
+            lines.append(f"gar_page_seconds_count{{{label}}} {int(values['llamadas'])}")
+        lines += ["# HELP gar_page_db_seconds_total Tiempo de base de datos dentro de cada página",
+                  "# TYPE gar_page_db_seconds_total counter"]
+        lines += [f'gar_page_db_seconds_total{{page="{page}"}} {values["db_ms"] / 1000:.6f}'
+                  for page, values in sorted(totals.items())]
+        lines += ["# HELP gar_page_render_seconds_total Tiempo de render sin base de datos de cada página",
+                  "# TYPE gar_page_render_seconds_total counter"]
+        lines += [f'gar_page_render_seconds_total{{page="{page}"}} {values["render_ms"] / 1000:.6f}'
+                  for page, values in sorted(totals.items())]
+        lines += ["# HELP gar_page_widgets_total Widgets con key presentes al terminar cada página",
+                  "# TYPE gar_page_widgets_total counter"]
+        lines += [f'gar_page_widgets_total{{page="{page}"}} {int(values["widgets"])}'
+                  for page, values in sorted(totals.items())]
+        if query_stats is not None:
+            percentiles = query_stats.percentiles()
+            if not percentiles.empty:
+                lines += ["# HELP gar_db_operation_seconds Duración de las operaciones de DatabaseManager (búfer reciente)",
+                          "# TYPE gar_db_operation_seconds summary"]
+                for row in percentiles.itertuples(index=False):
+                    label = f'operation="{row.operacion}"'
+                    for q in QUANTILES:
+                        value = getattr(row, f"p{int(q * 100)}_ms") / 1000
+                        lines.append(f'gar_db_operation_seconds{{{label},quantile="{q}"}} {value:.6f}')
+                    lines.append(f"gar_db_operation_seconds_count{{{label}}} {int(row.llamadas)}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, query_stats=None, path: str = METRICS_PATH, force: bool = False) -> None:
+        """Escribe las métricas como máximo cada ``METRICS_INTERVAL`` segundos"""
+        now = time.monotonic()
+        if not force and now - self._last_export < METRICS_INTERVAL:
+            return
+        self._last_export = now
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # Se escribe en un temporal y se reemplaza para no exponer un archivo a medias
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(self.prometheus_text(query_stats))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"No se pudieron exportar las métricas a {path}: {e}")
+
+    def keep_profile(self, page: str, wall_ms: float, profiler: Any) -> Optional[str]:
+        """Guarda el perfil si el rerun está entre los ``PROFILE_KEEP`` más lentos"""
+        with self._profile_lock:
+            if len(self._profiles) >= PROFILE_KEEP and wall_ms <= self._profiles[-1][0]:
+                return None
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            name = f"{page}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{wall_ms:.0f}ms"
+            try:
+                if isinstance(profiler, cProfile.Profile):
+                    path = os.path.join(PROFILE_DIR, f"{name}.prof")
+                    profiler.dump_stats(path)
+                else:
+                    path = os.path.join(PROFILE_DIR, f"{name}.html")
+                    with open(path, "w", encoding="utf-8") as handle:
+                        handle.write(profiler.output_html())
+            except Exception as e:
+                logger.warning(f"No se pudo guardar el perfil de {page}: {e}")
+                return None
+            self._profiles.append((wall_ms, path))
+            self._profiles.sort(key=lambda item: item[0], reverse=True)
+            for _, old_path in self._profiles[PROFILE_KEEP:]:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+            del self._profiles[PROFILE_KEEP:]
+        logger.info(f"Perfil de {page} guardado ({wall_ms:.0f} ms): {path}")
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+
+# Compartido por todas las sesiones del proceso
+page_stats = PageStats()
+# Solo un perfilador puede estar activo a la vez en el proceso
+_profiler_lock = threading.Lock()
+_local = threading.local()
+
+
+def _widget_snapshot() -> Dict[str, str]:
+    """Valores simples de session_state (widgets con key y estado de la app)"""
+    return {key: repr(value) for key, value in st.session_state.items()
+            if not str(key).startswith("_")
+            and isinstance(value, (str, int, float, bool, type(None), datetime))}
+
+
+def _widget_count() -> int:
+    """Widgets con key (y valores simples de la app) en session_state; API pública de Streamlit"""
+    try:
+        return len(_widget_snapshot())
+    except Exception:
+        return 0
+
+
+def _rerun_cause() -> str:
+    """Causa probable del rerun comparando session_state con el rerun anterior"""
+    try:
+        current = _widget_snapshot()
+        previous = st.session_state.get(_SESSION_KEY)
+        st.session_state[_SESSION_KEY] = current
+    except Exception:
+        return "desconocida"
+    if previous is None:
+        return "primera carga"
+    changed = sorted(key for key in current.keys() | previous.keys()
+                     if current.get(key) != previous.get(key))
+    if changed:
+        return "widget: " + ", ".join(changed[:5])
+    # Widget sin key, st.rerun() o recarga del navegador
+    return "rerun"
+
+
+def _start_profiler() -> Any:
+    if not PROFILE_ENABLED or not _profiler_lock.acquire(blocking=False):
+        return None
+    try:
+        if PROFILER == "pyinstrument" and PYINSTRUMENT_AVAILABLE:
+            profiler = InstrumentProfiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+    except Exception as e:
+        logger.warning(f"No se pudo iniciar el perfilador: {e}")
+        _profiler_lock.release()
+        return None
+
+
+def _stop_profiler(profiler: Any) -> None:
+    try:
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        else:
+            profiler.stop()
+    finally:
+        _profiler_lock.release()
+
+
+def timed_page(method: Callable) -> Callable:
+    """Decorador para los métodos ``show_*``/``manage_*`` de las interfaces.
+
+    Registra la llamada en ``page_stats``; en el método más externo de
+    cada rerun además calcula la causa del rerun, exporta las métricas y,
+    con ``GAR_PROFILE_PAGES=1``, perfila el rerun completo.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        page = f"{type(self).__name__}.{method.__name__}"
+        db_manager = getattr(self, "db_manager", None)
+        query_stats = getattr(db_manager, "stats", None)
+        ctx = get_script_run_ctx(suppress_warning=True)
+        outermost = getattr(_local, "depth", 0) == 0
+        if outermost:
+            _local.cause = _rerun_cause() if ctx is not None else "sin sesión"
+        _local.depth = getattr(_local, "depth", 0) + 1
+
+        profiler = _start_profiler() if outermost else None
+        db_start = query_stats.db_time_ms() if query_stats is not None else 0.0
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            db_ms = query_stats.db_time_ms() - db_start if query_stats is not None else 0.0
+            if profiler is not None:
+                _stop_profiler(profiler)
+            _local.depth -= 1
+            widgets = _widget_count() if ctx is not None else 0
+            page_stats.record(page, wall_ms, db_ms, _local.cause, widgets)
+            if outermost:
+                if profiler is not None:
+                    page_stats.keep_profile(page, wall_ms, profiler)
+                if query_stats is not None and ctx is not None:
+                    # El rerun ya se midió; el siguiente vuelve a empezar desde cero
+                    query_stats.forget_session()
+                page_stats.export(query_stats)
+
+    return wrapper
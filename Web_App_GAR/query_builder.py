@@ -0,0 +1,516 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import re
+
+# Nombres de tablas y columnas permitidos en las consultas generadas
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Columna opcionalmente calificada con el alias de su tabla: "r.fecha"
+COLUMN_RE = re.compile(r"^(?:[A-Za-z_][A-Za-z0-9_]*\.)?[A-Za-z_][A-Za-z0-9_]*$")
+
+# Parámetros con nombre generados por compile(): ":p0", ":limit"
+NAMED_PARAM_RE = re.compile(r"(?<![:\w]):([A-Za-z_][A-Za-z0-9_]*)")
+
+COMPARISON_OPERATORS = {"=", "!=", "<>", "<", "<=", ">", ">=", "LIKE", "NOT LIKE"}
+# Carácter de escape de los patrones LIKE (cláusula ESCAPE); "[" es comodín en SQL Server
+LIKE_ESCAPE = "\\"
+LIKE_SPECIAL = ("%", "_", "[")
+JOIN_TYPES = {"INNER", "LEFT"}
+AGGREGATE_FUNCTIONS = {"count", "count_distinct", "sum", "avg", "min", "max"}
+
+
+def validate_identifier(name: str) -> str:
+    """Valida un nombre de tabla o columna antes de incluirlo en SQL"""
+    if not isinstance(name, str) or not IDENTIFIER_RE.match(name):
+        raise ValueError(f"Identificador SQL no válido: {name!r}")
+    return name
+
+
+def escape_like(term: str) -> str:
+    """Escapa los comodines de LIKE para buscar el texto literal"""
+    term = str(term).replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+    for char in LIKE_SPECIAL:
+        term = term.replace(char, LIKE_ESCAPE + char)
+    return term
+
+
+def like_to_regex(pattern: str) -> str:
+    """Traduce un patrón LIKE (con escape ``\\``) a una expresión regular completa"""
+    parts = []
+    chars = iter(str(pattern))
+    for char in chars:
+        if char == LIKE_ESCAPE:
+            parts.append(re.escape(next(chars, LIKE_ESCAPE)))
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return "(?s)^" + "".join(parts) + "$"
+
+
+def validate_column(name: str) -> str:
+    """Valida una columna simple o calificada (alias.columna)"""
+    if not isinstance(name, str) or not COLUMN_RE.match(name):
+        raise ValueError(f"Columna SQL no válida: {name!r}")
+    return name
+
+
+def to_db_value(value: Any) -> Any:
+    """Convierte escalares de numpy/pandas a tipos nativos que aceptan los drivers"""
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+def to_positional(sql: str, params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Convierte parámetros con nombre (:p0) a posicionales (?) para ADBC/ODBC"""
+    values: List[Any] = []
+
+    def replace(match):
+        values.append(params[match.group(1)])
+        return "?"
+    return NAMED_PARAM_RE.sub(replace, sql), values
+
+
+def _bare(column: str) -> str:
+    """Quita el alias de tabla de una columna calificada"""
+    return column.split(".")[-1]
+
+
+def _resolve(df: pd.DataFrame, column: str) -> str:
+    """Nombre en ``df`` de una columna calificada tras los merge de ``to_pandas``.
+
+    Las columnas repetidas de una tabla unida quedan con el sufijo
+    ``_<alias>``; las demás conservan su nombre.
+    """
+    if "." in column:
+        alias, name = column.split(".")
+        if f"{name}_{alias}" in df.columns:
+            return f"{name}_{alias}"
+    return _bare(column)
+
+
+class Query:
+    """Consulta SELECT componible que se compila a SQL con parámetros.
+
+    Ejemplo::
+
+        db.query('Reportes', 'r') \\
+            .select('r.id_reporte', 'a.descripcion') \\
+            .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a') \\
+            .where('r.id_empleado', '=', 3) \\
+            .date_range('r.fecha', inicio, fin) \\
+            .order_by('r.fecha DESC').limit(10) \\
+            .fetch()
+
+    Los valores siempre viajan como parámetros enlazados; solo los nombres
+    de tablas y columnas (validados) forman parte del texto SQL.
+    """
+
+    def __init__(self, table_name: str, alias: str = None, manager=None) -> None:
+        self.table_name = validate_identifier(table_name)
+        self.alias = validate_identifier(alias) if alias else None
+        self.manager = manager
+        self._columns: List[Tuple[str, Optional[str]]] = []
+        self._joins: List[Tuple[str, Optional[str], str, str, str, List[tuple]]] = []
+        self._conditions: List[tuple] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._group_by: List[str] = []
+        self._metrics: List[Tuple[str, str, str, List[tuple]]] = []
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+    def select(self, *columns: str) -> "Query":
+        """Agrega columnas a la proyección ('col', 'a.col' o 'a.col AS nombre')"""
+        for column in columns:
+            parts = column.split()
+            if len(parts) == 3 and parts[1].upper() == "AS":
+                self._columns.append(
+                    (validate_column(parts[0]), validate_identifier(parts[2])))
+            elif len(parts) == 1:
+                self._columns.append((validate_column(parts[0]), None))
+            else:
+                raise ValueError(f"Columna no válida: {column!r}")
+        return self
+
+    def join(self, table_name: str, on: Tuple[str, str], alias: str = None, how: str = "INNER",
+             conditions: List[tuple] = None) -> "Query":
+        """Une otra tabla por igualdad de columnas: on=('r.id_actividad', 'a.id_actividad').
+
+        ``conditions`` agrega al ON comparaciones ``(columna, operador, valor)``
+        sobre la tabla unida; en un LEFT JOIN restringen las filas unidas
+        sin descartar las de la tabla principal.
+        """
+        how = how.upper()
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Tipo de JOIN no válido: {how!r}")
+        left, right = on
+        scratch = Query(table_name)
+        for condition in conditions or []:
+            scratch.where(*condition)
+        self._joins.append((validate_identifier(table_name),
+                            validate_identifier(alias) if alias else None,
+                            how, validate_column(left), validate_column(right),
+                            scratch._conditions))
+        return self
+
+    def left_join(self, table_name: str, on: Tuple[str, str], alias: str = None,
+                  conditions: List[tuple] = None) -> "Query":
+        return self.join(table_name, on, alias, how="LEFT", conditions=conditions)
+
+    def where(self, column: str, operator: str = "=", value: Any = None) -> "Query":
+        """Agrega una condición de comparación (=, !=, <, <=, >, >=, LIKE, NOT LIKE)"""
+        operator = operator.upper()
+        if operator not in COMPARISON_OPERATORS:
+            raise ValueError(f"Operador no válido: {operator!r}")
+        if value is None and operator in ("=", "!=", "<>"):
+            return self.where_null(column, negate=operator != "=")
+        self._conditions.append(("cmp", validate_column(column), operator, to_db_value(value)))
+        return self
+
+    def where_in(self, column: str, values, negate: bool = False) -> "Query":
+        """Agrega una condición IN (o NOT IN) con una lista de valores"""
+        self._conditions.append(
+            ("in", validate_column(column), [to_db_value(v) for v in values], negate))
+        return self
+
+    def where_null(self, column: str, negate: bool = False) -> "Query":
+        self._conditions.append(("null", validate_column(column), negate))
+        return self
+
+    def date_range(self, column: str, start=None, end=None) -> "Query":
+        """Filtra un rango de fechas semiabierto: start <= columna < end"""
+        if start is not None:
+            self.where(column, ">=", start)
+        if end is not None:
+            self.where(column, "<", end)
+        return self
+
+    def search(self, columns: List[str], term: str) -> "Query":
+        """Busca un texto parcial en cualquiera de las columnas (OR de LIKE)"""
+        if not columns:
+            raise ValueError("La búsqueda requiere al menos una columna")
+        self._conditions.append(
+            ("any", [("cmp", validate_column(c), "LIKE", f"%{escape_like(term)}%") for c in columns]))
+        return self
+
+    def filter(self, filters: Dict[str, Any] = None) -> "Query":
+        """Aplica filtros al estilo de get_data: igualdad, lista (IN) o None (IS NULL)"""
+        for column, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                self.where_in(column, list(value))
+            else:
+                self.where(column, "=", value)
+        return self
+
+    def filter_any(self, filters_list: List[Dict[str, Any]]) -> "Query":
+        """Une con OR varios filtros al estilo de ``filter`` (p. ej. las condiciones de un lote)"""
+        self._conditions.append(
+            ("any", [("all", Query(self.table_name).filter(filters)._conditions)
+                     for filters in filters_list]))
+        return self
+
+    def order_by(self, *columns: str) -> "Query":
+        """Agrega columnas de orden: 'col' o 'col DESC'"""
+        for item in columns:
+            parts = item.split()
+            direction = parts[1].upper() if len(parts) > 1 else "ASC"
+            if len(parts) > 2 or direction not in ("ASC", "DESC"):
+                raise ValueError(f"Orden no válido: {item!r}")
+            self._order.append((validate_column(parts[0]), direction == "DESC"))
+        return self
+
+    def group_by(self, *columns: str) -> "Query":
+        """Agrupa por columnas; se proyectan junto con las métricas de ``aggregate``"""
+        self._group_by.extend(validate_column(c) for c in columns)
+        return self
+
+    def aggregate(self, **metrics: tuple) -> "Query":
+        """Agrega métricas calculadas en el servidor.
+
+        Cada métrica es ``nombre=(función, columna)`` o
+        ``nombre=(función, columna, filtros)``; la función es count,
+        count_distinct, sum, avg, min o max, la columna puede ser '*' para
+        count y los filtros (al estilo de ``filter``) limitan las filas que
+        cuentan para esa métrica::
+
+            db.query('Empleados').aggregate(
+                total=('count', '*'), activos=('count', '*', {'activo': True}))
+        """
+        for alias, metric in metrics.items():
+            func, column = metric[0].lower(), metric[1]
+            if func not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Función de agregación no válida: {func!r}")
+            if column != "*":
+                validate_column(column)
+            elif func != "count":
+                raise ValueError(f"'*' solo es válido con count: {alias!r}")
+            conditions = Query(self.table_name).filter(
+                metric[2])._conditions if len(metric) > 2 else []
+            self._metrics.append((validate_identifier(alias), func, column, conditions))
+        return self
+
+    def limit(self, limit: Optional[int]) -> "Query":
+        self._limit = int(limit) if limit is not None else None
+        return self
+
+    def offset(self, offset: Optional[int]) -> "Query":
+        self._offset = int(offset) if offset else None
+        return self
+
+    def referenced_columns(self) -> Optional[List[str]]:
+        """Columnas que necesita una consulta simple; None si requiere todas"""
+        if self._joins or not self._columns or self._metrics:
+            return None
+
+        def condition_columns(condition):
+            if condition[0] in ("any", "all"):
+                return [c for sub in condition[1] for c in condition_columns(sub)]
+            return [condition[1]]
+
+        names = [c for c, _ in self._columns] + \
+            [c for cond in self._conditions for c in condition_columns(cond)] + \
+            [c for c, _ in self._order]
+        return list(dict.fromkeys(_bare(c) for c in names))
+
+    def cache_key(self) -> str:
+        """Representación estable de la consulta para usarla como clave de caché"""
+        return repr((self.table_name, self.alias, self._columns, self._joins,
+                     self._conditions, self._order, self._limit, self._offset,
+                     self._group_by, self._metrics))
+
+    @property
+    def tables(self) -> List[str]:
+        """Tablas de las que depende la consulta (para invalidar la caché)"""
+        return [self.table_name] + [join[0] for join in self._joins]
+
+    # ------------------------------------------------------------------
+    # Compilación
+    # ------------------------------------------------------------------
+    def _compile_condition(self, condition: tuple, params: Dict[str, Any]) -> str:
+        kind = condition[0]
+        if kind == "cmp":
+            _, column, operator, value = condition
+            name = f"p{len(params)}"
+            params[name] = value
+            if operator in ("LIKE", "NOT LIKE"):
+                return f"{column} {operator} :{name} ESCAPE '{LIKE_ESCAPE}'"
+            return f"{column} {operator} :{name}"
+        if kind == "in":
+            _, column, values, negate = condition
+            if not values:
+                # Una lista vacía no debe devolver filas (o todas, si es NOT IN)
+                return "1 = 1" if negate else "1 = 0"
+            names = []
+            for value in values:
+                name = f"p{len(params)}"
+                params[name] = value
+                names.append(f":{name}")
+            return f"{column} {'NOT IN' if negate else 'IN'} ({', '.join(names)})"
+        if kind == "null":
+            _, column, negate = condition
+            return f"{column} IS {'NOT NULL' if negate else 'NULL'}"
+        if kind in ("any", "all"):
+            parts = [self._compile_condition(c, params) for c in condition[1]]
+            if not parts:
+                # OR sin términos es falso; AND sin términos, verdadero
+                return "1 = 0" if kind == "any" else "1 = 1"
+            return "(" + (" OR " if kind == "any" else " AND ").join(parts) + ")"
+        raise ValueError(f"Condición desconocida: {kind}")
+
+    def _compile_from(self, params: Dict[str, Any]) -> str:
+        sql = self.table_name + (f" {self.alias}" if self.alias else "")
+        for table_name, alias, how, left, right, conditions in self._joins:
+            on = [f"{left} = {right}"] + \
+                [self._compile_condition(c, params) for c in conditions]
+            sql += f" {how} JOIN {table_name}{f' {alias}' if alias else ''} ON {' AND '.join(on)}"
+        return sql
+
+    def _compile_metric(self, metric: tuple, params: Dict[str, Any]) -> str:
+        alias, func, column, conditions = metric
+        if conditions:
+            # Agregación condicional: solo cuentan las filas que cumplen los filtros
+            when = " AND ".join(self._compile_condition(c, params) for c in conditions)
+            column = f"CASE WHEN {when} THEN {'1' if column == '*' else column} END"
+        if func == "count_distinct":
+            return f"COUNT(DISTINCT {column}) AS {alias}"
+        return f"{func.upper()}({column}) AS {alias}"
+
+    def _compile_projection(self, params: Dict[str, Any] = None) -> str:
+        if self._metrics:
+            params = {} if params is None else params
+            return ", ".join(self._group_by +
+                             [self._compile_metric(m, params) for m in self._metrics])
+        if not self._columns:
+            return "*"
+        return ", ".join(f"{column} AS {alias}" if alias else column
+                         for column, alias in self._columns)
+
+    def compile_count(self) -> Tuple[str, Dict[str, Any]]:
+        """Genera un SELECT COUNT(*) con los mismos JOIN y filtros, sin orden ni paginación.
+
+        Con ``group_by`` cuenta los grupos, no las filas agrupadas.
+        """
+        params: Dict[str, Any] = {}
+        from_clause = self._compile_from(params)
+        where = [self._compile_condition(c, params) for c in self._conditions]
+        sql = f"FROM {from_clause}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if self._group_by:
+            # Se proyecta una constante: las columnas agrupadas pueden repetir nombre
+            return (f"SELECT COUNT(*) AS total FROM (SELECT 1 AS n {sql} "
+                    f"GROUP BY {', '.join(self._group_by)}) AS grupos"), params
+        return f"SELECT COUNT(*) AS total {sql}", params
+
+    def compile(self, dialect: str = "sqlite") -> Tuple[str, Dict[str, Any]]:
+        """Genera el SQL y sus parámetros para 'sqlite' o 'mssql'"""
+        params: Dict[str, Any] = {}
+        from_clause = self._compile_from(params)
+        where = [self._compile_condition(c, params) for c in self._conditions]
+        order_clause = ", ".join(
+            f"{column} {'DESC' if desc else 'ASC'}" for column, desc in self._order)
+        limit, offset = self._limit, self._offset
+
+        top = ""
+        if dialect == "mssql" and limit is not None and offset is None and not self._order:
+            top = "TOP (:limit) "
+            params["limit"] = limit
+
+        sql = f"SELECT {top}{self._compile_projection(params)} FROM {from_clause}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if self._group_by:
+            sql += " GROUP BY " + ", ".join(self._group_by)
+
+        if dialect == "mssql":
+            if offset is not None or (self._order and limit is not None):
+                # OFFSET ... FETCH requiere un ORDER BY en SQL Server
+                sql += f" ORDER BY {order_clause or '(SELECT NULL)'}"
+                sql += " OFFSET :offset ROWS"
+                params["offset"] = offset or 0
+                if limit is not None:
+                    sql += " FETCH NEXT :limit ROWS ONLY"
+                    params["limit"] = limit
+            elif self._order:
+                sql += f" ORDER BY {order_clause}"
+        else:
+            if self._order:
+                sql += f" ORDER BY {order_clause}"
+            if limit is not None or offset is not None:
+                sql += " LIMIT :limit"
+                params["limit"] = limit if limit is not None else -1
+                if offset is not None:
+                    sql += " OFFSET :offset"
+                    params["offset"] = offset
+        return sql, params
+
+    # ------------------------------------------------------------------
+    # Evaluación en pandas (respaldo Excel)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _mask(df: pd.DataFrame, condition: tuple) -> pd.Series:
+        kind = condition[0]
+        if kind == "cmp":
+            _, column, operator, value = condition
+            series = df[_resolve(df, column)]
+            if operator in ("LIKE", "NOT LIKE"):
+                mask = series.astype(str).str.match(like_to_regex(value), case=False)
+                return ~mask if operator == "NOT LIKE" else mask
+            if isinstance(value, str) and pd.api.types.is_datetime64_any_dtype(series):
+                value = pd.Timestamp(value)
+            return {"=": series.__eq__, "!=": series.__ne__, "<>": series.__ne__,
+                    "<": series.__lt__, "<=": series.__le__,
+                    ">": series.__gt__, ">=": series.__ge__}[operator](value)
+        if kind == "in":
+            _, column, values, negate = condition
+            mask = df[_resolve(df, column)].isin(values)
+            return ~mask if negate else mask
+        if kind == "null":
+            _, column, negate = condition
+            mask = df[_resolve(df, column)].isna()
+            return ~mask if negate else mask
+        result = pd.Series(kind == "all", index=df.index)
+        for sub in condition[1]:
+            mask = Query._mask(df, sub)
+            result = result & mask if kind == "all" else result | mask
+        return result
+
+    def _aggregate_pandas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Calcula las métricas y agrupaciones de ``aggregate`` con pandas"""
+        keys = [df[_resolve(df, c)].rename(_bare(c)) for c in self._group_by]
+        results = {}
+        for alias, func, column, conditions in self._metrics:
+            values = pd.Series(1, index=df.index) if column == "*" else df[_resolve(df, column)]
+            for condition in conditions:
+                values = values.where(self._mask(df, condition))
+            # dropna=False conserva los grupos sin coincidencias de un LEFT JOIN, como en SQL
+            grouped = values.groupby(keys, dropna=False) if keys else values
+            if func == "count":
+                results[alias] = grouped.count()
+            elif func == "count_distinct":
+                results[alias] = grouped.nunique()
+            else:
+                results[alias] = getattr(grouped, "mean" if func == "avg" else func)()
+        if keys:
+            return pd.DataFrame(results).reset_index()
+        return pd.DataFrame([results])
+
+    def count_pandas(self, load_table: Callable[[str], pd.DataFrame]) -> int:
+        """Cuenta con pandas las filas (o los grupos) que cumplen los filtros, sin paginación"""
+        saved = self._limit, self._offset, self._columns, self._order, self._metrics
+        self._limit, self._offset, self._columns, self._order, self._metrics = None, None, [], [], []
+        try:
+            df = self.to_pandas(load_table)
+            if self._group_by:
+                return len(df[[_resolve(df, c) for c in self._group_by]].drop_duplicates())
+            return len(df)
+        finally:
+            self._limit, self._offset, self._columns, self._order, self._metrics = saved
+
+    def to_pandas(self, load_table: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """Evalúa la consulta con pandas sobre las tablas que entrega ``load_table``"""
+        df = load_table(self.table_name)
+        for table_name, alias, how, left, right, conditions in self._joins:
+            other = load_table(table_name)
+            for condition in conditions:
+                other = other[self._mask(other, condition)]
+            df = df.merge(other, how=how.lower(), left_on=_resolve(df, left), right_on=_bare(right),
+                          suffixes=("", f"_{alias or table_name}"))
+        for condition in self._conditions:
+            df = df[self._mask(df, condition)]
+        if self._metrics:
+            df = self._aggregate_pandas(df)
+        if self._order:
+            df = df.sort_values([_resolve(df, c) for c, _ in self._order],
+                                ascending=[not desc for _, desc in self._order])
+        start = self._offset or 0
+        end = start + self._limit if self._limit is not None else None
+        df = df.iloc[start:end]
+        if self._columns and not self._metrics:
+            df = df[[_resolve(df, c) for c, _ in self._columns]]
+            df.columns = [alias or _bare(c) for c, alias in self._columns]
+        return df.reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+    def fetch(self) -> pd.DataFrame:
+        """Ejecuta la consulta con el DatabaseManager asociado"""
+        if self.manager is None:
+            raise RuntimeError("La consulta no tiene un DatabaseManager asociado")
+        return self.manager.fetch(self)
+
+    def count(self) -> int:
+        """Cuenta en el servidor las filas que cumplen los filtros de la consulta"""
+        if self.manager is None:
+            raise RuntimeError("La consulta no tiene un DatabaseManager asociado")
+        return self.manager.count(self)
@@ -0,0 +1,272 @@
+from logger import setup_logging
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from datetime import datetime, timezone
+from sqlalchemy import text
+from dateutil.relativedelta import relativedelta
+import pandas as pd
+import argparse
+
+logger = setup_logging()
+
+SUMMARY_TABLE = "ResumenMensual"
+# Tablas cuyas escrituras cambian el resumen
+SOURCE_TABLES = ("Reportes", "Actividades")
+
+# (id_empleado, id_contrato, mes 'YYYY-MM')
+SummaryKey = Tuple[int, int, str]
+# Valores por consulta al resolver las filas afectadas (SQL Server admite 2100 parámetros)
+KEYS_BATCH_SIZE = 500
+
+
+def _chunks(values: List[Any], size: int = KEYS_BATCH_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def month_key(value: Any) -> str:
+    """Mes 'YYYY-MM' de una fecha (datetime, Timestamp o texto)"""
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+
+def month_bounds(mes: str) -> Tuple[datetime, datetime]:
+    """Rango semiabierto [inicio, fin) del mes 'YYYY-MM'"""
+    inicio = datetime.strptime(mes, "%Y-%m")
+    return inicio, inicio + relativedelta(months=1)
+
+
+class MonthlySummary:
+    """Resumen mensual de avance por empleado y contrato (tabla ``ResumenMensual``).
+
+    Cada fila guarda, para un empleado, un contrato y un mes, el total de
+    actividades del contrato, cuántas tienen al menos un reporte del
+    empleado en el mes y el porcentaje promedio reportado. Las escrituras
+    en Reportes y Actividades hechas con ``DatabaseManager`` recalculan
+    solo las filas afectadas; ``rebuild`` lo regenera por completo.
+    """
+
+    def __init__(self, db_manager) -> None:
+        self.db = db_manager
+
+    @property
+    def enabled(self) -> bool:
+        # El respaldo Excel no tiene la hoja del resumen
+        return not self.db.use_excel and bool(self.db.sql_engine or self.db.sql_lite_pool)
+
+    # ------------------------------------------------------------------
+    # Filas afectadas por una escritura
+    # ------------------------------------------------------------------
+    def _contracts_of(self, actividades: Iterable[Any]) -> Dict[int, int]:
+        """Contrato de cada actividad, con una consulta IN por bloque"""
+        ids = sorted({int(a) for a in actividades if a is not None and pd.notna(a)})
+        contratos = {}
+        for chunk in _chunks(ids):
+            df = self.db.get_data('Actividades', {'id_actividad': chunk},
+                                  columns=['id_actividad', 'id_contrato'])
+            contratos.update({int(row.id_actividad): int(row.id_contrato)
+                              for row in df.itertuples() if pd.notna(row.id_contrato)})
+        return contratos
+
+    def _current_timestamp(self) -> Any:
+        """Hora del servidor: el mismo reloj que el DEFAULT CURRENT_TIMESTAMP de ``fecha``"""
+        try:
+            if self.db.sql_engine:
+                with self.db._sql_connection() as connection:
+                    return connection.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()
+            with self.db._sqlite_connection() as connection:
+                # En SQLite es UTC
+                return connection.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+        except Exception as e:
+            logger.warning(f"No se pudo leer la hora del servidor: {e}")
+            return datetime.now(timezone.utc)
+
+    def keys_for_rows(self, table_name: str, rows: Iterable[Dict[str, Any]]) -> Set[SummaryKey]:
+        """Filas del resumen que cambian al insertar ``rows``"""
+        if not self.enabled or table_name not in SOURCE_TABLES:
+            return set()
+        rows = list(rows)
+        keys = set()
+        try:
+            if table_name == 'Reportes':
+                contratos = self._contracts_of(data.get('id_actividad') for data in rows)
+                # Sin fecha, la fila tomó el DEFAULT del servidor al insertarse
+                ahora = self._current_timestamp() if any(
+                    not data.get('fecha') for data in rows) else None
+                for data in rows:
+                    id_actividad = data.get('id_actividad')
+                    id_contrato = contratos.get(int(id_actividad)) if id_actividad is not None else None
+                    if id_contrato is not None and data.get('id_empleado') is not None:
+                        keys.add((int(data['id_empleado']), id_contrato,
+                                  month_key(data.get('fecha') or ahora)))
+            else:
+                keys |= self._keys_of_contracts(
+                    [data['id_contrato'] for data in rows if data.get('id_contrato') is not None])
+        except Exception as e:
+            logger.error(f"Error calculando las filas afectadas de {SUMMARY_TABLE}: {e}")
+        return keys
+
+    def keys_for_conditions(self, table_name: str, conditions: Iterable[Dict[str, Any]]) -> Set[SummaryKey]:
+        """Filas del resumen asociadas a las filas que cumplen ``conditions`` (una consulta por bloque)"""
+        if not self.enabled or table_name not in SOURCE_TABLES:
+            return set()
+        keys = set()
+        try:
+            for chunk in _chunks(list(conditions)):
+                if table_name == 'Reportes':
+                    query = self.db.query('Reportes', 'r') \
+                        .select('r.id_empleado', 'a.id_contrato', 'r.fecha') \
+                        .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a') \
+                        .filter_any([{f"r.{column}": value for column, value in condition.items()}
+                                     for condition in chunk])
+                    df = self.db.fetch(query)
+                    keys |= {(int(row.id_empleado), int(row.id_contrato), month_key(row.fecha))
+                             for row in df.itertuples() if pd.notna(row.fecha)}
+                else:
+                    df = self.db.fetch(
+                        self.db.query('Actividades').select('id_contrato').filter_any(chunk))
+                    keys |= self._keys_of_contracts(
+                        df['id_contrato'].dropna().tolist() if not df.empty else [])
+        except Exception as e:
+            logger.error(f"Error calculando las filas afectadas de {SUMMARY_TABLE}: {e}")
+        return keys
+
+    def _keys_of_contracts(self, contratos: List[Any]) -> Set[SummaryKey]:
+        """Filas del resumen existentes para los contratos dados"""
+        keys = set()
+        for chunk in _chunks(sorted({int(c) for c in contratos})):
+            df = self.db.get_data(SUMMARY_TABLE, {'id_contrato': chunk},
+                                  columns=['id_empleado', 'id_contrato', 'mes'])
+            keys |= {(int(row.id_empleado), int(row.id_contrato), str(row.mes))
+                     for row in df.itertuples()}
+        return keys
+
+    # ------------------------------------------------------------------
+    # Recalculo
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _summarize(reportes: pd.DataFrame) -> pd.DataFrame:
+        """Agrupa los reportes (con su contrato) por empleado, contrato y mes"""
+        reportes = reportes.assign(mes=pd.to_datetime(
+            reportes['fecha'], format="mixed").dt.strftime("%Y-%m"))
+        return reportes.dropna(subset=['mes']) \
+            .groupby(['id_empleado', 'id_contrato', 'mes']) \
+            .agg(actividades_reportadas=('id_actividad', 'nunique'),
+                 porcentaje_promedio=('porcentaje', 'mean')) \
+            .reset_index()
+
+    def _totals(self, contratos: List[int] = None) -> Dict[int, int]:
+        """Actividades por contrato (de todos si no se indican) con una consulta agrupada"""
+        totales = self.db.aggregate('Actividades', ['id_contrato'], {'total': ('count', '*')},
+                                    filters={'id_contrato': contratos} if contratos else None)
+        return {int(c): int(t) for c, t in zip(totales['id_contrato'], totales['total'])
+                if pd.notna(c)}
+
+    def _compute(self, keys: List[SummaryKey]) -> List[Dict[str, Any]]:
+        """Calcula las filas del resumen de ``keys`` con una consulta agrupada de totales
+        y una lectura de los reportes del rango de meses afectado"""
+        contratos = sorted({key[1] for key in keys})
+        empleados = sorted({key[0] for key in keys})
+        meses = sorted({key[2] for key in keys})
+        inicio, fin = month_bounds(meses[0])[0], month_bounds(meses[-1])[1]
+        totales = self._totals(contratos)
+        reportes = self.db.fetch(
+            self.db.query('Reportes', 'r')
+            .select('r.id_empleado', 'a.id_contrato', 'r.id_actividad', 'r.porcentaje', 'r.fecha')
+            .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a')
+            .where_in('a.id_contrato', contratos)
+            .where_in('r.id_empleado', empleados)
+            .date_range('r.fecha', inicio, fin))
+        resumen = {}
+        if not reportes.empty:
+            resumen = {(int(row.id_empleado), int(row.id_contrato), row.mes): row
+                       for row in self._summarize(reportes).itertuples(index=False)}
+        ahora = datetime.now()
+        rows = []
+        for key in keys:
+            row = resumen.get(key)
+            promedio = row.porcentaje_promedio if row is not None else None
+            rows.append({
+                'id_empleado': key[0],
+                'id_contrato': key[1],
+                'mes': key[2],
+                'actividades_total': totales.get(key[1], 0),
+                'actividades_reportadas': int(row.actividades_reportadas) if row is not None else 0,
+                'porcentaje_promedio': float(promedio) if pd.notna(promedio) else None,
+                'actualizado_en': ahora,
+            })
+        return rows
+
+    def refresh(self, keys: Iterable[SummaryKey]) -> bool:
+        """Recalcula las filas indicadas; las que quedan sin reportes se eliminan"""
+        keys = sorted(set(keys))
+        if not keys or not self.enabled:
+            return True
+        try:
+            rows = [row for chunk in _chunks(keys) for row in self._compute(chunk)]
+            deletes = [self.db._delete_statement(SUMMARY_TABLE, {
+                'id_empleado': row['id_empleado'], 'id_contrato': row['id_contrato'],
+                'mes': row['mes']}) for row in rows]
+            inserts = [self.db._insert_statement(SUMMARY_TABLE, row)
+                       for row in rows if row['actividades_reportadas'] > 0]
+            results = self.db._execute_batch(SUMMARY_TABLE, deletes + inserts)
+            # Un DELETE sin coincidencias (clave nueva) no es un error
+            return all(results[len(deletes):])
+        except Exception as e:
+            logger.error(f"Error actualizando {SUMMARY_TABLE}: {e}")
+            return False
+        finally:
+            self.db.cache.invalidate(SUMMARY_TABLE)
+
+    def rebuild(self) -> bool:
+        """Regenera el resumen completo a partir de Reportes y Actividades"""
+        if not self.enabled:
+            logger.warning(f"{SUMMARY_TABLE} requiere SQLite o SQL Server")
+            return False
+        try:
+            reportes = self.db.fetch(
+                self.db.query('Reportes', 'r')
+                .select('r.id_empleado', 'a.id_contrato', 'r.id_actividad', 'r.porcentaje', 'r.fecha')
+                .join('Actividades', ('r.id_actividad', 'a.id_actividad'), alias='a'))
+            statements = [("DELETE FROM " + SUMMARY_TABLE, {})]
+            if not reportes.empty:
+                totales = self._totals()
+                resumen = self._summarize(reportes)
+                ahora = datetime.now()
+                for row in resumen.itertuples(index=False):
+                    statements.append(self.db._insert_statement(SUMMARY_TABLE, {
+                        'id_empleado': int(row.id_empleado),
+                        'id_contrato': int(row.id_contrato),
+                        'mes': row.mes,
+                        'actividades_total': int(totales.get(row.id_contrato, 0)),
+                        'actividades_reportadas': int(row.actividades_reportadas),
+                        'porcentaje_promedio': float(row.porcentaje_promedio)
+                        if pd.notna(row.porcentaje_promedio) else None,
+                        'actualizado_en': ahora,
+                    }))
+            results = self.db._execute_batch(SUMMARY_TABLE, statements)
+            logger.info(
+                f"{SUMMARY_TABLE} regenerado: {len(statements) - 1} filas")
+            return all(results[1:])
+        except Exception as e:
+            logger.error(f"Error regenerando {SUMMARY_TABLE}: {e}")
+            return False
+        finally:
+            self.db.cache.invalidate(SUMMARY_TABLE)
+
+
+if __name__ == "__main__":
+    # Mantenimiento: python rollup.py --rebuild --sqlite db_gpc.db
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description=f"Mantenimiento de {SUMMARY_TABLE}")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Regenera el resumen desde cero")
+    parser.add_argument("--sqlite", default="db_gpc.db",
+                        help="Ruta de la base de datos SQLite")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect_to_sql_lite(args.sqlite):
+        raise SystemExit(1)
+    if args.rebuild:
+        raise SystemExit(0 if db_manager.summary.rebuild() else 1)
+    parser.print_help()
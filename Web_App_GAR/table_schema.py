@@ -0,0 +1,143 @@
+from typing import Any, Callable, Dict, List, Sequence
+import pandas as pd
+
+# Importar pyarrow de forma opcional (lectura columnar)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Tipos de pandas por nombre de columna; los nombres se repiten con el
+# mismo significado en todas las tablas (ver schema.sql y Base_SQLite.py)
+INT_COLUMNS = {
+    "id_empleado", "id_contrato", "id_actividad", "id_reporte", "id_notificacion",
+    "Nro", "porcentaje", "calidad", "actividades_total", "actividades_reportadas",
+}
+BOOL_COLUMNS = {"activo", "leido", "estado"}
+DATETIME_COLUMNS = {"fecha", "fecha_envio", "fecha_inicio", "fecha_fin", "actualizado_en"}
+CATEGORY_COLUMNS = {
+    "rol": pd.CategoricalDtype(["administrador", "empleado"]),
+}
+
+FETCH_SIZE = 5000
+
+
+def _to_bool(value: Any) -> Any:
+    # NaN (celda vacía de Excel), NaT y NA son nulos; bool(nan) sería True
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "sí", "si")
+    return bool(value)
+
+
+def to_array(name: str, values: Sequence[Any]) -> pd.Series:
+    """Convierte los valores de una columna al tipo definido para su nombre"""
+    if name in INT_COLUMNS:
+        numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+        try:
+            return pd.Series(numbers, name=name).astype("Int64")
+        except TypeError:
+            # Valores con decimales: se conservan como flotantes
+            return pd.Series(numbers, name=name)
+    if name in BOOL_COLUMNS:
+        return pd.Series([_to_bool(v) for v in values], name=name, dtype="boolean")
+    if name in DATETIME_COLUMNS:
+        return pd.Series(pd.to_datetime(pd.Series(values, dtype=object),
+                                         format="mixed", errors="coerce"), name=name)
+    if name in CATEGORY_COLUMNS:
+        return pd.Series(values, name=name, dtype=CATEGORY_COLUMNS[name])
+    return pd.Series(values, name=name)
+
+
+def materialize(columns: List[str], fetchmany: Callable[[int], list],
+                fetch_size: int = FETCH_SIZE) -> pd.DataFrame:
+    """Construye un DataFrame tipado columna por columna leyendo el cursor por bloques.
+
+    Cada bloque de ``fetchmany`` se transpone y se convierte de inmediato a
+    arreglos tipados, de modo que nunca se mantiene la lista completa de
+    tuplas del resultado.
+    """
+    chunks: List[List[pd.Series]] = [[] for _ in columns]
+    while True:
+        rows = fetchmany(fetch_size)
+        if not rows:
+            break
+        for i, values in enumerate(zip(*rows)):
+            chunks[i].append(to_array(columns[i], values))
+    # Se indexa por posición: un SELECT con JOIN puede repetir nombres de columna
+    data = {}
+    for i, (name, parts) in enumerate(zip(columns, chunks)):
+        if not parts:
+            data[i] = to_array(name, [])
+        elif len(parts) == 1:
+            data[i] = parts[0]
+        else:
+            data[i] = pd.concat(parts, ignore_index=True)
+    df = pd.DataFrame(data)
+    df.columns = list(columns)
+    return df
+
+
+def iter_frames(columns: List[str], fetchmany: Callable[[int], list],
+                chunk_size: int = FETCH_SIZE):
+    """Genera un DataFrame tipado por cada bloque de ``chunk_size`` filas del cursor"""
+    while True:
+        rows = fetchmany(chunk_size)
+        if not rows:
+            break
+        pending = [rows]
+        yield materialize(columns, lambda _: pending.pop() if pending else [])
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica los tipos definidos a un DataFrame ya construido (Excel)"""
+    for i, name in enumerate(df.columns):
+        if name in INT_COLUMNS or name in BOOL_COLUMNS or \
+                name in DATETIME_COLUMNS or name in CATEGORY_COLUMNS:
+            df.isetitem(i, to_array(name, df.iloc[:, i].tolist()).set_axis(df.index))
+    return df
+
+
+def _arrow_datetime(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Convierte fechas guardadas como texto (SQLite) a timestamp de Arrow"""
+    if pa.types.is_timestamp(column.type):
+        return column
+    if pa.types.is_date(column.type):
+        return column.cast(pa.timestamp("us"))
+    text = column.cast(pa.string())
+    parsed = pc.coalesce(
+        pc.strptime(text, format="%Y-%m-%d %H:%M:%S", unit="us", error_is_null=True),
+        pc.strptime(text, format="%Y-%m-%d", unit="us", error_is_null=True))
+    if parsed.null_count > text.null_count:
+        # Formatos que Arrow no reconoce (fracciones de segundo, etc.)
+        return pa.chunked_array([pa.array(to_array("fecha", text.to_pylist()), type=pa.timestamp("us"))])
+    return parsed
+
+
+def cast_arrow(table: "pa.Table") -> "pa.Table":
+    """Aplica a una tabla Arrow los mismos tipos que ``to_array`` sin pasar por Python"""
+    for i, name in enumerate(table.column_names):
+        column = table.column(i)
+        try:
+            if name in INT_COLUMNS and pa.types.is_integer(column.type):
+                column = column.cast(pa.int64())
+            elif name in BOOL_COLUMNS and not pa.types.is_boolean(column.type):
+                column = column.cast(pa.bool_())
+            elif name in DATETIME_COLUMNS:
+                column = _arrow_datetime(column)
+            elif name in CATEGORY_COLUMNS and pa.types.is_string(column.type):
+                column = column.dictionary_encode()
+            else:
+                continue
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        table = table.set_column(i, table.field(i).with_type(column.type), column)
+    return table
+
+
+def arrow_to_pandas(table: "pa.Table") -> pd.DataFrame:
+    """Convierte una tabla Arrow a pandas con dtypes respaldados por Arrow (sin copiar)"""
+    return cast_arrow(table).to_pandas(types_mapper=pd.ArrowDtype)
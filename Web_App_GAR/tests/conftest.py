@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+# Los módulos de la aplicación se importan por nombre desde Web_App_GAR
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GAR_LOG_LEVEL", "WARNING")
+
+from benchmarks.generator import COLUMNS, SQLITE_SCHEMA  # noqa: E402
+from database import DatabaseManager  # noqa: E402
+from table_schema import apply_schema  # noqa: E402
+
+# Datos mínimos con los casos que cubren las pruebas: empleado inactivo,
+# contrato sin actividades, reportes en dos meses y textos con comodines de LIKE
+DATA = {
+    "Empleados": [
+        (1, "Administrador", "admin@example.com", "administrador", 1),
+        (2, "Ana Gómez", "ana@example.com", "empleado", 1),
+        (3, "Luis Pérez", "luis@example.com", "empleado", 0),
+    ],
+    "Contratos": [
+        (1, "Contrato 100% soporte", "2025-01-01", "2025-12-31", 2),
+        (2, "Contrato_auditoría", "2025-01-01", "2025-12-31", 3),
+        (3, "Contrato sin actividades", "2025-01-01", "2025-12-31", 2),
+    ],
+    "Actividades": [
+        (1, 1, "Informe mensual", 1, 50),
+        (2, 2, "Matriz de riesgos", 1, 50),
+        (3, 1, "Acta de comité", 2, 100),
+    ],
+    "Notificaciones": [
+        (1, 2, "Reporte pendiente", "2025-06-01 08:00:00", 0),
+        (2, 3, "Bienvenido", "2025-05-01 08:00:00", 1),
+    ],
+    "Reportes": [
+        (1, 2, 1, "2025-06-05 10:00:00", "Revisión del informe", "", 40, "informe.pdf", 0),
+        (2, 2, 2, "2025-06-20 09:30:00", "Matriz al 100%", None, 100, "matriz.xlsx", 1),
+        (3, 3, 3, "2025-05-02 08:00:00", "Acta_firmada", "", 100, "acta.pdf", 1),
+    ],
+}
+
+
+def create_database(path: str) -> str:
+    """Crea una base SQLite con el esquema de db_gpc.db y ``DATA``"""
+    with closing(sqlite3.connect(path)) as connection:
+        connection.executescript(SQLITE_SCHEMA)
+        for table_name, rows in DATA.items():
+            columns = COLUMNS[table_name]
+            connection.executemany(
+                f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})", rows)
+        connection.commit()
+    return path
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return create_database(str(tmp_path / "gar.db"))
+
+
+@pytest.fixture
+def frames():
+    """Tablas de ``DATA`` como DataFrames tipados, igual que las hojas del respaldo Excel"""
+    return {table_name: apply_schema(pd.DataFrame(rows, columns=COLUMNS[table_name]))
+            for table_name, rows in DATA.items()}
+
+
+@pytest.fixture
+def db(sqlite_path):
+    """DatabaseManager nuevo conectado a una copia de prueba (la clase es un singleton)"""
+    DatabaseManager._instance = None
+    manager = DatabaseManager()
+    assert manager.connect_to_sql_lite(sqlite_path)
+    yield manager
+    manager.close_connection()
+    manager.executor.shutdown(wait=True)
+    DatabaseManager._instance = None
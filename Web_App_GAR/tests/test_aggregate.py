@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+METRICS = {
+    "reportes": ("count", "*"),
+    "completos": ("count", "*", {"porcentaje": 100}),
+    "promedio": ("avg", "porcentaje"),
+    "actividades": ("count_distinct", "id_actividad"),
+    "ultimo": ("max", "fecha"),
+}
+
+
+def by_employee(df: pd.DataFrame, column: str) -> list:
+    return [float(value) for value in df.sort_values("id_empleado")[column]]
+
+
+def test_grouped_metrics_match_pandas(db):
+    df = db.aggregate("Reportes", group_by=["id_empleado"], metrics=METRICS)
+    rows = df.set_index("id_empleado")
+    assert rows.loc[2, "reportes"] == 2 and rows.loc[2, "completos"] == 1
+    assert rows.loc[2, "promedio"] == 70 and rows.loc[2, "actividades"] == 2
+    assert str(rows.loc[3, "ultimo"]).startswith("2025-05-02")
+
+
+def test_without_group_by_returns_one_row(db):
+    df = db.aggregate("Empleados", metrics={
+        "total": ("count", "*"), "activos": ("count", "*", {"activo": True})},
+        filters={"rol": "empleado"})
+    assert df.iloc[0].tolist() == [2, 1]
+
+
+def test_default_metric_is_the_row_count(db):
+    assert db.aggregate("Contratos")["total"].tolist() == [3]
+
+
+def test_excel_backend_gives_the_same_result(db, tmp_path):
+    expected = db.aggregate("Reportes", group_by=["id_empleado"], metrics=METRICS)
+    workbook = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        db.get_data("Reportes").to_excel(writer, sheet_name="Reportes", index=False)
+    assert db.connect_to_excel(workbook)
+    actual = db.aggregate("Reportes", group_by=["id_empleado"], metrics=METRICS)
+    for column in ("reportes", "completos", "promedio", "actividades"):
+        assert by_employee(actual, column) == by_employee(expected, column)
+
+
+@pytest.mark.parametrize("metrics", [
+    {"total": ("median", "porcentaje")},
+    {"total": ("sum", "columna inválida")},
+])
+def test_invalid_metrics_return_an_empty_frame(db, metrics):
+    assert db.aggregate("Reportes", metrics=metrics).empty
@@ -0,0 +1,53 @@
+import pytest
+
+import database
+
+pytestmark = pytest.mark.skipif(not database.ADBC_SQLITE_AVAILABLE,
+                                reason="adbc-driver-sqlite no está instalado")
+
+
+@pytest.fixture
+def arrow_db(db):
+    assert db.enable_arrow_fetch()
+    return db
+
+
+def test_arrow_results_match_the_row_path(db):
+    query = db.query("Reportes").where("id_empleado", "=", 2).order_by("id_reporte")
+    rows = db.fetch(query)
+    assert db.enable_arrow_fetch()
+    columnar = db.fetch(query)
+    assert columnar["id_reporte"].tolist() == rows["id_reporte"].tolist()
+    assert columnar["fecha"].tolist() == rows["fecha"].tolist()
+    assert columnar["acciones_realizadas"].tolist() == rows["acciones_realizadas"].tolist()
+
+
+def test_arrow_connections_are_pooled_and_see_new_writes(arrow_db):
+    pool = arrow_db.sql_lite_pool
+    with pool.arrow_connection() as first:
+        pass
+    assert len(arrow_db.get_data("Empleados")) == 3
+    assert arrow_db.insert_data("Empleados", {"nombre": "Nuevo", "correo": "nuevo@example.com",
+                                              "rol": "empleado", "activo": 1})
+    assert len(arrow_db.get_data("Empleados")) == 4
+    with pool.arrow_connection() as again:
+        assert again is first
+
+
+def test_like_parameters_are_bound(arrow_db):
+    df = arrow_db.fetch(arrow_db.query("Contratos").search(["nombre_contrato"], "100%"))
+    assert df["id_contrato"].tolist() == [1]
+
+
+def test_draining_closes_idle_arrow_connections(arrow_db):
+    pool = arrow_db.sql_lite_pool
+    with pool.arrow_connection():
+        pass
+    assert pool._arrow_idle.qsize() == 1
+    pool.drain()
+    assert pool._arrow_idle.qsize() == 0
+
+
+def test_failed_arrow_read_falls_back_to_rows(arrow_db, monkeypatch):
+    monkeypatch.setattr(arrow_db, "fetch_arrow", lambda query: None)
+    assert len(arrow_db.get_data("Contratos")) == 3
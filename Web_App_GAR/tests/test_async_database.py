@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import async_database
+from async_database import AsyncDatabaseManager
+
+pytestmark = pytest.mark.skipif(
+    not (async_database.ASYNC_SQLALCHEMY_AVAILABLE and async_database.AIOSQLITE_AVAILABLE),
+    reason="sqlalchemy[asyncio] o aiosqlite no están instalados")
+
+
+def run(sqlite_path, work):
+    """Conecta un gestor asíncrono, ejecuta ``work(manager)`` y cierra el motor"""
+    async def main():
+        manager = AsyncDatabaseManager(max_concurrency=2)
+        assert await manager.connect_to_sql_lite(sqlite_path)
+        try:
+            return await work(manager)
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+def test_reads_match_the_sync_manager(sqlite_path, db):
+    async def work(manager):
+        return await manager.get_many({
+            "reportes": {"table_name": "Reportes", "filters": {"id_empleado": 2},
+                         "order_by": "id_reporte"},
+            "contratos": manager.query("Contratos").search(["nombre_contrato"], "100%"),
+            "total": manager.query("Empleados").where("activo", "=", 1),
+        }), await manager.count("Reportes", {"porcentaje": 100})
+
+    results, completos = run(sqlite_path, work)
+    expected = db.get_data("Reportes", filters={"id_empleado": 2}, order_by="id_reporte")
+    assert results["reportes"]["id_reporte"].tolist() == expected["id_reporte"].tolist()
+    assert str(results["reportes"]["id_reporte"].dtype) == "Int64"
+    assert results["contratos"]["id_contrato"].tolist() == [1]
+    assert len(results["total"]) == 2
+    assert completos == 2
+
+
+def test_batch_reports_rows_without_matches(sqlite_path):
+    async def work(manager):
+        updated = await manager.update_many("Empleados", [
+            ({"activo": 0}, {"id_empleado": 1}),
+            ({"activo": 0}, {"id_empleado": 99}),
+        ])
+        inserted = await manager.insert_many("Notificaciones", [
+            {"id_empleado": 2, "mensaje": "Uno"},
+            {"id_empleado": 2, "mensaje": "Dos"},
+        ])
+        return updated, inserted, await manager.count("Notificaciones")
+
+    assert run(sqlite_path, work) == ([True, False], [True, True], 4)
+
+
+def test_failed_insert_is_isolated_in_the_batch(sqlite_path):
+    async def work(manager):
+        results = await manager.insert_many("Empleados", [
+            {"nombre": "Nueva", "correo": "nueva@example.com", "rol": "empleado", "activo": 1},
+            # El correo es UNIQUE: solo esta fila debe fallar
+            {"nombre": "Repetida", "correo": "ana@example.com", "rol": "empleado", "activo": 1},
+        ])
+        return results, await manager.count("Empleados")
+
+    assert run(sqlite_path, work) == ([True, False], 4)
+
+
+def test_single_writes(sqlite_path):
+    async def work(manager):
+        return [
+            await manager.insert_data("Notificaciones", {"id_empleado": 3, "mensaje": "Hola"}),
+            await manager.update_data("Notificaciones", {"leido": 1}, {"mensaje": "Hola"}),
+            await manager.delete_data("Notificaciones", {"mensaje": "Hola"}),
+            await manager.insert_data("Tabla inválida", {"id": 1}),
+        ]
+
+    assert run(sqlite_path, work) == [True, True, True, False]
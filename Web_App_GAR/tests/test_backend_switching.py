@@ -0,0 +1,149 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from benchmarks.run import copy_sqlite
+from connection import CircuitBreaker, load_backend_settings
+from database import DatabaseManager
+
+
+@pytest.fixture
+def settings(sqlite_path, tmp_path, monkeypatch):
+    monkeypatch.setenv("GAR_DB_BACKENDS", "sqlite,excel")
+    monkeypatch.setenv("GAR_DB_SQLITE_PATH", sqlite_path)
+    monkeypatch.setenv("GAR_DB_EXCEL_PATH", str(tmp_path / "gar.xlsx"))
+    monkeypatch.setenv("GAR_DB_COOLDOWN", "60")
+    return load_backend_settings()
+
+
+@pytest.fixture
+def manager():
+    DatabaseManager._instance = None
+    manager = DatabaseManager()
+    yield manager
+    manager.close_connection()
+    manager.executor.shutdown(wait=True)
+    DatabaseManager._instance = None
+
+
+def test_settings_come_from_the_environment(settings, sqlite_path):
+    assert settings["backends"] == ["sqlite", "excel"]
+    assert settings["sqlite_path"] == sqlite_path
+    assert settings["cooldown"] == 60
+    # La lectura Arrow queda desactivada salvo que se pida
+    assert settings["arrow_fetch"] is False
+
+
+@pytest.mark.parametrize("value, expected", [("1", True), ("true", True), ("0", False), ("no", False)])
+def test_arrow_fetch_is_opt_in(monkeypatch, value, expected):
+    monkeypatch.setenv("GAR_DB_ARROW_FETCH", value)
+    assert load_backend_settings()["arrow_fetch"] is expected
+
+
+def test_breaker_opens_after_the_threshold_and_reopens_after_cooldown(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("connection.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(cooldown=30, failure_threshold=2)
+    breaker.record_failure("sqlserver")
+    assert breaker.allow("sqlserver")
+    breaker.record_failure("sqlserver")
+    assert not breaker.allow("sqlserver")
+    now[0] += 10
+    assert breaker.remaining("sqlserver") == 20
+    now[0] += 20
+    assert breaker.allow("sqlserver")
+    breaker.record_success("sqlserver")
+    assert breaker.state() == {}
+
+
+def test_connect_falls_back_and_skips_open_circuits(manager, settings, monkeypatch):
+    monkeypatch.setitem(settings, "sqlite_path", "no_existe.db")
+    assert manager.connect(settings) == "excel"
+    assert not manager.breaker.allow("sqlite")
+
+    attempts = []
+    monkeypatch.setattr(manager, "connect_to_sql_lite", lambda *args: attempts.append(args))
+    assert manager.connect(settings) == "excel"
+    assert attempts == []
+
+
+def test_primary_backend_is_recovered(manager, settings):
+    manager.breaker.record_failure("sqlite")
+    assert manager.connect(settings) == "excel"
+    assert not manager.try_primary_backend()
+    manager.breaker.record_success("sqlite")
+    assert manager.try_primary_backend()
+    assert manager.backend == "sqlite"
+    assert not manager.get_data("Empleados").empty
+
+
+def test_switching_files_under_load_drains_the_old_pool(manager, sqlite_path, tmp_path):
+    other = str(tmp_path / "otra.db")
+    copy_sqlite(sqlite_path, other)
+    assert manager.connect_to_sql_lite(sqlite_path)
+    first_pool = manager.sql_lite_pool
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                with manager._sqlite_connection() as connection:
+                    connection.execute("SELECT COUNT(*) FROM Empleados").fetchone()
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for i in range(20):
+            assert manager.connect_to_sql_lite(other if i % 2 == 0 else sqlite_path)
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert errors == []
+    assert manager.path == sqlite_path
+    assert first_pool.contention()["conexiones"] == 0
+
+
+def test_switching_backends_drops_cached_results(db, tmp_path):
+    workbook = str(tmp_path / "gar.xlsx")
+    assert db.get_data("Empleados")["id_empleado"].tolist() == [1, 2, 3]
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        pd.DataFrame({"id_empleado": [9], "nombre": ["Solo en Excel"]}) \
+            .to_excel(writer, sheet_name="Empleados", index=False)
+    assert db.connect_to_excel(workbook)
+    assert db.get_data("Empleados")["id_empleado"].tolist() == [9]
+    assert db.connect_to_sql_lite(db.sql_lite_pool.db_path)
+    assert db.get_data("Empleados")["id_empleado"].tolist() == [1, 2, 3]
+
+
+def test_load_in_flight_during_a_switch_is_not_cached(db, tmp_path, monkeypatch):
+    workbook = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        pd.DataFrame({"id_empleado": [9], "nombre": ["Solo en Excel"]}) \
+            .to_excel(writer, sheet_name="Empleados", index=False)
+    started, switched = threading.Event(), threading.Event()
+    load_data = db._load_data
+
+    def slow_load(query):
+        # Lee del SQLite y espera a que el hilo principal cambie a Excel
+        df = load_data(query)
+        started.set()
+        switched.wait(5)
+        return df
+
+    monkeypatch.setattr(db, "_load_data", slow_load)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(db.get_data("Empleados")))
+    reader.start()
+    assert started.wait(5)
+    monkeypatch.setattr(db, "_load_data", load_data)
+    assert db.connect_to_excel(workbook)
+    switched.set()
+    reader.join()
+    assert results[0]["id_empleado"].tolist() == [1, 2, 3]
+    assert db.get_data("Empleados")["id_empleado"].tolist() == [9]
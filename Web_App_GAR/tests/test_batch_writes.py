@@ -0,0 +1,77 @@
+import sqlite3
+from contextlib import closing
+
+from database import DatabaseManager
+
+
+def count(path: str, sql: str, params=()) -> int:
+    with closing(sqlite3.connect(path)) as connection:
+        return connection.execute(sql, params).fetchone()[0]
+
+
+def notificacion(mensaje: str, id_empleado: int = 2) -> dict:
+    return {"id_empleado": id_empleado, "mensaje": mensaje, "leido": False}
+
+
+def test_group_statements_keeps_consecutive_runs_in_order():
+    statements = [("A", 1), ("A", 2), ("B", 3), ("A", 4)]
+    assert DatabaseManager._group_statements(statements) == [
+        ("A", [0, 1]), ("B", [2]), ("A", [3])]
+
+
+def test_insert_many_commits_every_row(db, sqlite_path):
+    results = db.insert_many("Notificaciones", [notificacion(f"lote {i}") for i in range(50)])
+    assert results == [True] * 50
+    assert count(sqlite_path, "SELECT COUNT(*) FROM Notificaciones WHERE mensaje LIKE 'lote %'") == 50
+
+
+def test_failed_row_is_isolated_by_savepoint(db, sqlite_path):
+    rows = [
+        {"id_empleado": 2, "id_actividad": 1, "acciones_realizadas": "a", "entregable": "a.pdf"},
+        # entregable es NOT NULL: solo esta fila debe fallar
+        {"id_empleado": 2, "id_actividad": 1, "acciones_realizadas": "b", "entregable": None},
+        {"id_empleado": 2, "id_actividad": 1, "acciones_realizadas": "c", "entregable": "c.pdf"},
+    ]
+    assert db.insert_many("Reportes", rows) == [True, False, True]
+    assert count(sqlite_path, "SELECT COUNT(*) FROM Reportes WHERE acciones_realizadas IN ('a', 'b', 'c')") == 2
+
+
+def test_update_many_reports_rows_without_match(db, sqlite_path):
+    results = db.update_many("Notificaciones", [
+        ({"leido": True}, {"id_notificacion": 1}),
+        ({"leido": True}, {"id_notificacion": 999}),
+    ])
+    assert results == [True, False]
+    assert count(sqlite_path, "SELECT leido FROM Notificaciones WHERE id_notificacion = 1") == 1
+
+
+def test_delete_many_reports_rows_without_match(db, sqlite_path):
+    assert db.delete_many("Notificaciones", [
+        {"id_notificacion": 999}, {"id_notificacion": 2}]) == [False, True]
+    assert count(sqlite_path, "SELECT COUNT(*) FROM Notificaciones") == 1
+
+
+def test_mixed_batch_runs_in_the_given_order(db, sqlite_path):
+    insert = db._insert_statement("Notificaciones", {"id_notificacion": 10, **notificacion("nueva")})
+    update = db._update_statement("Notificaciones", {"mensaje": "editada"}, {"id_notificacion": 10})
+    insert_again = db._insert_statement("Notificaciones", {"id_notificacion": 11, **notificacion("otra")})
+    # Agrupar los dos INSERT antes del UPDATE cambiaría el resultado
+    assert db._execute_batch("Notificaciones", [insert, update, insert_again]) == [True, True, True]
+    with closing(sqlite3.connect(sqlite_path)) as connection:
+        assert connection.execute(
+            "SELECT mensaje FROM Notificaciones WHERE id_notificacion = 10").fetchone()[0] == "editada"
+
+
+def test_batch_without_connection_fails_every_row(db):
+    pool, db.sql_lite_pool = db.sql_lite_pool, None
+    try:
+        assert db._execute_batch("Notificaciones", [
+            db._delete_statement("Notificaciones", {"id_notificacion": 1})]) == [False]
+    finally:
+        db.sql_lite_pool = pool
+
+
+def test_batch_invalidates_cached_reads(db):
+    before = len(db.get_data("Notificaciones"))
+    db.insert_many("Notificaciones", [notificacion("caché")])
+    assert len(db.get_data("Notificaciones")) == before + 1
@@ -0,0 +1,55 @@
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from benchmarks.generator import COLUMNS, DatasetGenerator, write_excel, write_sqlite
+from benchmarks.run import copy_sqlite
+
+
+def counts(path: str) -> dict:
+    with closing(sqlite3.connect(path)) as connection:
+        return {table_name: connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+                for table_name in COLUMNS}
+
+
+def test_same_seed_same_rows():
+    first, second = DatasetGenerator(500, seed=7), DatasetGenerator(500, seed=7)
+    for table_name in COLUMNS:
+        assert list(first.rows(table_name)) == list(second.rows(table_name))
+    assert list(DatasetGenerator(500, seed=8).rows("Reportes")) != list(first.rows("Reportes"))
+
+
+def test_reports_reference_their_contract_employee(tmp_path):
+    path = str(tmp_path / "bench.db")
+    generator = DatasetGenerator(2000)
+    write_sqlite(generator, path)
+    assert counts(path) == generator.sizes
+    with closing(sqlite3.connect(path)) as connection:
+        orphans = connection.execute(
+            "SELECT COUNT(*) FROM Reportes r JOIN Actividades a ON a.id_actividad = r.id_actividad "
+            "JOIN Contratos c ON c.id_contrato = a.id_contrato "
+            "WHERE c.id_empleado != r.id_empleado").fetchone()[0]
+    assert orphans == 0
+
+
+def test_excel_matches_sqlite(tmp_path):
+    generator = DatasetGenerator(200)
+    workbook = str(tmp_path / "bench.xlsx")
+    write_excel(generator, workbook)
+    sheets = pd.read_excel(workbook, sheet_name=None)
+    assert {name: len(df) for name, df in sheets.items()} == generator.sizes
+    assert list(sheets["Reportes"].columns) == COLUMNS["Reportes"]
+
+
+def test_copy_discards_stale_wal_files(tmp_path, sqlite_path):
+    target = str(tmp_path / "copia.db")
+    copy_sqlite(sqlite_path, target)
+    with closing(sqlite3.connect(target)) as connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA wal_autocheckpoint=0")
+        connection.execute("DELETE FROM Reportes")
+        connection.commit()
+        # Copia nueva mientras el WAL de la anterior sigue en disco
+        copy_sqlite(sqlite_path, target)
+    assert counts(target)["Reportes"] == 3
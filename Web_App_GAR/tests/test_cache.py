@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from cache import TableCache
+
+
+def test_concurrent_misses_load_once():
+    cache = TableCache()
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "valor"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.get_or_load("Reportes", "clave", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ["valor"] * 8
+
+
+def test_waiters_receive_the_loader_error():
+    cache = TableCache()
+    gate = threading.Event()
+
+    def loader():
+        gate.wait()
+        raise RuntimeError("falló")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load("Reportes", "clave", loader)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert errors == ["falló"] * 4
+    # El error no queda en caché
+    assert cache.get_or_load("Reportes", "clave", lambda: "ok") == "ok"
+
+
+def test_invalidate_only_drops_entries_of_that_table():
+    cache = TableCache()
+    cache.get_or_load("Reportes", "r", lambda: "reportes")
+    cache.get_or_load(("Reportes", "Actividades"), "join", lambda: "join")
+    cache.get_or_load("Empleados", "e", lambda: "empleados")
+    cache.invalidate("Reportes")
+    assert cache.get_or_load("Reportes", "r", lambda: "nuevo") == "nuevo"
+    assert cache.get_or_load(("Reportes", "Actividades"), "join", lambda: "join nuevo") == "join nuevo"
+    assert cache.get_or_load("Empleados", "e", lambda: "no se llama") == "empleados"
+
+
+def test_result_loaded_during_invalidation_is_not_stored():
+    cache = TableCache()
+
+    def loader():
+        cache.invalidate("Reportes")
+        return "viejo"
+
+    assert cache.get_or_load("Reportes", "clave", loader) == "viejo"
+    assert cache.get_or_load("Reportes", "clave", lambda: "nuevo") == "nuevo"
+
+
+def test_result_loaded_during_clear_is_not_stored():
+    cache = TableCache()
+
+    def loader():
+        cache.clear()
+        return "viejo"
+
+    assert cache.get_or_load("Reportes", "clave", loader) == "viejo"
+    assert cache.get_or_load("Reportes", "clave", lambda: "nuevo") == "nuevo"
+
+
+def test_cache_if_skips_failed_results():
+    cache = TableCache()
+    assert cache.get_or_load("Reportes", "clave", lambda: None,
+                             cache_if=lambda result: result is not None) is None
+    assert cache.get_or_load("Reportes", "clave", lambda: "ok",
+                             cache_if=lambda result: result is not None) == "ok"
+
+
+def test_entries_expire_after_ttl():
+    cache = TableCache(ttl=0.05)
+    cache.get_or_load("Reportes", "clave", lambda: 1)
+    time.sleep(0.1)
+    assert cache.get_or_load("Reportes", "clave", lambda: 2) == 2
+
+
+def test_lru_evicts_the_oldest_entry():
+    cache = TableCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.get_or_load("T", key, lambda: key)
+    cache.get_or_load("T", "a", lambda: "no se llama")
+    cache.get_or_load("T", "c", lambda: "c")
+    assert cache.get_or_load("T", "b", lambda: "b nuevo") == "b nuevo"
+
+
+@pytest.mark.parametrize("key", [{"b": [2, 1], "a": {3}}, {"a": {3}, "b": [2, 1]}])
+def test_equivalent_filters_share_a_key(key):
+    cache = TableCache()
+    cache.get_or_load("T", {"a": {3}, "b": [2, 1]}, lambda: "primero")
+    assert cache.get_or_load("T", key, lambda: "segundo") == "primero"
+
+
+class TestFetchCaching:
+    def test_empty_results_are_cached(self, db, monkeypatch):
+        calls = []
+        original = db._load_data
+        monkeypatch.setattr(db, "_load_data", lambda query: calls.append(1) or original(query))
+        for _ in range(3):
+            assert db.get_data("Reportes", {"id_empleado": 999}).empty
+        assert calls == [1]
+
+    def test_errors_are_not_cached(self, db, monkeypatch):
+        results = iter([None, pd.DataFrame({"id_reporte": [1]})])
+        monkeypatch.setattr(db, "_load_data", lambda query: next(results))
+        assert db.get_data("Reportes").empty
+        assert db.get_data("Reportes")["id_reporte"].tolist() == [1]
+
+    def test_writes_invalidate_the_table(self, db):
+        assert len(db.get_data("Notificaciones")) == 2
+        db.insert_data("Notificaciones", {"id_empleado": 2, "mensaje": "nueva", "leido": False})
+        assert len(db.get_data("Notificaciones")) == 3
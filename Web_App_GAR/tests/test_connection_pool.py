@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import SQLiteConnectionPool
+
+
+@pytest.fixture
+def pool(sqlite_path):
+    pool = SQLiteConnectionPool(sqlite_path, max_connections=2, timeout=0.2)
+    yield pool
+    pool.close_all()
+
+
+def test_connections_are_reused(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert pool.contention()["conexiones"] == 1
+
+
+def test_connections_use_wal(pool):
+    with pool.connection() as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute("PRAGMA busy_timeout").fetchone()[0] == pool.busy_timeout_ms
+
+
+def test_nested_blocks_share_the_thread_connection(pool):
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+        assert pool.contention()["prestamos"] == 1
+
+
+def test_exhausted_pool_times_out(pool):
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.connection():
+            held.set()
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+        held.wait()
+        held.clear()
+    try:
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    stats = pool.contention()
+    assert stats["esperas_agotadas"] == 1 and stats["conexiones"] == 2
+
+
+def test_open_transaction_is_discarded_on_checkin(pool):
+    with pool.connection() as connection:
+        connection.execute("INSERT INTO Notificaciones (mensaje) VALUES ('sin commit')")
+        assert connection.in_transaction
+    assert pool.contention()["conexiones"] == 0
+
+
+def test_drain_closes_borrowed_connections_when_returned(pool):
+    with pool.connection():
+        pass
+    with pool.connection() as borrowed:
+        pool.drain()
+        assert pool.contention()["conexiones"] == 1
+        # La consulta en curso termina con la conexión prestada
+        borrowed.execute("SELECT 1")
+    assert pool.contention()["conexiones"] == 0
+
+
+def test_closed_pool_rejects_checkouts(pool):
+    pool.close_all()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.connection():
+            pass
@@ -0,0 +1,31 @@
+import pytest
+
+
+@pytest.mark.parametrize("filters, expected", [
+    (None, 3),
+    ({"id_empleado": 2}, 2),
+    ({"id_empleado": [2, 3], "porcentaje": 100}, 2),
+    ({"comentarios": None}, 1),
+])
+def test_count_matches_get_data(db, filters, expected):
+    assert db.count("Reportes", filters) == expected
+    assert len(db.get_data("Reportes", filters=filters)) == expected
+
+
+def test_count_ignores_pagination(db):
+    query = db.query("Reportes").order_by("id_reporte").limit(1).offset(1)
+    assert query.count() == 3
+    assert len(db.fetch(query)) == 1
+
+
+def test_count_is_cached_until_the_table_changes(db):
+    assert db.count("Empleados") == 3
+    assert db.count("Empleados") == 3
+    assert db.stats.snapshot()["cache"].tolist()[-2:] == ["miss", "hit"]
+    assert db.insert_data("Empleados", {"nombre": "Nuevo", "correo": "nuevo@example.com",
+                                        "rol": "empleado", "activo": 1})
+    assert db.count("Empleados") == 4
+
+
+def test_invalid_table_counts_zero(db):
+    assert db.count("Tabla inexistente") == 0
@@ -0,0 +1,80 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import excel_store
+from excel_store import ExcelColumnarCache
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"id_reporte": [1, 2], "porcentaje": [40, 100]}) \
+            .to_excel(writer, sheet_name="Reportes", index=False)
+        # Números y texto en la misma columna: pyarrow no infiere un tipo único
+        pd.DataFrame({"id_contrato": [1, 2], "codigo": [123, "A-7"]}) \
+            .to_excel(writer, sheet_name="Contratos", index=False)
+    return path
+
+
+@pytest.fixture
+def cache(workbook, tmp_path):
+    return ExcelColumnarCache(workbook, cache_dir=str(tmp_path / "cache"))
+
+
+def sidecars(cache):
+    return sorted(name.split(".")[1] for name in os.listdir(cache.cache_dir))
+
+
+def test_first_read_converts_every_sheet(cache):
+    df = cache.read_sheet("Reportes", ["porcentaje"])
+    assert df["porcentaje"].tolist() == [40, 100]
+    assert sidecars(cache) == ["Contratos", "Reportes"]
+
+
+def test_mixed_type_columns_are_stored_as_text(cache):
+    df = cache.read_sheet("Contratos")
+    assert df["codigo"].tolist() == ["123", "A-7"]
+    assert "Contratos" in sidecars(cache)
+
+
+def test_later_reads_do_not_parse_the_workbook(cache, monkeypatch):
+    cache.read_sheet("Reportes")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("se volvió a leer el libro")
+
+    monkeypatch.setattr(excel_store.pd, "read_excel", fail)
+    assert cache.read_sheet("Contratos")["id_contrato"].tolist() == [1, 2]
+    assert cache.read_sheet("Reportes")["id_reporte"].tolist() == [1, 2]
+
+
+def test_sheet_that_cannot_be_converted_is_read_alone(cache, monkeypatch):
+    original = ExcelColumnarCache._write_sidecar
+    monkeypatch.setattr(ExcelColumnarCache, "_write_sidecar", lambda self, sheet_name, df, key: (
+        False if sheet_name == "Contratos" else original(self, sheet_name, df, key)))
+    assert cache.read_sheet("Contratos")["id_contrato"].tolist() == [1, 2]
+
+    reads = []
+    read_excel = pd.read_excel
+    monkeypatch.setattr(excel_store.pd, "read_excel", lambda path, sheet_name=None, **kwargs: (
+        reads.append(sheet_name) or read_excel(path, sheet_name=sheet_name, **kwargs)))
+    cache.read_sheet("Contratos")
+    cache.read_sheet("Reportes")
+    # Ni la hoja fallida ni las demás reconstruyen la caché del libro completo
+    assert reads == ["Contratos"]
+
+
+def test_modified_workbook_rebuilds_and_removes_stale_sidecars(cache, workbook):
+    cache.read_sheet("Reportes")
+    time.sleep(0.01)
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        pd.DataFrame({"id_reporte": [1, 2, 3], "porcentaje": [40, 100, 10]}) \
+            .to_excel(writer, sheet_name="Reportes", index=False)
+        pd.DataFrame({"id_contrato": [1]}).to_excel(writer, sheet_name="Contratos", index=False)
+    assert cache.read_sheet("Reportes")["id_reporte"].tolist() == [1, 2, 3]
+    # Una sola versión por hoja
+    assert sidecars(cache) == ["Contratos", "Reportes"]
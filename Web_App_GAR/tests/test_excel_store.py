@@ -0,0 +1,123 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from database import DatabaseManager
+from excel_store import ExcelWriteBuffer
+
+
+@pytest.fixture
+def workbook(tmp_path, frames):
+    path = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for sheet_name, df in frames.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return path
+
+
+@pytest.fixture
+def buffer(workbook):
+    # Sin temporizador durante la prueba: el diario solo se aplica con flush()
+    writer = ExcelWriteBuffer(workbook, max_pending=1000, flush_interval=3600)
+    yield writer
+    if writer._timer is not None:
+        writer._timer.cancel()
+
+
+def read(workbook, sheet_name):
+    return lambda columns: pd.read_excel(workbook, sheet_name=sheet_name, usecols=columns)
+
+
+def test_reads_overlay_the_journal_without_rewriting_the_workbook(buffer, workbook):
+    mtime = os.path.getmtime(workbook)
+    assert buffer.insert("Notificaciones", {"id_empleado": 2, "mensaje": "nueva", "leido": False})
+    assert buffer.update("Notificaciones", {"leido": True}, {"id_notificacion": 1})
+    assert buffer.delete("Notificaciones", {"id_notificacion": 2})
+
+    df = buffer.read_sheet("Notificaciones", read(workbook, "Notificaciones"))
+    assert df["id_notificacion"].tolist() == [1, 3]
+    assert df["mensaje"].tolist() == ["Reporte pendiente", "nueva"]
+    assert bool(df.loc[0, "leido"]) is True
+    assert os.path.getmtime(workbook) == mtime
+    assert buffer.has_pending()
+
+
+def test_overlay_respects_requested_columns(buffer, workbook):
+    buffer.insert("Notificaciones", {"id_empleado": 2, "mensaje": "nueva"})
+    df = buffer.read_sheet("Notificaciones", read(workbook, "Notificaciones"), ["mensaje"])
+    assert list(df.columns) == ["mensaje"]
+    assert df["mensaje"].tolist()[-1] == "nueva"
+
+
+def test_other_sheets_are_read_directly(buffer, workbook):
+    buffer.insert("Notificaciones", {"id_empleado": 2, "mensaje": "nueva"})
+    calls = []
+    buffer.read_sheet("Empleados", lambda columns: calls.append(columns) or pd.DataFrame())
+    assert calls == [None]
+
+
+def test_flush_applies_every_operation_in_one_save(buffer, workbook):
+    buffer.insert("Notificaciones", {"id_empleado": 2, "mensaje": "nueva", "leido": False})
+    buffer.update("Notificaciones", {"mensaje": "editada"}, {"id_notificacion": 3})
+    assert buffer.flush()
+    assert not os.path.exists(buffer.journal_path)
+    df = pd.read_excel(workbook, sheet_name="Notificaciones")
+    assert df["mensaje"].tolist() == ["Reporte pendiente", "Bienvenido", "editada"]
+
+
+def test_numeric_conditions_match_across_int_and_float(buffer, workbook):
+    buffer.update("Reportes", {"porcentaje": 75}, {"id_reporte": 1.0})
+    buffer.update("Reportes", {"porcentaje": 80}, {"id_reporte": "2"})
+    df = buffer.read_sheet("Reportes", read(workbook, "Reportes"))
+    assert df["porcentaje"].tolist() == [75, 80, 100]
+
+
+def test_an_entry_that_cannot_be_applied_is_set_aside(buffer, workbook):
+    buffer.update("Reportes", {"porcentaje": 1}, {"columna_inexistente": 1})
+    buffer.insert("Notificaciones", {"id_empleado": 2, "mensaje": "después"})
+    assert buffer.flush()
+    assert not os.path.exists(buffer.journal_path)
+    with open(buffer.rejected_path, encoding="utf-8") as rejected:
+        entries = [json.loads(line) for line in rejected]
+    assert [entry["sheet"] for entry in entries] == ["Reportes"]
+    assert "columna_inexistente" in entries[0]["error"]
+    assert pd.read_excel(workbook, sheet_name="Notificaciones")["mensaje"].tolist()[-1] == "después"
+
+
+def test_pending_journal_is_recovered_on_startup(workbook):
+    with open(f"{workbook}.journal.jsonl", "w", encoding="utf-8") as journal:
+        journal.write(json.dumps({"op": "delete", "sheet": "Empleados",
+                                  "condition": {"id_empleado": 3}}) + "\n")
+    ExcelWriteBuffer(workbook, flush_interval=3600)
+    assert not os.path.exists(f"{workbook}.journal.jsonl")
+    assert pd.read_excel(workbook, sheet_name="Empleados")["id_empleado"].tolist() == [1, 2]
+
+
+class TestDatabaseManagerOverExcel:
+    @pytest.fixture
+    def excel_db(self, workbook):
+        DatabaseManager._instance = None
+        manager = DatabaseManager()
+        manager.connect_to_excel(workbook)
+        yield manager
+        manager.close_connection()
+        if manager.excel_writer is not None and manager.excel_writer._timer is not None:
+            manager.excel_writer._timer.cancel()
+        manager.executor.shutdown(wait=True)
+        DatabaseManager._instance = None
+
+    def test_writes_are_visible_before_the_journal_is_applied(self, excel_db, workbook):
+        mtime = os.path.getmtime(workbook)
+        assert excel_db.insert_data("Notificaciones", {"id_empleado": 2, "mensaje": "nueva", "leido": False})
+        assert excel_db.update_data("Notificaciones", {"leido": True}, {"id_notificacion": 3})
+        df = excel_db.get_data("Notificaciones", {"id_empleado": 2})
+        assert df["mensaje"].tolist() == ["Reporte pendiente", "nueva"]
+        assert excel_db.count("Notificaciones") == 3
+        assert os.path.getmtime(workbook) == mtime
+
+    def test_close_applies_the_journal(self, excel_db, workbook):
+        excel_db.delete_data("Reportes", {"id_reporte": 3})
+        excel_db.close_connection()
+        assert pd.read_excel(workbook, sheet_name="Reportes")["id_reporte"].tolist() == [1, 2]
@@ -0,0 +1,67 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import export
+from export import export_to_file, purge_exports, read_export, remove_export
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    path = str(tmp_path / "exportaciones")
+    monkeypatch.setattr(export, "EXPORT_DIR", path)
+    return path
+
+
+def chunks():
+    # La columna de observaciones llega vacía en el primer bloque
+    yield pd.DataFrame({"id_reporte": [1, 2], "observaciones": [None, None],
+                        "fecha": pd.to_datetime(["2025-06-05", "2025-06-20"])})
+    yield pd.DataFrame({"id_reporte": [3], "observaciones": ["Revisado"],
+                        "fecha": pd.to_datetime(["2025-07-01"])})
+
+
+@pytest.mark.parametrize("export_format", ["CSV", "Excel", "Parquet"])
+def test_every_chunk_is_written(export_format):
+    path = export_to_file(chunks(), export_format, name="Reportes")
+    assert path and path.endswith(export.EXPORT_FORMATS[export_format][0])
+    if export_format == "CSV":
+        df = pd.read_csv(path)
+    elif export_format == "Excel":
+        df = pd.read_excel(path, sheet_name="Reportes")
+    else:
+        df = pd.read_parquet(path)
+    assert df["id_reporte"].tolist() == [1, 2, 3]
+    assert df["observaciones"].iloc[2] == "Revisado"
+    assert read_export(path)
+    remove_export(path)
+    assert not os.path.exists(path)
+
+
+def test_parquet_schema_comes_from_the_column_types():
+    schema = export.parquet_schema(next(chunks()))
+    assert str(schema.field("id_reporte").type) == "int64"
+    assert str(schema.field("observaciones").type) == "string"
+    assert str(schema.field("fecha").type) == "timestamp[us]"
+
+
+def test_failed_export_leaves_no_file(export_dir):
+    def broken():
+        yield pd.DataFrame({"id_reporte": [1]})
+        raise RuntimeError("lectura interrumpida")
+
+    assert export_to_file(broken(), "CSV") is None
+    assert os.listdir(export_dir) == []
+
+
+def test_purge_removes_only_old_exports(export_dir):
+    old = export_to_file(chunks(), "CSV")
+    new = export_to_file(chunks(), "CSV")
+    stale = time.time() - export.EXPORT_MAX_AGE - 1
+    os.utime(old, (stale, stale))
+    assert purge_exports() == 1
+    assert os.listdir(export_dir) == [os.path.basename(new)]
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def workbook(db, tmp_path):
+    """Libro Excel con las tablas de la base de prueba"""
+    path = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for table_name in ("Empleados", "Reportes"):
+            db.get_data(table_name).to_excel(writer, sheet_name=table_name, index=False)
+    return path
+
+
+def rows(df: pd.DataFrame) -> list:
+    # Excel guarda el texto vacío como celda vacía
+    return df.astype(object).where(df.notna(), "").astype(str).values.tolist()
+
+
+CALLS = [
+    dict(table_name="Reportes", columns=["id_reporte", "porcentaje"], order_by="id_reporte"),
+    dict(table_name="Reportes", filters={"id_empleado": 2}, order_by="porcentaje DESC", limit=1),
+    dict(table_name="Reportes", order_by=["id_empleado", "id_reporte DESC"], offset=1, limit=2),
+    dict(table_name="Empleados", filters={"rol": ["empleado"], "activo": 1}, columns=["nombre"]),
+]
+
+
+@pytest.mark.parametrize("call", CALLS)
+def test_sqlite_and_excel_return_the_same_rows(db, workbook, call):
+    sqlite = db.get_data(**call)
+    assert db.connect_to_excel(workbook)
+    excel = db.get_data(**call)
+    assert list(excel.columns) == list(sqlite.columns)
+    assert rows(excel) == rows(sqlite)
+
+
+def test_projection_reads_only_the_requested_columns(db):
+    df = db.get_data("Reportes", columns=["id_reporte"])
+    assert list(df.columns) == ["id_reporte"]
+
+
+def test_projections_are_cached_separately(db):
+    narrow = db.get_data("Reportes", columns=["id_reporte"])
+    wide = db.get_data("Reportes")
+    assert list(narrow.columns) == ["id_reporte"]
+    assert len(wide.columns) > 1
+
+
+def test_invalid_column_returns_an_empty_frame(db):
+    assert db.get_data("Reportes", columns=["id_reporte; DROP TABLE Reportes"]).empty
+    assert len(db.get_data("Reportes")) == 3
+
+
+class RecordingEngine:
+    """Motor de SQL Server falso: registra las sentencias y no retorna filas"""
+
+    def __init__(self) -> None:
+        self.executed = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, params):
+        self.executed.append((str(statement), params))
+        return SimpleNamespace(keys=lambda: ["id_reporte"], fetchmany=lambda size: [])
+
+
+def test_sql_server_pages_on_the_server(db, monkeypatch):
+    engine = RecordingEngine()
+    monkeypatch.setattr(db, "sql_engine", engine)
+    assert db.get_data("Reportes", {"id_empleado": 2}, limit=5).empty
+    db.get_data("Reportes", {"id_empleado": 2}, order_by="fecha DESC", limit=10, offset=20)
+    assert engine.executed == [
+        ("SELECT TOP (:limit) * FROM Reportes WHERE id_empleado = :p0", {"p0": 2, "limit": 5}),
+        ("SELECT * FROM Reportes WHERE id_empleado = :p0 ORDER BY fecha DESC "
+         "OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY", {"p0": 2, "offset": 20, "limit": 10}),
+    ]
@@ -0,0 +1,62 @@
+import threading
+from types import SimpleNamespace
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from database import script_run_ctx
+
+
+def session_ctx(session_id: str) -> SimpleNamespace:
+    """Lo mínimo de un ``ScriptRunContext`` que usan add_script_run_ctx y QueryStats"""
+    return SimpleNamespace(session_id=session_id,
+                           pages_manager=SimpleNamespace(main_script_hash="main"))
+
+
+def test_results_keep_their_keys(db):
+    results = db.get_many({
+        "empleados": "Empleados",
+        "reportes": {"table_name": "Reportes", "filters": {"id_empleado": 2},
+                     "columns": ["id_reporte"]},
+        "contratos": db.query("Contratos").where("id_contrato", "=", 2),
+    })
+    assert len(results["empleados"]) == 3
+    assert sorted(results["reportes"]["id_reporte"]) == [1, 2]
+    assert results["contratos"]["id_contrato"].tolist() == [2]
+
+
+def test_failed_loads_return_empty_frames(db, monkeypatch):
+    get_data = db.get_data
+
+    def failing(table_name, **kwargs):
+        if table_name == "Reportes":
+            raise RuntimeError("fallo de lectura")
+        return get_data(table_name, **kwargs)
+
+    monkeypatch.setattr(db, "get_data", failing)
+    results = db.get_many({"reportes": "Reportes", "empleados": "Empleados"})
+    assert results["reportes"].empty
+    assert len(results["empleados"]) == 3
+
+
+def test_script_run_ctx_restores_the_previous_context():
+    ctx = session_ctx("sesion-a")
+    seen = []
+
+    def worker():
+        with script_run_ctx(ctx):
+            seen.append(get_script_run_ctx(suppress_warning=True))
+        seen.append(get_script_run_ctx(suppress_warning=True))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen == [ctx, None]
+
+
+def test_executor_threads_do_not_keep_the_session(db, monkeypatch):
+    ctx = session_ctx("sesion-a")
+    monkeypatch.setattr("database.get_script_run_ctx", lambda: ctx)
+    db.get_many({"empleados": "Empleados"})
+    # Un hilo del pool que atiende después otra tarea no ve la sesión anterior
+    leaked = db.executor.submit(get_script_run_ctx, suppress_warning=True).result()
+    assert leaked is None
@@ -0,0 +1,96 @@
+import pytest
+
+from instrumentation import QueryStats, fingerprint
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM Reportes WHERE id_empleado = 12", "SELECT * FROM Reportes WHERE id_empleado = ?"),
+    ("SELECT * FROM Empleados WHERE correo = 'o''neil@example.com'",
+     "SELECT * FROM Empleados WHERE correo = ?"),
+    ("SELECT * FROM Reportes WHERE id_reporte IN (:p0, :p1, :p2)",
+     "SELECT * FROM Reportes WHERE id_reporte IN (?, ...)"),
+    ("SELECT  *\n  FROM Contratos", "SELECT * FROM Contratos"),
+])
+def test_fingerprint(statement, expected):
+    assert fingerprint(statement) == expected
+
+
+def test_measure_records_errors_and_reraises():
+    stats = QueryStats()
+    with pytest.raises(ValueError):
+        with stats.measure("get_data", "sqlite", "Reportes", "SELECT * FROM Reportes"):
+            raise ValueError("fallo")
+    record = stats.snapshot().iloc[0]
+    assert record["error"] and record["tablas"] == "Reportes"
+
+
+def test_invalid_statement_falls_back_to_the_operation():
+    stats = QueryStats()
+
+    def broken():
+        raise ValueError("identificador inválido")
+
+    with stats.measure("fetch", "sqlite", ["Reportes", "Actividades"], broken):
+        pass
+    assert stats.snapshot().iloc[0]["sentencia"] == "fetch Reportes, Actividades"
+
+
+def test_buffer_keeps_the_latest_records():
+    stats = QueryStats(capacity=3)
+    for i in range(5):
+        stats.record("get_data", "sqlite", ["Reportes"], f"SELECT {i}", i)
+    assert stats.snapshot()["duracion_ms"].tolist() == [2, 3, 4]
+
+
+def test_top_statements_group_by_fingerprint():
+    stats = QueryStats()
+    stats.record("get_data", "sqlite", ["Reportes"], "SELECT * FROM Reportes WHERE id = 1", 10, cache="miss")
+    stats.record("get_data", "sqlite", ["Reportes"], "SELECT * FROM Reportes WHERE id = 2", 30, cache="hit")
+    stats.record("count", "sqlite", ["Empleados"], "SELECT COUNT(*) FROM Empleados", 5)
+    top = stats.top_statements()
+    assert top.iloc[0]["llamadas"] == 2 and top.iloc[0]["total_ms"] == 40
+    assert top.iloc[0]["aciertos_cache"] == 0.5
+    assert stats.percentiles().set_index("operacion").loc["get_data", "llamadas"] == 2
+
+
+def test_slow_statements_are_logged(monkeypatch):
+    logged = []
+    monkeypatch.setattr("instrumentation.slow_logger.warning", logged.append)
+    stats = QueryStats(slow_threshold_ms=100)
+    stats.record("get_data", "sqlite", ["Reportes"], "SELECT 1", 50)
+    stats.record("get_data", "sqlite", ["Reportes"], "SELECT 2", 150)
+    assert len(logged) == 1 and "150.0 ms" in logged[0]
+
+
+def test_db_time_is_accumulated_per_session(monkeypatch):
+    stats = QueryStats()
+    session = ["sesion-a"]
+    monkeypatch.setattr(QueryStats, "_session_id", staticmethod(lambda: session[0]))
+    stats.record("get_data", "sqlite", ["Reportes"], "SELECT 1", 20)
+    session[0] = "sesion-b"
+    stats.record("get_data", "sqlite", ["Reportes"], "SELECT 1", 5)
+    assert stats.db_time_ms("sesion-a") == 20
+    assert stats.db_time_ms() == 5
+
+
+def test_session_db_time_is_bounded_and_released(monkeypatch):
+    stats = QueryStats(max_sessions=2)
+    session = ["sesion-a"]
+    monkeypatch.setattr(QueryStats, "_session_id", staticmethod(lambda: session[0]))
+    for name in ("sesion-a", "sesion-b", "sesion-a", "sesion-c"):
+        session[0] = name
+        stats.record("get_data", "sqlite", ["Reportes"], "SELECT 1", 10)
+    # sesion-b es la menos reciente y se descarta
+    assert stats.db_time_ms("sesion-b") == 0
+    assert stats.db_time_ms("sesion-a") == 20
+    stats.forget_session("sesion-a")
+    assert stats.db_time_ms("sesion-a") == 0
+    assert stats.db_time_ms("sesion-c") == 10
+
+
+def test_database_operations_are_recorded(db):
+    db.get_data("Reportes", filters={"id_empleado": 2})
+    db.get_data("Reportes", filters={"id_empleado": 2})
+    records = db.stats.snapshot()
+    assert records["cache"].tolist()[-2:] == ["miss", "hit"]
+    assert records.iloc[-2]["filas"] == 2
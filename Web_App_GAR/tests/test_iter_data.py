@@ -0,0 +1,48 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+
+def test_chunks_cover_the_whole_table(db):
+    chunks = list(db.iter_data("Reportes", chunk_size=2, order_by="id_reporte"))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert pd.concat(chunks)["id_reporte"].tolist() == [1, 2, 3]
+    assert str(chunks[0]["id_reporte"].dtype) == "Int64"
+
+
+def test_filters_and_projection(db):
+    chunks = list(db.iter_data("Reportes", filters={"id_empleado": 2},
+                               columns=["id_reporte", "porcentaje"], chunk_size=1))
+    df = pd.concat(chunks)
+    assert list(df.columns) == ["id_reporte", "porcentaje"]
+    assert sorted(df["id_reporte"]) == [1, 2]
+
+
+def test_query_objects_are_accepted(db):
+    query = db.query("Empleados").filter({"activo": 1}).order_by("id_empleado")
+    assert pd.concat(db.iter_data(query))["id_empleado"].tolist() == [1, 2]
+
+
+def test_errors_propagate_and_are_recorded(db):
+    with pytest.raises(sqlite3.OperationalError):
+        list(db.iter_data(db.query("Reportes").where("columna_inexistente", "=", 1)))
+    records = db.stats.snapshot()
+    assert records.loc[records["operacion"] == "iter_data", "error"].tolist() == [True]
+
+
+def test_chunks_are_not_cached(db):
+    list(db.iter_data("Reportes"))
+    assert db.insert_data("Reportes", {"id_empleado": 2, "id_actividad": 1,
+                                       "fecha": "2025-06-30 10:00:00", "acciones_realizadas": "Prueba",
+                                       "entregable": "prueba.pdf", "porcentaje": 10})
+    assert len(pd.concat(db.iter_data("Reportes"))) == 4
+
+
+def test_excel_chunks_apply_filters(db, sqlite_path, tmp_path):
+    workbook = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        db.get_data("Reportes").to_excel(writer, sheet_name="Reportes", index=False)
+    assert db.connect_to_excel(workbook)
+    df = pd.concat(db.iter_data("Reportes", filters={"id_empleado": 2}, chunk_size=1))
+    assert sorted(df["id_reporte"]) == [1, 2]
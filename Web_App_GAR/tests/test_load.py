@@ -0,0 +1,60 @@
+import locale
+
+import pytest
+
+from benchmarks.generator import DatasetGenerator, write_sqlite
+from database import DatabaseManager
+
+load = pytest.importorskip("benchmarks.load")
+# app.py importa las interfaces: requieren streamlit_modal y la locale es_CO
+pytest.importorskip("streamlit_modal")
+
+
+def _has_locale(name: str) -> bool:
+    current = locale.setlocale(locale.LC_ALL)
+    try:
+        locale.setlocale(locale.LC_ALL, name)
+        return True
+    except locale.Error:
+        return False
+    finally:
+        locale.setlocale(locale.LC_ALL, current)
+
+
+pytestmark = [
+    pytest.mark.skipif(not _has_locale("es_CO.UTF-8"), reason="locale es_CO.UTF-8 no disponible"),
+    pytest.mark.filterwarnings("ignore"),
+]
+
+
+@pytest.fixture
+def synthetic_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "carga.db")
+    write_sqlite(DatasetGenerator(200), path)
+    # run() configura el backend de app.py con variables de entorno
+    monkeypatch.setenv("GAR_DB_BACKENDS", "sqlite")
+    monkeypatch.setenv("GAR_DB_SQLITE_PATH", path)
+    DatabaseManager._instance = None
+    yield path
+    manager = DatabaseManager()
+    manager.close_connection()
+    manager.executor.shutdown(wait=True)
+    DatabaseManager._instance = None
+
+
+def test_streamlit_version_is_supported():
+    load.check_streamlit_version()
+
+
+def test_one_user_cycle_is_reported(synthetic_db):
+    report = load.run(users=1, iterations=1, pause=0, ramp_up=0, timeout=60, seed=1,
+                      path=synthetic_db)
+    assert report["meta"]["streamlit"].startswith(load.SUPPORTED_STREAMLIT)
+    assert report["resumen"]["pasos_con_error"] == 0, report["errores"]
+    assert report["resumen"]["acciones_guardadas"] == 1
+    pasos = {paso["paso"]: paso for paso in report["pasos"]}
+    assert {"carga", "login", "guardar acción"} <= set(pasos)
+    assert all(0 < pasos[paso]["p50_ms"] <= pasos[paso]["p99_ms"] for paso in pasos)
+    pool = report["base_de_datos"]["pool"]
+    assert report["base_de_datos"]["backend"] == "sqlite"
+    assert pool["prestamos"] > 0 and pool["esperas_agotadas"] == 0
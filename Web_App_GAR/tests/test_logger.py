@@ -0,0 +1,65 @@
+import gzip
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+from logger import DailyRotatingFileHandler, JsonFormatter
+
+
+def log_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("gestion_colaboradores.prueba", logging.INFO, __file__, 1,
+                             message, None, None)
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = DailyRotatingFileHandler(str(tmp_path / "procesamiento.log"), max_bytes=100,
+                                       backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    yield handler
+    handler.close()
+
+
+def rotated(tmp_path) -> list:
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith(".gz"))
+
+
+def test_rotates_by_size_and_compresses(handler, tmp_path):
+    for i in range(3):
+        handler.emit(log_record(f"registro {i} " + "x" * 60))
+    files = rotated(tmp_path)
+    assert len(files) == 2
+    with gzip.open(tmp_path / files[0], "rt", encoding="utf-8") as compressed:
+        assert compressed.read().startswith("registro 0")
+
+
+def test_keeps_only_backup_count_and_ignores_other_files(handler, tmp_path):
+    other = tmp_path / "procesamiento_20250101.log"
+    other.write_text("otro archivo")
+    for i in range(6):
+        handler.emit(log_record(f"registro {i} " + "x" * 60))
+    assert len(rotated(tmp_path)) == 2
+    assert other.exists()
+
+
+def test_rotates_when_the_day_changes(handler, tmp_path):
+    handler.emit(log_record("ayer"))
+    handler._day = "20000101"
+    handler.emit(log_record("hoy"))
+    files = rotated(tmp_path)
+    assert len(files) == 1 and "_20000101_" in files[0]
+    assert (tmp_path / "procesamiento.log").read_text(encoding="utf-8") == "hoy\n"
+
+
+def test_json_formatter_writes_one_object_per_line():
+    try:
+        raise ValueError("fallo")
+    except ValueError:
+        record = log_record("mensaje con ñ")
+        record.exc_info = sys.exc_info()
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["mensaje"] == "mensaje con ñ"
+    assert entry["nivel"] == "INFO" and "ValueError" in entry["excepcion"]
@@ -0,0 +1,76 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from migrations import ACCESS_PATH_INDEXES, MIGRATIONS, SCHEMA_VERSION_TABLE, MigrationRunner
+
+
+def objects(connection, kind: str) -> set:
+    return {row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+def version(connection) -> int:
+    return connection.execute(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}").fetchone()[0] or 0
+
+
+@pytest.fixture
+def connection(sqlite_path):
+    with closing(sqlite3.connect(sqlite_path)) as connection:
+        yield connection
+
+
+def test_fresh_database_gets_every_migration(connection):
+    runner = MigrationRunner("sqlite")
+    assert runner.run_sqlite(connection) == len(MIGRATIONS)
+    assert version(connection) == runner.latest_version
+    assert {name for name, _, _ in ACCESS_PATH_INDEXES} <= objects(connection, "index")
+    assert "ResumenMensual" in objects(connection, "table")
+
+
+def test_running_again_applies_nothing(connection):
+    MigrationRunner("sqlite").run_sqlite(connection)
+    assert MigrationRunner("sqlite").run_sqlite(connection) == 0
+
+
+def test_only_new_migrations_are_applied(connection):
+    MigrationRunner("sqlite").run_sqlite(connection)
+    extra = {"version": 100, "descripcion": "Tabla de prueba",
+             "sqlite": ["CREATE TABLE Prueba (id INTEGER PRIMARY KEY)"], "mssql": []}
+    assert MigrationRunner("sqlite", MIGRATIONS + [extra]).run_sqlite(connection) == 1
+    assert version(connection) == 100
+    assert "Prueba" in objects(connection, "table")
+
+
+def test_failed_migration_is_rolled_back(connection):
+    good = {"version": 1, "descripcion": "Buena",
+            "sqlite": ["CREATE TABLE Buena (id INTEGER)"], "mssql": []}
+    bad = {"version": 2, "descripcion": "Falla a la mitad",
+           "sqlite": ["CREATE TABLE Parcial (id INTEGER)", "CREATE TABLE Buena (id INTEGER)"],
+           "mssql": []}
+    with pytest.raises(sqlite3.OperationalError):
+        MigrationRunner("sqlite", [good, bad]).run_sqlite(connection)
+    assert version(connection) == 1
+    assert "Buena" in objects(connection, "table")
+    assert "Parcial" not in objects(connection, "table")
+
+
+def test_migrations_are_ordered_by_version():
+    runner = MigrationRunner("sqlite", [
+        {"version": 3, "descripcion": "", "sqlite": [], "mssql": []},
+        {"version": 1, "descripcion": "", "sqlite": [], "mssql": []},
+    ])
+    assert [m["version"] for m in runner.migrations] == [1, 3]
+    assert runner.latest_version == 3
+
+
+def test_versions_are_unique_and_cover_both_dialects():
+    versions = [m["version"] for m in MIGRATIONS]
+    assert len(versions) == len(set(versions))
+    assert all(m["sqlite"] and m["mssql"] for m in MIGRATIONS)
+
+
+def test_connecting_migrates_the_database(db, sqlite_path):
+    with closing(sqlite3.connect(sqlite_path)) as connection:
+        assert version(connection) == MigrationRunner("sqlite").latest_version
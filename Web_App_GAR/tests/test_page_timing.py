@@ -0,0 +1,119 @@
+import cProfile
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import page_timing
+from page_timing import PageStats, timed_page
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = PageStats()
+    exported = []
+    monkeypatch.setattr(stats, "export", lambda query_stats=None, **kwargs: exported.append(query_stats))
+    monkeypatch.setattr(page_timing, "page_stats", stats)
+    stats.exported = exported
+    return stats
+
+
+class FakeStats:
+    """``QueryStats`` mínimo: tiempo de base de datos acumulado"""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.forgotten = 0
+
+    def db_time_ms(self) -> float:
+        return self.total
+
+    def forget_session(self) -> None:
+        self.forgotten += 1
+
+
+class Interface:
+    def __init__(self) -> None:
+        self.db_manager = SimpleNamespace(stats=FakeStats())
+
+    @timed_page
+    def show_dashboard(self):
+        self.db_manager.stats.total += 40
+        self.show_table()
+        return "ok"
+
+    @timed_page
+    def show_table(self):
+        self.db_manager.stats.total += 10
+
+
+def test_nested_pages_share_the_rerun_cause(stats):
+    interface = Interface()
+    assert interface.show_dashboard() == "ok"
+    records = stats.snapshot().set_index("pagina")
+    assert records.loc["Interface.show_dashboard", "db_ms"] == 50
+    assert records.loc["Interface.show_table", "db_ms"] == 10
+    assert set(records["causa"]) == {"sin sesión"}
+    # Solo el método más externo exporta las métricas
+    assert stats.exported == [interface.db_manager.stats]
+
+
+def test_errors_are_recorded_and_reraised(stats):
+    class Failing(Interface):
+        @timed_page
+        def show_dashboard(self):
+            raise ValueError("fallo")
+
+    with pytest.raises(ValueError):
+        Failing().show_dashboard()
+    assert stats.snapshot()["pagina"].tolist() == ["Failing.show_dashboard"]
+    # La profundidad se restablece aunque la página falle
+    Interface().show_table()
+    assert len(stats.exported) == 2
+
+
+def test_render_time_excludes_db_time():
+    stats = PageStats()
+    stats.record("Admin.show_dashboard", 120, 80, "rerun")
+    stats.record("Admin.show_dashboard", 50, 70, "rerun")
+    records = stats.snapshot()
+    assert records["render_ms"].tolist() == [40, 0]
+    summary = stats.summary().iloc[0]
+    assert summary["llamadas"] == 2 and summary["db_ms"] == 75
+
+
+def test_prometheus_export_is_written_atomically(tmp_path):
+    stats = PageStats()
+    stats.record("Admin.show_dashboard", 1500, 500, "primera carga")
+    path = str(tmp_path / "metricas.prom")
+    stats.export(path=path, force=True)
+    text = open(path, encoding="utf-8").read()
+    assert 'gar_page_seconds_count{page="Admin.show_dashboard"} 1' in text
+    assert 'gar_page_db_seconds_total{page="Admin.show_dashboard"} 0.500000' in text
+    assert os.listdir(tmp_path) == ["metricas.prom"]
+
+
+def test_only_the_slowest_profiles_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_timing, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(page_timing, "PROFILE_KEEP", 2)
+    stats = PageStats()
+    paths = [stats.keep_profile("Admin.show_dashboard", ms, cProfile.Profile())
+             for ms in (100, 300, 50, 200)]
+    assert paths[2] is None
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (paths[1], paths[3]))
+
+
+def test_widget_count_is_recorded_and_exported(stats, monkeypatch):
+    monkeypatch.setattr(page_timing, "get_script_run_ctx", lambda suppress_warning=False: object())
+    monkeypatch.setattr(page_timing, "_rerun_cause", lambda: "widget: filtro")
+    monkeypatch.setattr(page_timing, "_widget_snapshot",
+                        lambda: {"filtro": "'Todos'", "pagina": "1", "buscar": "''"})
+    interface = Interface()
+    interface.show_dashboard()
+    # El tiempo de la sesión se libera una vez, al terminar el método más externo
+    assert interface.db_manager.stats.forgotten == 1
+    records = stats.snapshot().set_index("pagina")
+    assert records.loc["Interface.show_dashboard", "widgets"] == 3
+    assert records.loc["Interface.show_dashboard", "causa"] == "widget: filtro"
+    assert stats.summary().set_index("pagina").loc["Interface.show_table", "widgets"] == 3
+    assert 'gar_page_widgets_total{page="Interface.show_dashboard"} 3' in stats.prometheus_text()
@@ -0,0 +1,180 @@
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from query_builder import Query, escape_like, like_to_regex, to_positional
+
+
+def normalize(df: pd.DataFrame) -> list:
+    """Filas comparables entre SQLite (texto, enteros) y pandas (Timestamp, booleanos, flotantes)"""
+    def value(v):
+        if v is None or v is pd.NA or (isinstance(v, float) and pd.isna(v)) or v is pd.NaT:
+            return None
+        if isinstance(v, pd.Timestamp):
+            return v.strftime("%Y-%m-%d %H:%M:%S")
+        if isinstance(v, (bool, int, float)) or hasattr(v, "item"):
+            number = float(v)
+            return int(number) if number.is_integer() else round(number, 6)
+        return str(v)
+    return [tuple(value(v) for v in row) for row in df.itertuples(index=False)]
+
+
+def run_sqlite(path: str, query: Query) -> pd.DataFrame:
+    sql, params = query.compile("sqlite")
+    with closing(sqlite3.connect(path)) as connection:
+        cursor = connection.execute(sql, params)
+        return pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+
+QUERIES = {
+    "igualdad": lambda: Query("Reportes").where("id_empleado", "=", 2).order_by("id_reporte"),
+    "filtros get_data": lambda: Query("Reportes").filter(
+        {"id_actividad": [1, 3], "estado": True}).order_by("id_reporte"),
+    "IS NULL": lambda: Query("Reportes").where("comentarios", "=", None).select("id_reporte"),
+    "NOT IN vacío": lambda: Query("Empleados").where_in("id_empleado", [], negate=True)
+    .order_by("id_empleado"),
+    "rango de fechas": lambda: Query("Reportes").date_range(
+        "fecha", datetime(2025, 6, 1), datetime(2025, 7, 1)).order_by("fecha DESC"),
+    "búsqueda": lambda: Query("Reportes").search(["acciones_realizadas", "entregable"], "acta")
+    .select("id_reporte").order_by("id_reporte"),
+    "OR de filtros": lambda: Query("Reportes").filter_any(
+        [{"id_empleado": 3}, {"id_empleado": 2, "porcentaje": 100}, {"comentarios": None}])
+    .select("id_reporte").order_by("id_reporte"),
+    "OR vacío": lambda: Query("Reportes").filter_any([]).select("id_reporte"),
+    "LIKE con comodines": lambda: Query("Contratos").where(
+        "nombre_contrato", "LIKE", "Contrato%").order_by("id_contrato").select("id_contrato"),
+    "paginación": lambda: Query("Reportes").order_by("id_reporte DESC").limit(2).offset(1),
+    "JOIN": lambda: Query("Reportes", "r")
+    .select("r.id_reporte", "a.descripcion", "c.nombre_contrato AS contrato")
+    .join("Actividades", ("r.id_actividad", "a.id_actividad"), alias="a")
+    .join("Contratos", ("a.id_contrato", "c.id_contrato"), alias="c")
+    .where("c.id_empleado", "=", 2).order_by("r.id_reporte"),
+    "LEFT JOIN con condiciones": lambda: Query("Contratos", "c")
+    .select("c.id_contrato", "a.id_actividad", "r.id_reporte")
+    .left_join("Actividades", ("c.id_contrato", "a.id_contrato"), alias="a")
+    .left_join("Reportes", ("a.id_actividad", "r.id_actividad"), alias="r", conditions=[
+        ("r.fecha", ">=", datetime(2025, 6, 1))])
+    .order_by("c.id_contrato", "a.id_actividad"),
+    "agregados": lambda: Query("Empleados").aggregate(
+        total=("count", "*"), activos=("count", "*", {"activo": True})),
+    "agrupación": lambda: Query("Reportes").group_by("id_empleado").aggregate(
+        reportes=("count", "*"), promedio=("avg", "porcentaje"),
+        actividades=("count_distinct", "id_actividad")).order_by("id_empleado"),
+}
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_sql_and_pandas_return_the_same_rows(name, sqlite_path, frames):
+    expected = normalize(run_sqlite(sqlite_path, QUERIES[name]()))
+    assert normalize(QUERIES[name]().to_pandas(frames.__getitem__)) == expected
+
+
+def test_values_are_bound_parameters():
+    sql, params = Query("Empleados").where("nombre", "=", "x' OR '1'='1").compile("sqlite")
+    assert "OR '1'='1" not in sql
+    assert list(params.values()) == ["x' OR '1'='1"]
+
+
+@pytest.mark.parametrize("identifier", ["Empleados; DROP TABLE Empleados", "1tabla", "a-b"])
+def test_invalid_identifiers_are_rejected(identifier):
+    with pytest.raises(ValueError):
+        Query(identifier)
+    with pytest.raises(ValueError):
+        Query("Empleados").where(identifier, "=", 1)
+
+
+def test_search_without_columns_is_rejected():
+    with pytest.raises(ValueError):
+        Query("Reportes").search([], "acta")
+
+
+@pytest.mark.parametrize("query, expected", [
+    (lambda: Query("Reportes").group_by("id_empleado"), 2),
+    (lambda: Query("Reportes").group_by("id_empleado", "id_actividad")
+     .aggregate(reportes=("count", "*")).order_by("reportes DESC").limit(1), 3),
+    (lambda: Query("Reportes").where("id_actividad", "!=", 3).group_by("id_empleado"), 1),
+    (lambda: Query("Reportes").aggregate(reportes=("count", "*")), 3),
+])
+def test_count_of_grouped_queries_counts_groups(query, expected, sqlite_path, frames):
+    sql, params = query().compile_count()
+    with closing(sqlite3.connect(sqlite_path)) as connection:
+        assert connection.execute(sql, params).fetchone()[0] == expected
+    assert query().count_pandas(frames.__getitem__) == expected
+
+
+def test_mssql_pagination_uses_offset_fetch():
+    sql, params = Query("Reportes").order_by("fecha DESC").limit(10).offset(20).compile("mssql")
+    assert "OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY" in sql
+    assert params["offset"] == 20 and params["limit"] == 10
+
+
+def test_mssql_limit_without_order_uses_top():
+    sql, values = to_positional(*Query("Reportes").where("id_empleado", "=", 2).limit(5)
+                                .compile("mssql"))
+    assert sql == "SELECT TOP (?) * FROM Reportes WHERE id_empleado = ?"
+    assert values == [5, 2]
+
+
+@pytest.mark.parametrize("query, order", [
+    (lambda: Query("Reportes").where("id_empleado", "=", 2).order_by("fecha DESC", "id_reporte")
+     .limit(10).offset(20), "fecha DESC, id_reporte ASC"),
+    # OFFSET sin ORDER BY no es válido en SQL Server
+    (lambda: Query("Reportes").where("id_empleado", "=", 2).limit(10).offset(20), "(SELECT NULL)"),
+])
+def test_mssql_offset_fetch_binds_its_values(query, order):
+    sql, values = to_positional(*query().compile("mssql"))
+    assert sql == ("SELECT * FROM Reportes WHERE id_empleado = ? "
+                   f"ORDER BY {order} OFFSET ? ROWS FETCH NEXT ? ROWS ONLY")
+    assert values == [2, 20, 10]
+
+
+def test_mssql_ordered_limit_fetches_from_offset_zero():
+    sql, values = to_positional(*Query("Reportes").order_by("id_reporte").limit(3).compile("mssql"))
+    assert "TOP" not in sql
+    assert sql.endswith("ORDER BY id_reporte ASC OFFSET ? ROWS FETCH NEXT ? ROWS ONLY")
+    assert values == [0, 3]
+
+
+def test_to_positional_keeps_parameter_order():
+    sql, values = to_positional("SELECT * FROM T WHERE a = :p1 AND b = :p0 AND c = :p1",
+                                {"p0": "b", "p1": "a"})
+    assert sql == "SELECT * FROM T WHERE a = ? AND b = ? AND c = ?"
+    assert values == ["a", "b", "a"]
+
+
+class TestLikeEscaping:
+    @pytest.mark.parametrize("term, ids", [
+        ("%", [1]),
+        ("_", [2]),
+        ("100%", [1]),
+        ("o_a", [2]),
+        ("contrato", [1, 2, 3]),
+    ])
+    def test_search_matches_wildcards_literally(self, term, ids, sqlite_path, frames):
+        query = lambda: Query("Contratos").search(["nombre_contrato"], term) \
+            .select("id_contrato").order_by("id_contrato")
+        assert run_sqlite(sqlite_path, query())["id_contrato"].tolist() == ids
+        assert query().to_pandas(frames.__getitem__)["id_contrato"].tolist() == ids
+
+    def test_search_emits_escape_clause(self):
+        sql, params = Query("Contratos").search(["nombre_contrato"], "50%").compile("sqlite")
+        assert "LIKE :p0 ESCAPE '\\'" in sql
+        assert params["p0"] == "%50\\%%"
+
+    def test_escape_like(self):
+        assert escape_like("a%b_c[d\\e") == "a\\%b\\_c\\[d\\\\e"
+
+    @pytest.mark.parametrize("pattern, text, matches", [
+        ("a%", "abc", True),
+        ("a_c", "abc", True),
+        ("a\\_c", "abc", False),
+        ("a\\_c", "a_c", True),
+        ("%\\%", "100%", True),
+        ("a.c", "abc", False),
+        ("%", "línea\nsiguiente", True),
+    ])
+    def test_like_to_regex(self, pattern, text, matches):
+        assert (pd.Series([text]).str.match(like_to_regex(pattern)).iloc[0]) == matches
@@ -0,0 +1,151 @@
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pytest
+
+from rollup import month_bounds, month_key
+
+
+def summary(path: str) -> list:
+    with closing(sqlite3.connect(path)) as connection:
+        return connection.execute(
+            "SELECT id_empleado, id_contrato, mes, actividades_total, actividades_reportadas, "
+            "ROUND(porcentaje_promedio, 3) FROM ResumenMensual "
+            "ORDER BY id_empleado, id_contrato, mes").fetchall()
+
+
+@pytest.fixture
+def check_rebuild(db, sqlite_path):
+    """Verifica que el resumen incremental coincide con uno regenerado desde cero"""
+    def check():
+        incremental = summary(sqlite_path)
+        assert db.summary.rebuild()
+        assert summary(sqlite_path) == incremental
+        return incremental
+    return check
+
+
+def reporte(fecha: str, id_actividad: int = 3, porcentaje: int = 50) -> dict:
+    return {"id_empleado": 3, "id_actividad": id_actividad, "fecha": fecha,
+            "acciones_realizadas": "Prueba", "entregable": "prueba.pdf", "porcentaje": porcentaje}
+
+
+def test_month_helpers():
+    assert month_key("2025-06-30 23:59:59") == "2025-06"
+    inicio, fin = month_bounds("2025-12")
+    assert (inicio.year, inicio.month, fin.year, fin.month) == (2025, 12, 2026, 1)
+
+
+def test_connect_builds_the_summary(db, sqlite_path):
+    assert summary(sqlite_path) == [
+        (2, 1, "2025-06", 2, 2, 70.0),
+        (3, 2, "2025-05", 1, 1, 100.0),
+    ]
+
+
+def test_insert_refreshes_the_month_of_the_report(db, check_rebuild):
+    assert db.insert_data("Reportes", reporte("2025-07-10 12:00:00"))
+    assert (3, 2, "2025-07", 1, 1, 50.0) in check_rebuild()
+
+
+def test_update_that_moves_a_report_refreshes_both_months(db, check_rebuild):
+    assert db.update_data("Reportes", {"fecha": "2025-08-01 09:00:00"}, {"id_reporte": 3})
+    rows = check_rebuild()
+    assert (3, 2, "2025-08", 1, 1, 100.0) in rows
+    assert not [row for row in rows if row[:3] == (3, 2, "2025-05")]
+
+
+def test_deleting_the_last_report_removes_the_row(db, check_rebuild):
+    assert db.delete_data("Reportes", {"id_reporte": 3})
+    assert [row for row in check_rebuild() if row[0] == 3] == []
+
+
+def test_batch_insert_refreshes_each_month(db, check_rebuild):
+    assert db.insert_many("Reportes", [
+        reporte("2025-05-20 10:00:00", porcentaje=0),
+        reporte("2025-09-01 10:00:00"),
+    ]) == [True, True]
+    rows = check_rebuild()
+    assert (3, 2, "2025-05", 1, 1, 50.0) in rows
+    assert (3, 2, "2025-09", 1, 1, 50.0) in rows
+
+
+def test_new_activity_updates_the_contract_total(db, check_rebuild):
+    assert db.insert_data("Actividades", {"Nro": 3, "descripcion": "Nueva", "id_contrato": 1,
+                                          "porcentaje": 0})
+    assert (2, 1, "2025-06", 3, 2, 70.0) in check_rebuild()
+
+
+def test_summary_is_disabled_on_excel(db):
+    db.use_excel = True
+    try:
+        assert not db.summary.enabled
+        assert db.summary.keys_for_rows("Reportes", [reporte("2025-07-10")]) == set()
+    finally:
+        db.use_excel = False
+
+
+def test_activity_status_counts_reports_of_the_period(db):
+    df = db.get_activity_status(2, datetime(2025, 6, 1), datetime(2025, 7, 1))
+    by_contract = df.groupby("id_contrato")
+    assert by_contract.size().to_dict() == {1: 2, 3: 1}
+    actividades = df.dropna(subset=["id_actividad"]).set_index("id_actividad")
+    assert actividades["reportes_periodo"].to_dict() == {1: 1, 2: 1}
+    # El resultado en caché de la consulta no se modifica
+    raw = db.fetch(db.activity_status_query(2, datetime(2025, 6, 1), datetime(2025, 7, 1)))
+    assert "reportes_periodo" not in raw.columns
+
+
+def test_activity_status_uses_half_open_month_bounds(db):
+    assert db.insert_many("Reportes", [
+        dict(reporte(fecha, id_actividad=1), id_empleado=2)
+        for fecha in ("2025-06-30 23:59:59", "2025-07-01 00:00:00")]) == [True, True]
+    junio = db.get_activity_status(2, *month_bounds("2025-06")).set_index("id_actividad")
+    julio = db.get_activity_status(2, *month_bounds("2025-07")).set_index("id_actividad")
+    # El último segundo de junio cuenta en junio (con el reporte del 5); la medianoche, en julio
+    assert junio.loc[1, "reportes_periodo"] == 2
+    assert julio.loc[1, "reportes_periodo"] == 1
+    assert julio.loc[2, "reportes_periodo"] == 0
+
+
+def test_activity_status_of_an_employee_without_reports(db):
+    assert db.insert_data("Contratos", {"nombre_contrato": "Contrato nuevo", "fecha_inicio": "2025-01-01",
+                                        "fecha_fin": "2025-12-31", "id_empleado": 1})
+    df = db.get_activity_status(1, *month_bounds("2025-06"))
+    # El contrato sin actividades ni reportes se lista igual
+    assert df["nombre_contrato"].tolist() == ["Contrato nuevo"]
+    assert df["reportes_periodo"].tolist() == [0]
+    df = db.get_activity_status(3, *month_bounds("2025-06"))
+    assert df[["id_actividad", "reportes_periodo"]].values.tolist() == [[3, 0]]
+
+
+def test_batch_update_uses_a_constant_number_of_queries(db, check_rebuild):
+    fechas = [f"2025-07-{day:02d} 10:00:00" for day in range(1, 29)] * 10
+    assert all(db.insert_many("Reportes", [reporte(fecha) for fecha in fechas]))
+    ids = db.get_data("Reportes", {"id_empleado": 3}, columns=["id_reporte"])["id_reporte"]
+    db.stats.clear()
+    changes = [({"fecha": "2025-08-01 09:00:00"}, {"id_reporte": int(i)}) for i in ids]
+    assert all(db.update_many("Reportes", changes))
+    reads = db.stats.snapshot()
+    # Filas afectadas antes y después, totales, reportes y filas existentes del resumen
+    assert len(reads[reads["operacion"] != "update_many"]) <= 6
+    rows = check_rebuild()
+    # Se movieron los 280 reportes nuevos (50 %) y el de mayo (100 %)
+    assert (3, 2, "2025-08", 1, 1, 50.178) in rows
+    assert not [row for row in rows if row[:3] == (3, 2, "2025-07")]
+
+
+def test_failed_writes_do_not_refresh_the_summary(db, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(db.summary, "refresh", refreshed.append)
+    assert not db.insert_data("Reportes", {"id_empleado": 3, "id_actividad": 3})
+    assert db.insert_many("Reportes", [{"id_empleado": 3, "id_actividad": 3}]) == [False]
+    assert refreshed == []
+
+
+def test_insert_without_date_uses_the_server_clock(db, check_rebuild):
+    data = reporte(None)
+    del data["fecha"]
+    assert db.insert_data("Reportes", data)
+    check_rebuild()
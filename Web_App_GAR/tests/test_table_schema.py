@@ -0,0 +1,104 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from table_schema import apply_schema, arrow_to_pandas, cast_arrow, iter_frames, materialize, to_array
+
+
+def cursor(rows):
+    """``fetchmany`` sobre una lista de filas"""
+    pending = list(rows)
+
+    def fetchmany(size):
+        chunk, pending[:] = pending[:size], pending[size:]
+        return chunk
+    return fetchmany
+
+
+COLUMNS = ["id_reporte", "porcentaje", "estado", "fecha", "rol", "entregable"]
+ROWS = [
+    (1, 40, 0, "2025-06-05 10:00:00", "empleado", "a.pdf"),
+    (2, None, 1, "2025-06-20", "administrador", None),
+    (3, 100, None, None, "empleado", "c.pdf"),
+]
+
+
+def test_materialize_applies_the_column_types():
+    df = materialize(COLUMNS, cursor(ROWS), fetch_size=2)
+    assert str(df["id_reporte"].dtype) == "Int64"
+    assert df["porcentaje"].isna().tolist() == [False, True, False]
+    assert str(df["estado"].dtype) == "boolean"
+    assert df["estado"].tolist()[:2] == [False, True]
+    assert pd.api.types.is_datetime64_any_dtype(df["fecha"])
+    assert df["fecha"].iloc[1] == pd.Timestamp("2025-06-20")
+    assert isinstance(df["rol"].dtype, pd.CategoricalDtype)
+    assert df["entregable"].isna().tolist() == [False, True, False]
+
+
+def test_materialize_matches_a_single_fetch():
+    in_chunks = materialize(COLUMNS, cursor(ROWS), fetch_size=1)
+    at_once = materialize(COLUMNS, cursor(ROWS), fetch_size=100)
+    typed = COLUMNS[:-1]
+    pd.testing.assert_frame_equal(in_chunks[typed], at_once[typed])
+    # Las columnas sin tipo definido se infieren por bloque (texto u object)
+    assert in_chunks["entregable"].isna().equals(at_once["entregable"].isna())
+    assert in_chunks["entregable"].dropna().tolist() == at_once["entregable"].dropna().tolist()
+
+
+def test_empty_result_keeps_columns_and_types():
+    df = materialize(COLUMNS, cursor([]))
+    assert list(df.columns) == COLUMNS and df.empty
+    assert str(df["id_reporte"].dtype) == "Int64"
+
+
+def test_repeated_column_names_from_a_join():
+    df = materialize(["id_actividad", "id_actividad"], cursor([(1, 2)]))
+    assert df.iloc[0].tolist() == [1, 2]
+
+
+def test_iter_frames_yields_typed_chunks():
+    chunks = list(iter_frames(COLUMNS, cursor(ROWS), chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert all(str(chunk["id_reporte"].dtype) == "Int64" for chunk in chunks)
+
+
+@pytest.mark.parametrize("values, expected", [
+    (["1", "true", "Sí", "no", 0, None], [True, True, True, False, False, None]),
+    ([1.0, float("nan"), 0.0, pd.NA], [True, None, False, None]),
+])
+def test_booleans_from_text_and_numbers(values, expected):
+    assert to_array("activo", values).tolist() == [pd.NA if v is None else v for v in expected]
+
+
+def test_decimal_values_in_int_columns_stay_float():
+    assert to_array("porcentaje", [50.5, 10]).tolist() == [50.5, 10.0]
+
+
+def test_apply_schema_on_excel_frames():
+    df = apply_schema(pd.DataFrame({"id_empleado": [1.0, 2.0], "activo": [1, 0],
+                                    "nombre": ["Ana", "Luis"]}))
+    assert str(df["id_empleado"].dtype) == "Int64"
+    assert df["activo"].tolist() == [True, False]
+    assert df["nombre"].tolist() == ["Ana", "Luis"]
+
+
+def test_blank_excel_cells_are_not_true(db, tmp_path):
+    workbook = str(tmp_path / "gar.xlsx")
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        pd.DataFrame({"id_empleado": [1, 2, 3], "nombre": ["Ana", "Luis", "Eva"],
+                      "activo": [1, None, 0]}).to_excel(writer, sheet_name="Empleados", index=False)
+    assert db.connect_to_excel(workbook)
+    # La celda vacía llega como NaN y no debe convertirse en True
+    assert db.get_data("Empleados", order_by="id_empleado")["activo"].tolist() == [True, pd.NA, False]
+    assert db.count("Empleados", {"activo": True}) == 1
+
+
+def test_cast_arrow_parses_sqlite_text_dates():
+    table = pa.table({"fecha": ["2025-06-05 10:00:00", "2025-06-20", None],
+                      "estado": [0, 1, None], "rol": ["empleado", "administrador", None]})
+    cast = cast_arrow(table)
+    assert pa.types.is_timestamp(cast.schema.field("fecha").type)
+    assert pa.types.is_boolean(cast.schema.field("estado").type)
+    assert pa.types.is_dictionary(cast.schema.field("rol").type)
+    df = arrow_to_pandas(table)
+    assert df["fecha"].iloc[1] == pd.Timestamp("2025-06-20")